@@ -1,10 +1,12 @@
 import os
+from core.startup_profiler import startup_profiler
 os.environ["FFREPORT"] = "file=ffreport.log:level=quiet"
 os.environ["FFMPEG_LOGLEVEL"] = "panic"
 os.environ["QT_LOGGING_RULES"] = "qt.multimedia.ffmpeg=false;qt.multimedia.playbackengine=false"
 os.environ["QT_MEDIA_FFMPEG_LOGLEVEL"] = "fatal"
 
-import cv2
+with startup_profiler.phase("import cv2"):
+    import cv2
 # Establecer nivel de log en OpenCV si el módulo de logging está disponible:
 if hasattr(cv2, "utils") and hasattr(cv2.utils, "logging"):
     cv2.utils.logging.setLogLevel(cv2.utils.logging.LOG_LEVEL_SILENT)
@@ -12,10 +14,12 @@ if hasattr(cv2, "utils") and hasattr(cv2.utils, "logging"):
 import sys
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import Qt
-from ui.main_window import MainGUI
+with startup_profiler.phase("import ui.main_window"):
+    from ui.main_window import MainGUI
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    with startup_profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
     
     # Configurar la aplicación para mejor rendimiento
     try:
@@ -25,8 +29,11 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"⚠️ No se pudieron aplicar optimizaciones OpenGL: {e}")
     
-    gui = MainGUI()
-    gui.show()
+    with startup_profiler.phase("MainGUI"):
+        gui = MainGUI()
+    with startup_profiler.phase("mostrar ventana"):
+        gui.show()
+    startup_profiler.report("ventana visible")
     
     print("🚀 Monitor PTZ Inteligente - Orca iniciado")
     print("🎯 Configuración de FPS optimizada disponible en Configuración > Configurar FPS")
@@ -0,0 +1,88 @@
+"""Compara los backends de inferencia sobre el mismo clip de video.
+
+Uso:
+    python -m benchmarks.bench_backends clip.mp4 --modelo Personas \
+        --backends ultralytics onnx openvino --imgsz 640 --frames 300
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.detector_worker import MODEL_CLASSES, resolve_model_path
+from core.inference_backends import BACKENDS, create_backend
+
+
+def read_frames(path, max_frames):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise SystemExit(f"No se pudieron leer frames de {path}")
+    return frames
+
+
+def run_backend(name, weights, frames, classes, conf, imgsz, warmup):
+    backend = create_backend(name, weights, device="cpu", imgsz=imgsz)
+    for frame in frames[:warmup]:
+        backend.predict([frame], classes=classes, conf=conf, imgsz=imgsz)
+
+    latencies = []
+    detections = 0
+    start = time.perf_counter()
+    for frame in frames:
+        t0 = time.perf_counter()
+        xyxy, _, _ = backend.predict([frame], classes=classes, conf=conf, imgsz=imgsz)[0]
+        latencies.append(time.perf_counter() - t0)
+        detections += len(xyxy)
+    total = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    return {
+        "fps": len(frames) / total,
+        "mean_ms": float(lat.mean()),
+        "p95_ms": float(np.percentile(lat, 95)),
+        "detections": detections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("video")
+    parser.add_argument("--modelo", default="Personas")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = read_frames(args.video, args.frames)
+    weights = str(resolve_model_path(args.modelo))
+    classes = MODEL_CLASSES.get(args.modelo)
+
+    print(f"Clip: {args.video} ({len(frames)} frames) modelo={args.modelo} imgsz={args.imgsz}")
+    print(f"{'backend':<12} {'fps':>8} {'media ms':>10} {'p95 ms':>10} {'detecciones':>12}")
+    baseline = None
+    for name in args.backends:
+        try:
+            res = run_backend(name, weights, frames, classes, args.conf, args.imgsz, args.warmup)
+        except Exception as e:
+            print(f"{name:<12} no disponible: {e}")
+            continue
+        baseline = baseline or res["fps"]
+        print(f"{name:<12} {res['fps']:>8.1f} {res['mean_ms']:>10.1f} {res['p95_ms']:>10.1f} "
+              f"{res['detections']:>12} ({res['fps'] / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Genera el modelo INT8 de un modelo y lo compara con FP32 sobre un clip reservado.
+
+Uso:
+    python -m benchmarks.bench_int8 --modelo Embarcaciones \
+        --calib capturas/videos --holdout clip.mp4 --imgsz 640 --report int8.json
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_backends import read_frames
+from core.detector_worker import MODEL_CLASSES, resolve_model_path
+from core.inference_backends import create_backend, quantized_model_path
+from core.quantization import sample_frames, quantize_model, compare_backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modelo", default="Embarcaciones")
+    parser.add_argument("--calib", nargs="+", default=["capturas/videos"],
+                        help="Videos/imágenes o carpetas de capturas para calibrar")
+    parser.add_argument("--calib-frames", type=int, default=200)
+    parser.add_argument("--holdout", required=True, help="Clip no usado en la calibración")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--reference", default="onnx", help="Backend FP32 de referencia")
+    parser.add_argument("--force", action="store_true", help="Volver a cuantizar aunque exista")
+    parser.add_argument("--report", help="Guardar el informe en JSON")
+    args = parser.parse_args()
+
+    weights = str(resolve_model_path(args.modelo))
+    classes = MODEL_CLASSES.get(args.modelo)
+
+    holdout = os.path.abspath(args.holdout)
+    if args.force or not quantized_model_path(weights, args.imgsz).exists():
+        # El clip de evaluación no debe influir en la calibración
+        calib = sample_frames(args.calib, args.calib_frames, exclude=[holdout])
+        if not calib:
+            raise SystemExit(f"Sin frames de calibración en {args.calib}")
+        print(f"Calibrando con {len(calib)} frames de {', '.join(args.calib)}")
+        quantize_model(weights, calib, args.imgsz)
+
+    frames = read_frames(args.holdout, args.frames)
+    reference = create_backend(args.reference, weights, device="cpu", imgsz=args.imgsz)
+    candidate = create_backend("onnx_int8", weights, device="cpu", imgsz=args.imgsz)
+    report = compare_backends(reference, candidate, frames, classes, args.conf, args.imgsz)
+    report.update({"modelo": args.modelo, "weights": weights, "holdout": args.holdout,
+                   "reference_backend": args.reference, "imgsz": args.imgsz})
+
+    ref, cand, agr = report["reference"], report["candidate"], report["agreement"]
+    print(f"Clip: {args.holdout} ({len(frames)} frames) modelo={args.modelo} imgsz={args.imgsz}")
+    print(f"{'backend':<12} {'fps':>8} {'media ms':>10} {'p95 ms':>10} {'detecciones':>12}")
+    for name, res in ((args.reference, ref), ("onnx_int8", cand)):
+        print(f"{name:<12} {res['fps']:>8.1f} {res['mean_ms']:>10.1f} {res['p95_ms']:>10.1f} {res['detections']:>12}")
+    print(f"Aceleración: {report['speedup']:.2f}x")
+    print(f"Concordancia con FP32: recall {agr['recall']:.1%}  precisión {agr['precision']:.1%}  "
+          f"F1 {agr['f1']:.3f}  Δconf medio {agr['mean_conf_delta']:+.3f}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Informe guardado en {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark de conversión de color: RGB completo + resize vs. YUV directo al tamaño del consumidor.
+
+Genera frames NV12 sintéticos y mide, por frame:
+  - copia de planos (lo único que queda en el hilo de la GUI),
+  - ruta anterior: NV12 -> RGB a resolución completa y luego resize al imgsz,
+  - ruta directa: resize de los planos y conversión solo de esos píxeles.
+
+Uso:
+    python -m benchmarks.bench_yuv [--repeat 50] [--imgsz 416]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.yuv_frame import YuvFrame, fit_size
+
+RESOLUTIONS = ((1280, 720), (1920, 1080), (2560, 1440), (3840, 2160))
+
+
+def make_nv12(width, height, seed=0):
+    """Return ``(planes, stride)`` of a synthetic NV12 frame with padded rows."""
+    rng = np.random.default_rng(seed)
+    # Ruido de baja frecuencia escalado: se parece más a una escena que el ruido blanco
+    coarse = rng.integers(0, 256, (height // 64, width // 64, 3), dtype=np.uint8)
+    rgb = cv2.resize(coarse, (width, height), interpolation=cv2.INTER_CUBIC)
+    i420 = cv2.cvtColor(rgb, cv2.COLOR_RGB2YUV_I420)
+    y = i420[:height]
+    u = i420[height:height + height // 4].reshape(height // 2, width // 2)
+    v = i420[height + height // 4:].reshape(height // 2, width // 2)
+    stride = (width + 63) // 64 * 64
+    y_plane = np.zeros((height, stride), np.uint8)
+    y_plane[:, :width] = y
+    uv_plane = np.zeros((height // 2, stride), np.uint8)
+    uv_plane[:, :width] = np.dstack((u, v)).reshape(height // 2, width)
+    return [(y_plane.tobytes(), stride), (uv_plane.tobytes(), stride)]
+
+
+def legacy(frame, size):
+    rgb = cv2.cvtColorTwoPlane(frame.y, frame.uv, cv2.COLOR_YUV2RGB_NV12)
+    return cv2.resize(rgb, size, interpolation=cv2.INTER_AREA)
+
+
+def direct(planes, width, height, size):
+    # Frame nuevo en cada vuelta: sin la caché por tamaño
+    return YuvFrame.from_planes("Format_NV12", planes, width, height).to_rgb(size)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--imgsz", type=int, default=416)
+    args = parser.parse_args()
+
+    def best(fn):
+        return min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat * 1000.0
+
+    print(f"{'resolución':>11} {'copia (ms)':>11} {'RGB+resize (ms)':>16} {'YUV directo (ms)':>17} {'speedup':>8}")
+    for width, height in RESOLUTIONS:
+        planes = make_nv12(width, height, seed=width)
+        frame = YuvFrame.from_planes("Format_NV12", planes, width, height)
+        size = fit_size(width, height, args.imgsz)
+        # La luma debe coincidir; el croma directo queda a media resolución de salida (4:2:0)
+        gray_legacy = cv2.cvtColor(legacy(frame, size), cv2.COLOR_RGB2GRAY).astype(np.int16)
+        gray_direct = cv2.cvtColor(frame.to_rgb(size), cv2.COLOR_RGB2GRAY).astype(np.int16)
+        assert np.abs(gray_legacy - gray_direct).mean() < 2
+        t_copy = best(lambda: YuvFrame.from_planes("Format_NV12", planes, width, height))
+        t_legacy = best(lambda: legacy(frame, size))
+        t_direct = best(lambda: direct(planes, width, height, size))
+        print(f"{width:>6}x{height:<4} {t_copy:>11.2f} {t_legacy:>16.2f} {t_direct:>17.2f} "
+              f"{t_legacy / t_direct:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import math
+import time
+from collections import deque
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración por defecto del controlador; se sobrescribe con la clave
+# "adaptive" dentro de "fps_config" de cada cámara.
+DEFAULT_ADAPTIVE_FPS_CONFIG = {
+    "target_load": 0.7,     # Fracción de un núcleo que puede usar la inferencia por cámara
+    "raise_headroom": 0.9,  # Subir FPS solo si la carga prevista queda bajo target_load * esto
+    "max_drop_ratio": 0.1,  # Frames sobrescritos en el buzón antes de bajar FPS
+    "window_s": 2.0,        # Periodo de medición y decisión
+    "min_fps": 1,           # Nunca detectar por debajo de esto
+}
+
+
+def build_adaptive_fps_config(overrides=None):
+    config = DEFAULT_ADAPTIVE_FPS_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+class AdaptiveFPSController:
+    """Pick the detection frame interval from measured load.
+
+    Call :meth:`on_input_frame` for every decoded frame and :meth:`update`
+    with the detectors' latency and mailbox counters once :meth:`due`
+    returns True. ``max_fps`` is the user's configured detection FPS; the
+    controller never exceeds it and only lowers the rate when inference
+    would use more than ``target_load`` of a core or frames are dropped.
+    """
+
+    def __init__(self, max_fps=8, config=None, clock=time.monotonic, name=""):
+        self.config = build_adaptive_fps_config(config)
+        self.max_fps = max(1, max_fps)
+        self.name = name
+        self._clock = clock
+        self._window_start = clock()
+        self._input_frames = 0
+        self._last_posted = 0
+        self._last_overwritten = 0
+        self.input_fps = None
+        self.interval = None
+        self.load = 0.0
+        self.drop_ratio = 0.0
+        self.latency_ms = 0.0
+        self.decisions = deque(maxlen=20)
+
+    def set_max_fps(self, max_fps):
+        self.max_fps = max(1, max_fps)
+        if self.interval is not None:
+            self.interval = max(self.interval, self._min_interval())
+
+    def on_input_frame(self):
+        self._input_frames += 1
+
+    def due(self):
+        return self._clock() - self._window_start >= self.config["window_s"]
+
+    def _min_interval(self):
+        return max(1, int(round(self.input_fps / self.max_fps)))
+
+    def _max_interval(self):
+        return max(1, int(math.ceil(self.input_fps / self.config["min_fps"])))
+
+    def update(self, latency_ms, posted, overwritten):
+        """Close the measurement window and return the new interval.
+
+        ``latency_ms`` is the summed per-frame inference time of the
+        camera's workers; ``posted``/``overwritten`` are cumulative mailbox
+        counters.
+        """
+        now = self._clock()
+        elapsed = max(1e-6, now - self._window_start)
+        self.input_fps = self._input_frames / elapsed
+        self._window_start = now
+        self._input_frames = 0
+
+        delta_posted = posted - self._last_posted
+        delta_over = overwritten - self._last_overwritten
+        self._last_posted, self._last_overwritten = posted, overwritten
+        self.drop_ratio = delta_over / delta_posted if delta_posted > 0 else 0.0
+        self.latency_ms = latency_ms
+
+        if self.input_fps <= 0:
+            return self.interval
+
+        previous = self.interval
+        if self.interval is None:
+            self.interval = self._min_interval()
+
+        detection_fps = self.input_fps / self.interval
+        self.load = detection_fps * latency_ms / 1000.0
+        target = self.config["target_load"]
+
+        if self.load > target or self.drop_ratio > self.config["max_drop_ratio"]:
+            # FPS sostenible con la latencia medida
+            sustainable = target / (latency_ms / 1000.0) if latency_ms > 0 else self.max_fps
+            wanted = int(math.ceil(self.input_fps / max(sustainable, 1e-6)))
+            self.interval = max(wanted, self.interval + 1)
+            reason = "carga" if self.load > target else "descartes"
+        elif self.interval > 1 and self.drop_ratio == 0 and (
+            self.input_fps / (self.interval - 1) * latency_ms / 1000.0
+            < target * self.config["raise_headroom"]
+        ):
+            self.interval -= 1
+            reason = "margen"
+        else:
+            reason = None
+
+        self.interval = min(max(self.interval, self._min_interval()), self._max_interval())
+        if self.interval != previous:
+            change = f"{previous}->{self.interval}" if previous else f"inicial {self.interval}"
+            decision = (
+                f"{reason or 'límites'}: intervalo {change} "
+                f"(entrada {self.input_fps:.1f} fps, detección {self.input_fps / self.interval:.1f} fps, "
+                f"latencia {latency_ms:.0f} ms, carga {self.load:.0%}, descartes {self.drop_ratio:.0%})"
+            )
+            self.decisions.append(decision)
+            logger.info("FPS adaptativo %s: %s", self.name, decision)
+        return self.interval
+
+    def get_status(self):
+        return {
+            "input_fps": round(self.input_fps, 1) if self.input_fps is not None else None,
+            "interval": self.interval,
+            "detection_fps": round(self.input_fps / self.interval, 1) if self.interval and self.input_fps else None,
+            "latency_ms": round(self.latency_ms, 1),
+            "load": round(self.load, 2),
+            "drop_ratio": round(self.drop_ratio, 2),
+            "decisions": list(self.decisions),
+        }
@@ -1,6 +1,5 @@
 from collections import defaultdict
-from deep_sort_realtime.deepsort_tracker import DeepSort
-import torch
+import threading
 import time
 from logging_utils import get_logger
 
@@ -32,17 +31,10 @@ class AdvancedTracker:
     MOVEMENT_SMOOTHING_FRAMES = 5
 
     def __init__(self, max_age=30, n_init=3, conf_threshold=0.25, device="cpu", lost_ttl=5):
-        use_gpu = device != "cpu" and torch.cuda.is_available()
-
-        self.tracker = DeepSort(
-            max_age=max_age,
-            n_init=n_init,
-            embedder='mobilenet',
-            embedder_gpu=use_gpu,
-            half=use_gpu,
-            nms_max_overlap=1.0,
-            bgr=True
-        )
+        # DeepSort (y su embedder) se construyen en el primer uso o en warm_up()
+        self._deepsort_args = (max_age, n_init, device)
+        self._tracker_lock = threading.Lock()
+        self.tracker = None
         self.track_history = defaultdict(list)  # track_id -> list of (cx, cy)
         self.track_meta = {}  # track_id -> (cls, conf)
         self.moving_flags = defaultdict(list)  # track_id -> list of recent moving bools
@@ -51,8 +43,29 @@ class AdvancedTracker:
         self.lost_counts = defaultdict(int)  # track_id -> frames since last seen
         self.lost_ttl = lost_ttl
 
+    def warm_up(self):
+        """Build DeepSort and its embedder now (safe to call from a background thread)."""
+        with self._tracker_lock:
+            if self.tracker is None:
+                from deep_sort_realtime.deepsort_tracker import DeepSort
+                import torch
+
+                max_age, n_init, device = self._deepsort_args
+                use_gpu = device != "cpu" and torch.cuda.is_available()
+                self.tracker = DeepSort(
+                    max_age=max_age,
+                    n_init=n_init,
+                    embedder='mobilenet',
+                    embedder_gpu=use_gpu,
+                    half=use_gpu,
+                    nms_max_overlap=1.0,
+                    bgr=True
+                )
+        return self.tracker
+
     def update(self, detections, frame=None):
         start_time = time.time()
+        tracker = self.tracker or self.warm_up()
 
         formatted = []
         for det in detections:
@@ -61,7 +74,7 @@ class AdvancedTracker:
             cls = det.get('cls', 0)
             formatted.append([[x1, y1, x2, y2], conf, cls])
 
-        tracks = self.tracker.update_tracks(formatted, frame=frame)
+        tracks = tracker.update_tracks(formatted, frame=frame)
         results = []
         active_ids = set()
         detections_boxes = [d['bbox'] for d in detections]
@@ -131,7 +144,7 @@ class AdvancedTracker:
                 if self.lost_counts[tid] <= self.lost_ttl:
                     results.append(self.last_result[tid])
                 else:
-                    logger.info(f"Track {tid}: Removed after {self.lost_counts[tid]} lost frames")
+                    logger.debug("Track %s: Removed after %d lost frames", tid, self.lost_counts[tid])
                     self.track_history.pop(tid, None)
                     self.track_meta.pop(tid, None)
                     self.moving_flags.pop(tid, None)
@@ -157,7 +170,7 @@ class AdvancedTracker:
                     ghost_tracks.append((str(tid), f"Too far from detections ({min_dist:.0f}px)"))
         
         if ghost_tracks:
-            logger.info(f"Removed {len(ghost_tracks)} ghost tracks: {ghost_tracks}")
+            logger.debug("Removed %d ghost tracks: %s", len(ghost_tracks), ghost_tracks)
             for tid_str, reason in ghost_tracks:
                 tid = int(tid_str)
                 self.track_history.pop(tid, None)
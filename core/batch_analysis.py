@@ -0,0 +1,294 @@
+"""Análisis offline de video grabado con la misma cadena que la vista en vivo.
+
+Uso:
+    python -m core.batch_analysis grabaciones/ --salida analisis/ \
+        --modelos Embarcaciones --workers 4 --imgsz 640
+
+Cada video se procesa en un proceso del pool: detección (``DetectorWorker``),
+fusión entre modelos, ``AdvancedTracker`` y reglas de captura de
+``GestorAlertas``. Por video se escribe ``<nombre>.jsonl`` con una línea por
+frame analizado y las capturas en ``<salida>/capturas``.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".m4v", ".ts")
+
+
+def list_videos(paths):
+    """Expand files and directories (recursively) into a sorted list of videos."""
+    videos = []
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            videos.extend(p for p in path.rglob("*") if p.suffix.lower() in VIDEO_EXTENSIONS)
+        elif path.is_file():
+            videos.append(path)
+    return sorted(set(videos))
+
+
+def iter_frame_chunks(path, chunk_size=32, stride=1, max_frames=None, prefetch=2):
+    """Yield lists of ``(frame_index, frame)`` decoded ahead on a background thread.
+
+    Frames skipped by ``stride`` are only grabbed, never decoded to BGR.
+    """
+    chunks = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+
+    def decode():
+        cap = cv2.VideoCapture(str(path))
+        try:
+            index = 0
+            chunk = []
+            while not stop.is_set() and (max_frames is None or index < max_frames):
+                if not cap.grab():
+                    break
+                if index % stride == 0:
+                    ok, frame = cap.retrieve()
+                    if not ok:
+                        break
+                    chunk.append((index, frame))
+                    if len(chunk) >= chunk_size:
+                        chunks.put(chunk)
+                        chunk = []
+                index += 1
+            if chunk:
+                chunks.put(chunk)
+        finally:
+            cap.release()
+            chunks.put(None)
+
+    thread = threading.Thread(target=decode, name=f"decode_{Path(path).name}", daemon=True)
+    thread.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        stop.set()
+        # Desbloquear al decodificador si el consumidor abandona antes del final
+        while thread.is_alive():
+            try:
+                chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def _video_fps(path):
+    cap = cv2.VideoCapture(str(path))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    cap.release()
+    return fps if fps > 0 else 25.0
+
+
+def _alert_boxes(tracks):
+    """Tracks in the ``(x1, y1, x2, y2, cls, cx, cy, track_id, conf)`` form used by ``GestorAlertas``."""
+    boxes = []
+    for track in tracks:
+        x1, y1, x2, y2 = track["bbox"]
+        boxes.append((x1, y1, x2, y2, track["cls"], int((x1 + x2) / 2), int((y1 + y2) / 2),
+                      track.get("id"), track.get("conf", 0.0)))
+    return boxes
+
+
+# Detectores del proceso del pool; se reutilizan entre videos
+_detectors = None
+
+
+def _build_detectors(cam_data):
+    global _detectors
+    if _detectors is not None:
+        return _detectors
+    from core.detector_worker import DetectorWorker, plan_model_groups
+
+    detectors = []
+    for group in plan_model_groups(cam_data["modelos"]):
+        detector = DetectorWorker(
+            model_key=group[0],
+            group_keys=group,
+            confidence=cam_data.get("confianza", 0.5),
+            imgsz=cam_data.get("imgsz", 640),
+            device=cam_data.get("device", "cpu"),
+            track=False,
+            camera_id=cam_data.get("ip", "offline"),
+            backend=cam_data.get("backend", "ultralytics"),
+            tiling=cam_data.get("tiling"),
+            roi=cam_data.get("roi"),
+            rect=cam_data.get("rect_inference", False),
+            resolution_ladder=cam_data.get("resolution_ladder"),
+            cascade=cam_data.get("cascade"),
+        )
+        if not detector._load_model():
+            raise RuntimeError(f"No se pudo cargar el modelo {group[0]}")
+        detectors.append(detector)
+    _detectors = detectors
+    return detectors
+
+
+def analyze_video(task):
+    """Pool entry point: analyze one video and return its summary."""
+    path, cam_data, options = task
+    from core.advanced_tracker import AdvancedTracker
+    from core.detector_worker import merge_model_detections
+    from core.gestor_alertas import GestorAlertas
+
+    path = Path(path)
+    out_dir = Path(options["salida"])
+    detectors = _build_detectors(cam_data)
+    tracker = AdvancedTracker(
+        conf_threshold=cam_data.get("confianza", 0.5),
+        device=cam_data.get("device", "cpu"),
+        lost_ttl=cam_data.get("lost_ttl", 5),
+    )
+    alertas = None
+    if options["capturas"]:
+        alertas = GestorAlertas(cam_id=path.stem, filas=options["filas"], columnas=options["columnas"])
+        alertas.capturas_dir = str(out_dir / "capturas")
+
+    def log(_msg):
+        pass
+
+    video_fps = _video_fps(path)
+    processed = detections = 0
+    started = time.perf_counter()
+    with open(out_dir / f"{path.stem}.jsonl", "w", encoding="utf-8") as out:
+        for chunk in iter_frame_chunks(path, options["chunk"], options["cada"], options["max_frames"]):
+            for index, frame in chunk:
+                outputs = []
+                for detector in detectors:
+                    detector.process_frame(frame, index, lambda output, key, fid: outputs.append(output))
+                tracks = tracker.update(merge_model_detections(outputs), frame=frame)
+                if alertas is not None:
+                    alertas.procesar_detecciones(_alert_boxes(tracks), frame, log, cam_data)
+                record = {
+                    "frame": index,
+                    "t": round(index / video_fps, 3),
+                    "detections": [
+                        {"bbox": [int(v) for v in t["bbox"]], "cls": int(t["cls"]),
+                         "conf": round(float(t.get("conf") or 0.0), 4), "id": t.get("id")}
+                        for t in tracks
+                    ],
+                }
+                out.write(json.dumps(record) + "\n")
+                processed += 1
+                detections += len(tracks)
+    elapsed = time.perf_counter() - started
+
+    captures = 0
+    if alertas is not None:
+        captures = alertas.capturas_total
+        for hilo in list(alertas.hilos_guardado):
+            hilo.wait()
+    return {
+        "video": str(path),
+        "pid": os.getpid(),
+        "frames": processed,
+        "detections": detections,
+        "captures": captures,
+        "seconds": round(elapsed, 3),
+        "fps": round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+    }
+
+
+def run_batch(videos, cam_data, options, workers=None):
+    """Spread ``videos`` over a spawn process pool; yields summaries as they finish."""
+    Path(options["salida"]).mkdir(parents=True, exist_ok=True)
+    tasks = [(str(v), cam_data, options) for v in videos]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    with mp.get_context("spawn").Pool(workers) as pool:
+        yield from pool.imap_unordered(analyze_video, tasks)
+
+
+def _load_cam_data(args):
+    cam_data = {}
+    if args.camara:
+        with open(args.config, encoding="utf-8") as f:
+            camaras = json.load(f).get("camaras", [])
+        cam_data = next((c for c in camaras if c.get("ip") == args.camara), None)
+        if cam_data is None:
+            raise SystemExit(f"Cámara {args.camara} no encontrada en {args.config}")
+        cam_data = dict(cam_data)
+    if args.modelos:
+        cam_data["modelos"] = args.modelos
+    cam_data.setdefault("modelos", [cam_data.get("modelo") or "Personas"])
+    for key, value in (("confianza", args.conf), ("imgsz", args.imgsz), ("device", args.device), ("backend", args.backend)):
+        if value is not None:
+            cam_data[key] = value
+    # El servidor de inferencia compartido solo tiene sentido en la GUI
+    cam_data.pop("inference_server", None)
+    return cam_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("entradas", nargs="+", help="Videos o carpetas de grabaciones")
+    parser.add_argument("--salida", default="analisis_offline")
+    parser.add_argument("--camara", help="IP de una cámara de config.json cuya configuración reutilizar")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--modelos", nargs="+")
+    parser.add_argument("--conf", type=float)
+    parser.add_argument("--imgsz", type=int)
+    parser.add_argument("--device")
+    parser.add_argument("--backend")
+    parser.add_argument("--workers", type=int, help="Procesos del pool (por defecto uno por CPU)")
+    parser.add_argument("--chunk", type=int, default=32, help="Frames decodificados por bloque")
+    parser.add_argument("--cada", type=int, default=1, help="Analizar uno de cada N frames")
+    parser.add_argument("--max-frames", type=int)
+    parser.add_argument("--sin-capturas", action="store_true")
+    parser.add_argument("--filas", type=int, default=18)
+    parser.add_argument("--columnas", type=int, default=22)
+    args = parser.parse_args()
+
+    videos = list_videos(args.entradas)
+    if not videos:
+        raise SystemExit(f"Sin videos en {', '.join(args.entradas)}")
+    cam_data = _load_cam_data(args)
+    options = {
+        "salida": os.path.abspath(args.salida),
+        "chunk": max(1, args.chunk),
+        "cada": max(1, args.cada),
+        "max_frames": args.max_frames,
+        "capturas": not args.sin_capturas,
+        "filas": args.filas,
+        "columnas": args.columnas,
+    }
+
+    print(f"{len(videos)} videos, modelos={cam_data['modelos']} salida={options['salida']}")
+    started = time.perf_counter()
+    summaries = []
+    for summary in run_batch(videos, cam_data, options, args.workers):
+        summaries.append(summary)
+        print(f"[pid {summary['pid']}] {summary['video']}: {summary['frames']} frames en "
+              f"{summary['seconds']:.1f} s ({summary['fps']:.1f} fps), "
+              f"{summary['detections']} detecciones, {summary['captures']} capturas")
+    elapsed = time.perf_counter() - started
+
+    total = sum(s["frames"] for s in summaries)
+    per_worker = {}
+    for s in summaries:
+        frames, seconds = per_worker.get(s["pid"], (0, 0.0))
+        per_worker[s["pid"]] = (frames + s["frames"], seconds + s["seconds"])
+    for pid, (frames, seconds) in sorted(per_worker.items()):
+        print(f"worker {pid}: {frames} frames, {frames / seconds if seconds else 0:.1f} fps")
+    print(f"Total: {total} frames en {elapsed:.1f} s ({total / elapsed if elapsed else 0:.1f} fps agregados)")
+    with open(Path(options["salida"]) / "resumen.json", "w", encoding="utf-8") as f:
+        json.dump({"videos": summaries, "frames": total, "seconds": round(elapsed, 3),
+                   "fps": round(total / elapsed, 2) if elapsed else 0.0}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
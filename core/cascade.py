@@ -0,0 +1,132 @@
+import time
+
+import numpy as np
+
+from core.tiling import merge_detections, offset_detections
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración por defecto del modo cascada; se sobrescribe con la clave
+# "cascade" de cada cámara en config.json. Se activa en el DetectorWorker
+# del modelo verificador.
+DEFAULT_CASCADE_CONFIG = {
+    "enabled": False,
+    "proposer": "Barcos",         # Modelo rápido sobre el frame completo reducido
+    "verifier": "Embarcaciones",  # Modelo pesado sobre los recortes a resolución nativa
+    "proposer_imgsz": 320,
+    "proposer_conf": 0.15,        # Umbral bajo: el verificador descarta los falsos positivos
+    "max_crops": 8,               # Candidatos verificados por frame (los de mayor confianza)
+    "crop_margin": 0.5,           # Contexto añadido alrededor del candidato (fracción del lado)
+    "min_crop": 160,              # Lado mínimo del recorte en píxeles del frame
+    "crop_imgsz": 320,            # Entrada del verificador por recorte
+    "min_overlap": 0.3,           # Intersección/área menor mínima entre candidato y confirmación
+}
+
+
+def build_cascade_config(overrides=None):
+    config = DEFAULT_CASCADE_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+def candidate_crops(xyxy, frame_w, frame_h, margin=0.5, min_size=160):
+    """Square crops around each candidate box, expanded and clamped to the frame."""
+    crops = []
+    for x1, y1, x2, y2 in np.asarray(xyxy, dtype=np.float32).tolist():
+        side = max(x2 - x1, y2 - y1) * (1.0 + 2.0 * margin)
+        side = int(min(max(side, min_size), frame_w, frame_h))
+        cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+        left = int(min(max(0, cx - side / 2.0), frame_w - side))
+        top = int(min(max(0, cy - side / 2.0), frame_h - side))
+        crops.append((left, top, left + side, top + side))
+    return crops
+
+
+def overlap_mask(boxes, candidates, threshold):
+    """True for each box whose intersection over the smaller area with some candidate exceeds ``threshold``."""
+    if len(boxes) == 0 or len(candidates) == 0:
+        return np.zeros((len(boxes),), dtype=bool)
+    b = np.asarray(boxes, dtype=np.float32)[:, None, :]
+    c = np.asarray(candidates, dtype=np.float32)[None, :, :]
+    w = np.clip(np.minimum(b[..., 2], c[..., 2]) - np.maximum(b[..., 0], c[..., 0]), 0, None)
+    h = np.clip(np.minimum(b[..., 3], c[..., 3]) - np.maximum(b[..., 1], c[..., 1]), 0, None)
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    area_c = (c[..., 2] - c[..., 0]) * (c[..., 3] - c[..., 1])
+    smaller = np.minimum(area_b, area_c)
+    ratio = np.divide(w * h, smaller, out=np.zeros_like(smaller), where=smaller > 0)
+    return (ratio > threshold).any(axis=1)
+
+
+class CascadeStage:
+    """Fast proposer on the whole frame, heavy verifier on candidate crops.
+
+    ``proposer`` and ``verifier`` are backends (or model handles) with the
+    usual ``predict(frames, classes, conf, imgsz)`` returning
+    ``(xyxy, cls, conf)`` per frame. Only verifier detections overlapping
+    a proposal are kept, in frame coordinates and the verifier's classes.
+    """
+
+    def __init__(self, config, proposer, verifier, proposer_classes, verifier_classes, verifier_conf, name=""):
+        self.config = build_cascade_config(config)
+        self.proposer = proposer
+        self.verifier = verifier
+        self.proposer_classes = proposer_classes
+        self.verifier_classes = verifier_classes
+        self.verifier_conf = verifier_conf
+        self.name = name
+        self.frames = 0
+        self.proposer_ms = 0.0
+        self.verifier_ms = 0.0
+        self.candidates = 0
+        self.confirmed = 0
+
+    def _ema(self, previous, value):
+        return value if self.frames == 0 else 0.8 * previous + 0.2 * value
+
+    def run(self, frame):
+        cfg = self.config
+        frame_h, frame_w = frame.shape[:2]
+        started = time.perf_counter()
+        xyxy, _, conf = self.proposer.predict(
+            [frame], classes=self.proposer_classes, conf=cfg["proposer_conf"], imgsz=cfg["proposer_imgsz"]
+        )[0]
+        proposed = time.perf_counter()
+
+        order = np.argsort(-np.asarray(conf), kind="stable")[: int(cfg["max_crops"])]
+        candidates = np.asarray(xyxy, dtype=np.float32)[order]
+        result = merge_detections([])
+        if len(candidates):
+            crops = candidate_crops(candidates, frame_w, frame_h, cfg["crop_margin"], cfg["min_crop"])
+            outputs = self.verifier.predict(
+                [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in crops],
+                classes=self.verifier_classes,
+                conf=self.verifier_conf,
+                imgsz=cfg["crop_imgsz"],
+            )
+            parts = [offset_detections(res, x1, y1) for (x1, y1, _, _), res in zip(crops, outputs)]
+            merged = merge_detections(parts)
+            keep = overlap_mask(merged[0], candidates, cfg["min_overlap"])
+            result = (merged[0][keep], merged[1][keep], merged[2][keep])
+        verified = time.perf_counter()
+
+        self.proposer_ms = self._ema(self.proposer_ms, (proposed - started) * 1000.0)
+        self.verifier_ms = self._ema(self.verifier_ms, (verified - proposed) * 1000.0)
+        self.frames += 1
+        self.candidates += len(candidates)
+        self.confirmed += len(result[0])
+        logger.debug("%s: cascada %d candidatos, %d confirmados", self.name, len(candidates), len(result[0]))
+        return result
+
+    def get_stats(self):
+        return {
+            "frames": self.frames,
+            "proposer_ms": round(self.proposer_ms, 1),
+            "verifier_ms": round(self.verifier_ms, 1),
+            "candidates": self.candidates,
+            "confirmed": self.confirmed,
+            "confirm_ratio": round(self.confirmed / self.candidates, 3) if self.candidates else 0.0,
+        }
@@ -0,0 +1,356 @@
+import threading
+import time
+
+import cv2
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.yuv_frame import YuvFrame
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración por defecto de la decodificación; se sobrescribe con la clave
+# "decode" de cada cámara en config.json.
+DEFAULT_DECODE_CONFIG = {
+    "backend": "qt",        # "qt" (QMediaPlayer), "opencv" o "pyav"
+    "mode": "all",          # "all": todo en un hilo; "skip": solo los frames que se usan; "keyframes": solo I-frames
+    "max_fps": None,        # Tope del modo "skip" (None = el mayor entre fps visual y de detección)
+    "keyframe_interval_s": 2.0,  # OpenCV no distingue I-frames: en "keyframes" decodifica uno cada N s
+    "realtime": True,       # Archivos locales: entregar al ritmo del video, como un stream
+    "loop": False,          # Archivos locales: volver al inicio al terminar
+    "reconnect_s": (1, 2, 5, 10),  # Espera entre reintentos de un stream caído
+}
+
+DECODE_MODES = ("all", "skip", "keyframes")
+
+
+def build_decode_config(overrides=None):
+    config = DEFAULT_DECODE_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    if config["mode"] not in DECODE_MODES:
+        raise ValueError(f"Modo de decodificación desconocido: {config['mode']}")
+    return config
+
+
+def is_live_source(url):
+    return "://" in str(url)
+
+
+class FrameSkipper:
+    """Pick frames by media timestamp so at most ``fps`` per second are decoded."""
+
+    def __init__(self, fps=None):
+        self.set_fps(fps)
+
+    def set_fps(self, fps):
+        self.period = 1.0 / float(fps) if fps else None
+        self.reset()
+
+    def reset(self):
+        self._next = None
+
+    def due(self, ts):
+        """Whether :meth:`want` would keep a frame at ``ts``, without consuming it."""
+        return self.period is None or self._next is None or ts >= self._next - 1e-3
+
+    def want(self, ts):
+        if self.period is None:
+            return True
+        # Tolerancia de 1 ms para timestamps redondeados por el contenedor
+        if self._next is not None and ts < self._next - 1e-3:
+            return False
+        if self._next is None or ts - self._next > self.period:
+            # Primer frame o salto (reconexión): se reinicia la cadencia
+            self._next = ts
+        self._next += self.period
+        return True
+
+
+class DecodeBackend(QObject):
+    """Common interface of the camera acquisition backends.
+
+    ``frame_ready`` carries a ``QVideoFrame``, a
+    :class:`~core.yuv_frame.YuvFrame` or an RGB ``np.ndarray``; the
+    camera's frame bus accepts all three. ``finished`` is emitted when a
+    local file ends without ``loop``.
+    """
+
+    frame_ready = pyqtSignal(object)
+    stream_error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    name = "base"
+
+    def __init__(self, config=None, label="", parent=None):
+        super().__init__(parent)
+        self.config = build_decode_config(config)
+        self.label = label
+        self.grabbed = 0
+        self.decoded = 0
+        self.skipped = 0
+        self.reconnects = 0
+        self.skipper = FrameSkipper(self.config["max_fps"] if self.config["mode"] == "skip" else None)
+
+    def set_target_fps(self, fps):
+        """Rate used by the ``skip`` mode unless ``max_fps`` is fixed."""
+        if self.config["mode"] == "skip" and not self.config["max_fps"]:
+            self.skipper.set_fps(fps)
+
+    def start(self, url):
+        raise NotImplementedError
+
+    def stop(self, wait=True):
+        """Stop decoding; ``wait=False`` returns without waiting for the decode thread."""
+        raise NotImplementedError
+
+    def get_stats(self):
+        return {
+            "backend": self.name,
+            "mode": self.config["mode"],
+            "grabbed": self.grabbed,
+            "decoded": self.decoded,
+            "skipped": self.skipped,
+            "reconnects": self.reconnects,
+        }
+
+
+class QtDecodeBackend(DecodeBackend):
+    """``QMediaPlayer`` decoding; frames arrive as ``QVideoFrame`` on the GUI thread.
+
+    Qt decodes every frame itself, so ``skip`` only avoids handing unused
+    frames on and ``keyframes`` is not available.
+    """
+
+    name = "qt"
+
+    def __init__(self, config=None, label="", parent=None):
+        super().__init__(config, label, parent)
+        from PyQt6.QtMultimedia import QMediaPlayer, QVideoSink
+
+        if self.config["mode"] == "keyframes":
+            logger.warning("%s: QMediaPlayer no permite decodificar solo I-frames; se decodifica todo", label)
+        self._started = None
+        self.video_player = QMediaPlayer()
+        self.video_sink = QVideoSink()
+        self.video_player.setVideoSink(self.video_sink)
+        self.video_sink.videoFrameChanged.connect(self._on_frame)
+        self.video_player.errorOccurred.connect(lambda _e: self.stream_error.emit(self.video_player.errorString()))
+
+    def start(self, url):
+        from PyQt6.QtCore import QUrl
+
+        self._started = time.monotonic()
+        self.video_player.setSource(QUrl(url) if is_live_source(url) else QUrl.fromLocalFile(str(url)))
+        self.video_player.play()
+
+    def _on_frame(self, frame):
+        self.grabbed += 1
+        self.decoded += 1
+        if not self.skipper.want(time.monotonic() - self._started):
+            self.skipped += 1
+            return
+        self.frame_ready.emit(frame)
+
+    def stop(self, wait=True):
+        if self.video_player is None:
+            return
+        from PyQt6.QtMultimedia import QMediaPlayer
+
+        if self.video_player.playbackState() != QMediaPlayer.PlaybackState.StoppedState:
+            self.video_player.stop()
+        self.video_player.setVideoSink(None)
+        self.video_player.deleteLater()
+        self.video_player = None
+        self.video_sink = None
+
+
+class _ThreadedDecodeBackend(DecodeBackend):
+    """Decode on a background thread, reconnecting live streams with backoff.
+
+    Subclasses implement :meth:`_frames`, a generator of ``(ts, produce)``
+    pairs per grabbed frame: ``ts`` is the media time in seconds and
+    ``produce()`` finishes decoding/conversion and returns the frame. It
+    is only called for the frames the mode keeps.
+    """
+
+    def __init__(self, config=None, label="", parent=None):
+        super().__init__(config, label, parent)
+        self._stop = threading.Event()
+        self._thread = None
+        self.url = None
+        self.decode_ms = 0.0
+
+    def start(self, url):
+        self.url = url
+        # Un evento por hilo: un hilo anterior detenido sin esperar no revive al reiniciar
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._stop,), name=f"decode_{self.label or self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def isRunning(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self, wait=True):
+        self._stop.set()
+        if self._thread is not None:
+            if wait:
+                self._thread.join(timeout=5)
+            # Sin esperar, el hilo termina solo al volver de grab()/decode()
+            self._thread = None
+
+    def _frames(self, url):
+        raise NotImplementedError
+
+    def _run(self, stop):
+        live = is_live_source(self.url)
+        backoff = tuple(self.config["reconnect_s"]) or (1,)
+        failures = 0
+        while not stop.is_set():
+            started = time.monotonic()
+            delivered = False
+            frames = None
+            try:
+                frames = self._frames(self.url)
+                for ts, produce in frames:
+                    if stop.is_set():
+                        break
+                    self.grabbed += 1
+                    if not self.skipper.want(ts):
+                        self.skipped += 1
+                        continue
+                    if not live and self.config["realtime"]:
+                        # Ritmo del video: el archivo se comporta como un stream
+                        delay = started + ts - time.monotonic()
+                        if delay > 0 and stop.wait(delay):
+                            break
+                    t0 = time.perf_counter()
+                    frame = produce()
+                    elapsed = (time.perf_counter() - t0) * 1000.0
+                    self.decode_ms = elapsed if self.decoded == 0 else 0.8 * self.decode_ms + 0.2 * elapsed
+                    self.decoded += 1
+                    delivered = True
+                    failures = 0
+                    self.frame_ready.emit(frame)
+            except Exception as e:
+                logger.error("%s: error de decodificación (%s): %s", self.label, self.name, e)
+                self.stream_error.emit(str(e))
+            finally:
+                if frames is not None:
+                    frames.close()
+            if stop.is_set():
+                break
+            if not live:
+                if delivered and self.config["loop"]:
+                    self.skipper.reset()
+                    continue
+                logger.info("%s: fin del archivo %s", self.label, self.url)
+                self.finished.emit()
+                break
+            wait = backoff[min(failures, len(backoff) - 1)]
+            failures += 1
+            self.reconnects += 1
+            logger.warning("%s: stream sin frames, reintento en %.1f s", self.label, wait)
+            if stop.wait(wait):
+                break
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats["decode_ms"] = round(self.decode_ms, 2)
+        return stats
+
+
+class OpenCVDecodeBackend(_ThreadedDecodeBackend):
+    """``cv2.VideoCapture`` on a thread; frames are delivered as RGB arrays.
+
+    ``skip`` only ``grab()``s unused frames: FFmpeg still decodes them to
+    keep the reference chain, but the colour conversion and copy of
+    ``retrieve()`` are skipped. OpenCV cannot tell key frames apart, so
+    ``keyframes`` retrieves one frame every ``keyframe_interval_s``.
+    """
+
+    name = "opencv"
+
+    def __init__(self, config=None, label="", parent=None):
+        super().__init__(config, label, parent)
+        if self.config["mode"] == "keyframes":
+            self.skipper.set_fps(1.0 / max(0.1, float(self.config["keyframe_interval_s"])))
+
+    def _frames(self, url):
+        cap = cv2.VideoCapture(url if is_live_source(url) else str(url))
+        try:
+            if not cap.isOpened():
+                raise RuntimeError(f"No se pudo abrir {url}")
+            live = is_live_source(url)
+            fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+            started = time.monotonic()
+            index = 0
+            while cap.grab():
+                ts = time.monotonic() - started if live else index / fps
+                index += 1
+                yield ts, lambda: self._retrieve(cap)
+        finally:
+            cap.release()
+
+    @staticmethod
+    def _retrieve(cap):
+        ok, frame = cap.retrieve()
+        if not ok:
+            raise RuntimeError("retrieve() falló")
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+class PyAVDecodeBackend(_ThreadedDecodeBackend):
+    """PyAV (FFmpeg) decoding on a thread.
+
+    ``keyframes`` sets the decoder to skip every non-key frame, so those
+    are never decoded at all. 4:2:0 frames are handed on as
+    :class:`~core.yuv_frame.YuvFrame` planes, other formats as RGB arrays.
+    """
+
+    name = "pyav"
+
+    def _frames(self, url):
+        import av
+
+        options = {"rtsp_transport": "tcp"} if str(url).startswith("rtsp") else {}
+        container = av.open(str(url), options=options)
+        try:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            if self.config["mode"] == "keyframes":
+                stream.codec_context.skip_frame = "NONKEY"
+            for frame in container.decode(stream):
+                ts = float(frame.time) if frame.time is not None else 0.0
+                yield ts, lambda frame=frame: self._convert(frame)
+        finally:
+            container.close()
+
+    @staticmethod
+    def _convert(frame):
+        formats = {"yuv420p": "Format_YUV420P", "yuvj420p": "Format_YUV420P", "nv12": "Format_NV12"}
+        pixel_format = formats.get(frame.format.name)
+        if pixel_format is None:
+            return frame.to_ndarray(format="rgb24")
+        planes = [(plane, plane.line_size) for plane in frame.planes]
+        return YuvFrame.from_planes(pixel_format, planes, frame.width, frame.height)
+
+
+DECODE_BACKENDS = {
+    "qt": QtDecodeBackend,
+    "opencv": OpenCVDecodeBackend,
+    "pyav": PyAVDecodeBackend,
+}
+
+
+def create_decode_backend(config=None, label="", parent=None):
+    """Build the decode backend named by ``config["backend"]``."""
+    config = build_decode_config(config)
+    backend = DECODE_BACKENDS.get(config["backend"])
+    if backend is None:
+        raise ValueError(f"Backend de decodificación desconocido: {config['backend']}")
+    return backend(config, label, parent)
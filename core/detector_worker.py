@@ -1,16 +1,29 @@
+import logging
+
 from PyQt6.QtCore import QThread, pyqtSignal
-from logging_utils import get_logger
-from ultralytics import YOLO
+from logging_utils import get_logger, LogSampler
 import numpy as np
 from core.advanced_tracker import AdvancedTracker
+from core.inference_server import build_server_config, acquire_inference_server, release_inference_server
+from core.frame_mailbox import FrameMailbox
+from core.yolo_postprocess import clamp_boxes, select_classes, remap_classes, to_detections
+from core.inference_backends import UltralyticsBackend, create_backend
+from core.model_registry import ModelKey, model_registry
+from core.preprocessing import normalize_shape
+from core.tiling import build_tiling_config, generate_tiles, tile_is_discarded, offset_detections, merge_detections, scale_detections
+from core.roi import build_roi_config, compute_roi_cells, roi_to_pixels, roi_area_ratio
+from core.resolution_ladder import ResolutionLadder, rect_shape, padding_ratio
+from core.cascade import CascadeStage, build_cascade_config
+from core.yuv_frame import YuvFrame, fit_size
+from core.startup_profiler import startup_profiler
 # ELIMINADA: from gui.image_saver import ImageSaverThread  # ← Esta línea causaba el círculo
 import os
+import time
 from pathlib import Path
 
 logger = get_logger(__name__)
 
-# Caché de modelos YOLO a nivel de módulo
-yolo_model_cache = {}
+# Los modelos cargados se comparten a través de core.model_registry.model_registry
 
 # Ajustar la ruta base usando la ubicación de este archivo
 _BASE_MODEL_PATH = Path(__file__).resolve().parent / "models"
@@ -34,6 +47,28 @@ CLASS_REMAP = {
     "Embarcaciones": {0: 1},
 }
 
+def resolve_model_path(model_key, default_model_path="yolov8n.pt"):
+    """Return the weight file used for ``model_key`` (falling back to the default)."""
+    model_path = MODEL_PATHS.get(model_key, default_model_path)
+    if not os.path.exists(model_path):
+        return default_model_path
+    return model_path
+
+
+def plan_model_groups(model_keys):
+    """Group model keys that resolve to the same weight file.
+
+    Returns a list of key lists in first-seen order, so every distinct
+    weight file runs once per frame with the union of its keys' classes.
+    """
+    groups = {}
+    for key in model_keys:
+        path = str(resolve_model_path(key))
+        groups.setdefault(path, [])
+        if key not in groups[path]:
+            groups[path].append(key)
+    return list(groups.values())
+
 def iou(boxA, boxB):
     xA = max(boxA[0], boxB[0])
     yA = max(boxA[1], boxB[1])
@@ -45,12 +80,34 @@ def iou(boxA, boxB):
     iou_val = interArea / float(boxAArea + boxBArea - interArea) if (boxAArea + boxBArea - interArea) > 0 else 0
     return iou_val
 
+
+def merge_model_detections(per_model, iou_threshold=0.5):
+    """Merge the detection lists of several models into one.
+
+    Boxes overlapping more than ``iou_threshold`` are treated as the same
+    object regardless of class; the most confident one wins.
+    """
+    merged = []
+    for dets in per_model:
+        for det in dets:
+            duplicate = False
+            for mdet in merged:
+                if iou(det['bbox'], mdet['bbox']) > iou_threshold:
+                    if det.get('conf', 0) > mdet.get('conf', 0):
+                        mdet.update(det)
+                    duplicate = True
+                    break
+            if not duplicate:
+                merged.append(det.copy())
+    return merged
+
 class DetectorWorker(QThread):
     result_ready = pyqtSignal(list, str, int)
 
-    def __init__(self, model_key="Personas", parent=None, frame_interval=1, confidence=0.5, imgsz=640, device=None, track=True, lost_ttl=5):
+    def __init__(self, model_key="Personas", parent=None, frame_interval=1, confidence=0.5, imgsz=640, device=None, track=True, lost_ttl=5, camera_id=None, inference_server=None, group_keys=None, backend="ultralytics", model_policy="shared_lock", tiling=None, roi=None, rect=False, resolution_ladder=None, cascade=None, preprocess_cache=None):
         super().__init__(parent)
         self.model_key = model_key
+        self.camera_id = camera_id
         if device is None:
             import torch
             device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -59,49 +116,58 @@ class DetectorWorker(QThread):
 
         logger.info(f"{self.objectName()}: Usando {'GPU' if self.device.startswith('cuda') else 'CPU'} para el modelo '{self.model_key}'")
 
-        # Usar modelo por defecto si no existe el archivo específico
+        # Usar modelo por defecto si no existe el archivo específico; la misma
+        # resolución que plan_model_groups, para que el grupo y la carga coincidan
         default_model_path = "yolov8n.pt"  # Modelo que se descarga automáticamente
-        model_path = MODEL_PATHS.get(model_key, default_model_path)
-        
-        # Si el archivo local no existe, usar el modelo por defecto
-        if not os.path.exists(model_path):
-            logger.warning(f"{self.objectName()}: Archivo del modelo {model_path} no encontrado, usando {default_model_path}")
-            model_path = default_model_path
-
-        model_classes_for_key = MODEL_CLASSES.get(model_key)
-        if model_classes_for_key is None:
-            logger.warning("%s: model_key '%s' no encontrado en MODEL_CLASSES. Usando default [0].", self.objectName(), model_key)
-            self.model_classes = [0]
+        configured_path = MODEL_PATHS.get(model_key, default_model_path)
+        model_path = resolve_model_path(model_key, default_model_path)
+        if model_path != configured_path:
+            logger.warning(f"{self.objectName()}: Archivo del modelo {configured_path} no encontrado, usando {default_model_path}")
+
+        # Claves que comparten este archivo de pesos: una sola pasada con la unión de clases
+        self.group_keys = list(group_keys) if group_keys else [model_key]
+        if model_key not in self.group_keys:
+            self.group_keys.insert(0, model_key)
+
+        self.key_classes = {}
+        for key in self.group_keys:
+            model_classes_for_key = MODEL_CLASSES.get(key)
+            if model_classes_for_key is None:
+                logger.warning("%s: model_key '%s' no encontrado en MODEL_CLASSES. Usando default [0].", self.objectName(), key)
+                model_classes_for_key = [0]
+            self.key_classes[key] = list(model_classes_for_key)
+
+        if len(self.group_keys) == 1:
+            self.model_classes = self.key_classes[model_key]
         else:
-            self.model_classes = model_classes_for_key
+            self.model_classes = sorted({c for classes in self.key_classes.values() for c in classes})
 
         model_path_str = str(model_path)
-        logger.info("YOLO: solicitando modelo '%s' desde %s para %s", self.model_key, model_path_str, self.objectName())
-        
-        if model_path_str in yolo_model_cache:
-            self.model = yolo_model_cache[model_path_str]
-            logger.info("YOLO Cache: usando modelo '%s' desde caché para %s", self.model_key, self.objectName())
-        else:
-            try:
-                self.model = YOLO(model_path_str)
-                try:
-                    self.model.to(self.device)
-                except Exception:
-                    logger.warning("%s: model.to(%s) failed; relying on predict device parameter", self.objectName(), self.device)
-                yolo_model_cache[model_path_str] = self.model
-                logger.info("YOLO Cache: modelo '%s' cargado y añadido a caché para %s", self.model_key, self.objectName())
-            except Exception as e:
-                logger.error("Failed to load model %s for %s: %s", model_path_str, self.objectName(), e)
-                raise e
+
+        # Backend de inferencia: Ultralytics (PyTorch) o modelo exportado ONNX/OpenVINO,
+        # obtenido del registro compartido con conteo de referencias. La carga se hace
+        # en el propio hilo (run) para no bloquear la interfaz al arrancar.
+        self.backend_name = backend or "ultralytics"
+        self._server_config = build_server_config(inference_server)
+        if self._server_config["enabled"]:
+            # El batch entre cámaras necesita una única instancia compartida
+            model_policy = "shared_lock"
+        self._model_path_str = model_path_str
+        self._model_policy = model_policy
+        self.model_handle = None
+        self.backend = None
+        self.model = None
+        self._startup_task = False
 
         self.confidence = confidence
         self.imgsz = imgsz
         self.track = track
         self.lost_ttl = lost_ttl
         logger.debug(
-            "%s: Initialized with model_key=%s path=%s classes=%s conf=%s imgsz=%s track=%s lost_ttl=%s",
+            "%s: Initialized with model_key=%s group=%s path=%s classes=%s conf=%s imgsz=%s track=%s lost_ttl=%s",
             self.objectName(),
             self.model_key,
+            self.group_keys,
             model_path_str,
             self.model_classes,
             self.confidence,
@@ -110,203 +176,572 @@ class DetectorWorker(QThread):
             self.lost_ttl,
         )
 
-        self.frame = None
-        self.frame_id = None
+        # Servidor de inferencia compartido entre cámaras (opcional), se obtiene junto al modelo
+        self.inference_server = None
+        self.client_id = f"{camera_id if camera_id is not None else id(self)}:{self.model_key}"
+
+        # Inferencia por teselas para objetos pequeños y lejanos
+        self.tiling = build_tiling_config(tiling)
+        self._grid = (frozenset(), 1, 1)
+        self.last_tile_count = 0
+        if self.tiling["enabled"]:
+            logger.info("%s: modo teselas activo %s", self.objectName(), self.tiling)
+
+        # Entradas preparadas compartidas con los otros modelos de la cámara (solo backends exportados)
+        self.preprocess_cache = preprocess_cache
+
+        # Cascada: un modelo rápido propone candidatos y este modelo los confirma
+        # sobre recortes a resolución nativa. Solo aplica al worker del verificador.
+        self.cascade_config = build_cascade_config(cascade)
+        if self.cascade_config["enabled"] and self.cascade_config["verifier"] not in self.group_keys:
+            self.cascade_config["enabled"] = False
+        self.cascade = None
+        self._proposer_handle = None
+
+        # Recorte a la región habilitada de la grilla; se recalcula en set_grid
+        self.roi = build_roi_config(roi)
+        self._roi = (None, 1, 1, {})
+        self.last_roi_ratio = 1.0
+
+        # Entrada rectangular según el aspecto del stream y escalera de resolución
+        self.rect = bool(rect)
+        self.ladder = ResolutionLadder(resolution_ladder, name=self.objectName())
+        self._rect_shapes = {}
+        self.last_input_shape = normalize_shape(imgsz)
+        self.last_padding = 0.0
+        self._last_shape_key = None
+
+        # Buzón de un solo frame: el más reciente reemplaza al no consumido
+        self.mailbox = FrameMailbox()
+        self.frames_processed = 0
+        self.latency_ms = 0.0  # Media móvil del tiempo por frame (inferencia + salida)
+        self._summary = LogSampler(100)
         self.running = False
         
+        # Un tracker por clave para no mezclar IDs entre modelos agrupados
+        self.trackers = {}
         if self.track:
-            self.tracker = AdvancedTracker(
-                conf_threshold=self.confidence,
-                device=self.device,
-                lost_ttl=self.lost_ttl,
-            )
-        else:
-            self.tracker = None
+            for key in self.group_keys:
+                self.trackers[key] = AdvancedTracker(
+                    conf_threshold=self.confidence,
+                    device=self.device,
+                    lost_ttl=self.lost_ttl,
+                )
+        self.tracker = self.trackers.get(self.model_key)
         
         self.recently_captured_track_ids = set()
         # ELIMINADA: self.active_savers = []  # Ya no manejamos ImageSaverThread aquí
 
     # ELIMINADA: def _remove_active_saver() - ya no es necesaria
 
+    def _acquire_model(self, model_path_str, imgsz, policy):
+        if self.backend_name != "ultralytics":
+            key = ModelKey(model_path_str, self.backend_name, "cpu", normalize_shape(imgsz))
+            try:
+                handle = model_registry.acquire(
+                    key,
+                    lambda: create_backend(self.backend_name, model_path_str, self.device, imgsz),
+                    policy=policy,
+                    owner=self.objectName(),
+                )
+                logger.info("%s: usando backend '%s' para '%s'", self.objectName(), self.backend_name, self.model_key)
+                return handle
+            except Exception as e:
+                logger.warning("%s: backend '%s' no disponible (%s); usando ultralytics", self.objectName(), self.backend_name, e)
+                self.backend_name = "ultralytics"
+
+        logger.info("YOLO: solicitando modelo '%s' desde %s para %s", self.model_key, model_path_str, self.objectName())
+        key = ModelKey(model_path_str, "ultralytics", self.device, None)
+        return model_registry.acquire(
+            key,
+            lambda: self._load_ultralytics_backend(model_path_str),
+            policy=policy,
+            owner=self.objectName(),
+        )
+
+    def start(self, *args, **kwargs):
+        # La carga se registra aquí, en el hilo de la GUI: un seal() inmediatamente
+        # posterior ya la ve pendiente aunque run() todavía no haya empezado
+        if not self._startup_task:
+            self._startup_task = True
+            startup_profiler.task_started()
+        super().start(*args, **kwargs)
+
+    def _load_model(self):
+        """Acquire the model (and shared server), then warm it up.
+
+        Runs on the worker thread; frames posted meanwhile wait in the mailbox.
+        The startup profiler task registered by :meth:`start` ends here.
+        """
+        started = time.perf_counter()
+        try:
+            self.model_handle = self._acquire_model(self._model_path_str, self.imgsz, self._model_policy)
+            self.backend = self.model_handle
+            self.model = self.model_handle.model
+            if self._server_config["enabled"]:
+                self.inference_server = acquire_inference_server(
+                    self._model_path_str, self.backend, self.device, self.client_id, self._server_config
+                )
+                logger.info("%s: usando servidor de inferencia compartido %s", self.objectName(), self.inference_server.objectName())
+            if self.cascade_config["enabled"]:
+                self._load_cascade()
+            self._warm_up()
+            for tracker in self.trackers.values():
+                tracker.warm_up()
+            return True
+        except Exception as e:
+            logger.error("%s: no se pudo cargar el modelo '%s': %s", self.objectName(), self.model_key, e)
+            return False
+        finally:
+            if self._startup_task:
+                self._startup_task = False
+                startup_profiler.task_finished(f"modelo {self.model_key} ({self.backend_name})", time.perf_counter() - started)
+
+    def _load_cascade(self):
+        cfg = self.cascade_config
+        proposer = cfg["proposer"]
+        self._proposer_handle = self._acquire_model(
+            str(resolve_model_path(proposer)), cfg["proposer_imgsz"], self._model_policy
+        )
+        self.cascade = CascadeStage(
+            cfg,
+            self._proposer_handle,
+            self.model_handle,
+            MODEL_CLASSES.get(proposer, [0]),
+            self.model_classes,
+            self.confidence,
+            name=self.objectName(),
+        )
+        logger.info("%s: cascada activa, '%s' propone y '%s' verifica", self.objectName(), proposer, self.model_key)
+
+    def _warm_up(self):
+        """Run one dummy forward pass so the first real frame is not slow."""
+        h, w = normalize_shape(self.imgsz)
+        dummy = np.zeros((h, w, 3), dtype=np.uint8)
+        started = time.perf_counter()
+        if self.model_handle.warm_up([dummy], classes=self.model_classes, conf=self.confidence, imgsz=self.imgsz):
+            logger.info("%s: modelo precalentado en %.0f ms", self.objectName(), (time.perf_counter() - started) * 1000)
+        if self.cascade is not None:
+            self._proposer_handle.warm_up(
+                [dummy], classes=self.cascade.proposer_classes, conf=self.cascade_config["proposer_conf"],
+                imgsz=self.cascade_config["proposer_imgsz"],
+            )
+
+    def _load_ultralytics_backend(self, model_path_str):
+        from ultralytics import YOLO
+
+        try:
+            model = YOLO(model_path_str)
+            try:
+                model.to(self.device)
+            except Exception:
+                logger.warning("%s: model.to(%s) failed; relying on predict device parameter", self.objectName(), self.device)
+            logger.info("YOLO: modelo '%s' cargado para %s", self.model_key, self.objectName())
+            return UltralyticsBackend(model, self.device)
+        except Exception as e:
+            logger.error("Failed to load model %s for %s: %s", model_path_str, self.objectName(), e)
+            raise e
+
     def set_frame(self, frame, frame_id=None):
         logger.debug("%s: set_frame called. type=%s is_ndarray=%s", self.objectName(), type(frame), isinstance(frame, np.ndarray))
-        if isinstance(frame, np.ndarray):
+        if isinstance(frame, (np.ndarray, YuvFrame)):
             logger.debug("%s: Frame shape %s id=%s", self.objectName(), frame.shape, frame_id)
-            self.frame = frame
-            self.frame_id = frame_id
+            if self.mailbox.put(frame, frame_id):
+                logger.debug("%s: frame anterior descartado sin procesar", self.objectName())
+
+    def set_grid(self, discarded_cells, filas, columnas):
+        """Update the analytics grid used to skip fully discarded regions."""
+        discarded = frozenset(tuple(c) for c in (discarded_cells or ()))
+        filas, columnas = int(filas), int(columnas)
+        self._grid = (discarded, filas, columnas)
+        roi_cells = None
+        if self.roi["enabled"]:
+            roi_cells = compute_roi_cells(
+                discarded, filas, columnas, self.roi["max_rects"], self.roi["merge_slack"]
+            )
+            logger.info("%s: ROI recalculada %s", self.objectName(), roi_cells)
+        # Se reemplaza la tupla completa; los píxeles se calculan por tamaño de frame
+        self._roi = (roi_cells, filas, columnas, {})
+
+    def _roi_rects(self, frame_w, frame_h):
+        """Pixel crops for the current ROI, or ``None`` to use the full frame."""
+        roi_cells, filas, columnas, cache = self._roi
+        if roi_cells is None:
+            return None
+        size = (frame_w, frame_h)
+        if size not in cache:
+            rects = roi_to_pixels(roi_cells, filas, columnas, frame_w, frame_h, self.roi["margin"])
+            if rects and roi_area_ratio(rects, frame_w, frame_h) > self.roi["max_area_ratio"]:
+                rects = None
+            cache[size] = rects
+        return cache[size]
+
+    def get_stats(self):
+        """Return mailbox counters (posted/consumed/overwritten) for this worker."""
+        stats = self.mailbox.get_stats()
+        stats["processed"] = self.frames_processed
+        stats["latency_ms"] = self.latency_ms
+        if self.tiling["enabled"]:
+            stats["tiles"] = self.last_tile_count
+        stats["roi_ratio"] = round(self.last_roi_ratio, 3)
+        stats["imgsz"] = self.last_input_shape
+        stats["padding"] = round(self.last_padding, 3)
+        if self.ladder.enabled:
+            stats["ladder"] = self.ladder.get_status()
+        if self.cascade is not None:
+            stats["cascade"] = self.cascade.get_stats()
+        return stats
+
+    def _resolve_frame(self, frame):
+        """Return ``(image, sx, sy)``: the RGB array to predict on and the box scale back to the frame.
+
+        A :class:`YuvFrame` on the plain full-frame path is converted
+        straight at the detector's input size, in this thread; tiling, ROI,
+        cascade, the resolution ladder and per-key tracking need native
+        pixels and get the full-size conversion.
+        """
+        if not isinstance(frame, YuvFrame):
+            return frame, 1.0, 1.0
+        native = self.track or self.tiling["enabled"] or self.cascade is not None or self.ladder.enabled
+        if native or self._roi_rects(frame.width, frame.height) is not None:
+            return frame.to_rgb(), 1.0, 1.0
+        w, h = fit_size(frame.width, frame.height, max(normalize_shape(self.imgsz)))
+        return frame.to_rgb((w, h)), frame.width / w, frame.height / h
+
+    def _predict(self, frame, frame_id=None):
+        """Return ``(xyxy, cls, conf)`` for ``frame``, tiled or cropped if configured."""
+        if self.cascade is not None:
+            return self.cascade.run(frame)
+        if self.tiling["enabled"]:
+            return self._predict_tiled(frame)
+        frame_h, frame_w = frame.shape[:2]
+        rects = self._roi_rects(frame_w, frame_h)
+        if rects is None:
+            self.last_roi_ratio = 1.0
+            return self._predict_full(frame, frame_id)
+        self.last_roi_ratio = roi_area_ratio(rects, frame_w, frame_h)
+        return self._predict_roi(frame, rects)
+
+    def _predict_roi(self, frame, rects):
+        """Run only the enabled-cell crops and map the boxes back to the frame."""
+        if not rects:
+            # Toda la grilla descartada: no hay nada que inferir
+            return merge_detections([])
+        crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in rects]
+        if self.inference_server is not None or self.rect or self.ladder.enabled:
+            # Cada recorte lleva su propia forma de entrada
+            results = [self._predict_full(crop) for crop in crops]
+            if any(res is None for res in results):
+                return None
+        else:
+            results = self.backend.predict(
+                crops, classes=self.model_classes, conf=self.confidence, imgsz=self.imgsz
+            )
+        parts = [offset_detections(res, x1, y1) for (x1, y1, _, _), res in zip(rects, results)]
+        if len(parts) == 1:
+            return parts[0]
+        return merge_detections(parts, self.roi["merge_iou"])
+
+    def _predict_tiled(self, frame):
+        """Run overlapping native-resolution tiles and merge them with cross-tile NMS.
+
+        Tiles lying entirely on discarded grid cells are skipped. Classes not
+        listed in ``tiling["classes"]`` are detected on the full frame only.
+        """
+        cfg = self.tiling
+        frame_h, frame_w = frame.shape[:2]
+        discarded, filas, columnas = self._grid
+        tiles = [
+            t for t in generate_tiles(frame_w, frame_h, cfg["tile_size"], cfg["overlap"])
+            if not tile_is_discarded(t, discarded, filas, columnas, frame_w, frame_h)
+        ]
+        if cfg["classes"] is None:
+            tile_classes = list(self.model_classes)
+        else:
+            tile_classes = [c for c in self.model_classes if c in cfg["classes"]]
+
+        parts = []
+        if cfg["full_frame"] or len(tile_classes) < len(self.model_classes):
+            full = self._predict_full(frame)
+            if full is None:
+                return None
+            parts.append(full)
+
+        if tile_classes and tiles:
+            batch = max(1, int(cfg["max_batch"]))
+            for start in range(0, len(tiles), batch):
+                chunk = tiles[start:start + batch]
+                crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in chunk]
+                results = self.backend.predict(
+                    crops, classes=tile_classes, conf=self.confidence, imgsz=cfg["tile_size"]
+                )
+                for (x1, y1, _, _), res in zip(chunk, results):
+                    parts.append(offset_detections(res, x1, y1))
+
+        self.last_tile_count = len(tiles)
+        logger.debug("%s: %d teselas procesadas", self.objectName(), len(tiles))
+        return merge_detections(parts, cfg["merge_iou"])
+
+    def _predict_full(self, frame, frame_id=None):
+        """Run the backend on ``frame`` (directly or through the shared server).
+
+        With a ``frame_id`` and a preprocessing cache, exported backends reuse
+        the letterboxed input prepared by another model for the same frame.
+        Returns ``(xyxy, cls, conf)`` arrays in frame coordinates.
+        """
+        imgsz = self._input_shape(frame.shape[1], frame.shape[0])
+        if self.inference_server is not None:
+            return self.inference_server.predict(
+                self.client_id,
+                frame,
+                camera_id=self.camera_id,
+                classes=self.model_classes,
+                conf=self.confidence,
+                imgsz=imgsz,
+            )
+        if frame_id is not None and self.preprocess_cache is not None and hasattr(self.model, "prepare"):
+            model = self.model
+            prepared = self.preprocess_cache.get(
+                frame_id, model.imgsz, model.input_norm, lambda: model.prepare(frame)
+            )
+            return self.backend.predict(
+                [frame], classes=self.model_classes, conf=self.confidence, imgsz=imgsz, prepared=[prepared]
+            )[0]
+        return self.backend.predict(
+            [frame],
+            classes=self.model_classes,
+            conf=self.confidence,
+            imgsz=imgsz,
+        )[0]
+
+    def _input_shape(self, frame_w, frame_h):
+        """Network input for an image of ``frame_w`` x ``frame_h``.
+
+        Square ``imgsz`` unless rectangular inference or the resolution
+        ladder is enabled; exported backends keep their fixed shape anyway.
+        """
+        if self.ladder.enabled:
+            shape = self.ladder.shape_for(frame_w, frame_h)
+        elif self.rect:
+            shape = self._rect_shapes.get((frame_w, frame_h))
+            if shape is None:
+                shape = rect_shape(frame_w, frame_h, max(normalize_shape(self.imgsz)))
+                self._rect_shapes[(frame_w, frame_h)] = shape
+        else:
+            shape = normalize_shape(self.imgsz)
+        if (shape, frame_w, frame_h) != self._last_shape_key:
+            self._last_shape_key = (shape, frame_w, frame_h)
+            self.last_input_shape = shape
+            self.last_padding = padding_ratio(frame_w, frame_h, shape)
+        return shape if self.rect or self.ladder.enabled else self.imgsz
+
+    def _extract_detections(self, yolo_results, frame_w, frame_h):
+        """Clamp the backend's ``(xyxy, cls, conf)`` arrays to the frame."""
+        xyxy, cls, conf = yolo_results
+        raw_count = len(xyxy)
+        detections = clamp_boxes(xyxy, cls, conf, frame_w, frame_h)
+
+        logger.debug("%s: Procesadas %d detecciones válidas de %d totales", 
+                   self.objectName(), len(detections[0]), raw_count)
+        return detections
+
+    def _detections_for_key(self, detections, model_key):
+        """Select and remap the detections that belong to ``model_key``.
+
+        When several keys share one pass the union of classes was requested,
+        so each key keeps only its own ``MODEL_CLASSES`` before remapping.
+        """
+        xyxy, cls, conf = detections
+        if len(self.group_keys) > 1:
+            xyxy, cls, conf = select_classes(xyxy, cls, conf, self.key_classes[model_key])
+
+        # Aplicar remapeo de clases si existe
+        cls = remap_classes(cls, CLASS_REMAP.get(model_key))
+        return to_detections(xyxy, cls, conf)
+
+    def _build_output(self, current_detections, frame, model_key, frame_w, frame_h):
+        """Apply the per-key tracker (if enabled) and build the signal payload."""
+        tracker = self.trackers.get(model_key)
+        # Aplicar tracking si está habilitado
+        if self.track and tracker is not None and current_detections:
+            try:
+                tracks = tracker.update(current_detections, frame=frame)
+                logger.debug("%s: Tracker devolvió %d tracks de %d detecciones", 
+                           self.objectName(), len(tracks), len(current_detections))
+                
+                debug = logger.isEnabledFor(logging.DEBUG)
+                output_for_signal = []
+                for j, trk in enumerate(tracks):
+                    bbox = trk['bbox']
+                    x1, y1, x2, y2 = map(int, bbox)
+                    
+                    # Verificar límites otra vez por seguridad
+                    x1 = max(0, min(x1, frame_w - 1))
+                    y1 = max(0, min(y1, frame_h - 1))
+                    x2 = max(0, min(x2, frame_w - 1))
+                    y2 = max(0, min(y2, frame_h - 1))
+                    
+                    if x2 <= x1 or y2 <= y1:
+                        logger.warning("%s: Track %d bbox inválido después de tracking: (%d,%d,%d,%d)",
+                                       self.objectName(), j, x1, y1, x2, y2)
+                        continue
+                    
+                    track_data = {
+                        'bbox': (x1, y1, x2, y2),
+                        'id': trk['id'],
+                        'cls': trk['cls'],
+                        'conf': trk['conf'],
+                        'centers': trk['centers'],
+                        'moving': trk.get('moving'),
+                    }
+                    
+                    output_for_signal.append(track_data)
+                    
+                    if debug:
+                        logger.debug("%s: Track %d: ID=%s bbox=(%d,%d,%d,%d) cls=%s conf=%.3f",
+                                     self.objectName(), j, trk['id'], x1, y1, x2, y2, trk['cls'], trk['conf'])
+                return output_for_signal
+                    
+            except Exception as e:
+                logger.error("%s: Error en tracker: %s", self.objectName(), e)
+                # Fallback: usar detecciones sin tracking
+                output_for_signal = [
+                    {
+                        'bbox': (int(d['bbox'][0]), int(d['bbox'][1]), int(d['bbox'][2]), int(d['bbox'][3])),
+                        'cls': d['cls'],
+                        'conf': d['conf'],
+                        'id': i,  # ID temporal
+                    }
+                    for i, d in enumerate(current_detections)
+                ]
+                logger.info("%s: Fallback - usando %d detecciones sin tracking", self.objectName(), len(output_for_signal))
+                return output_for_signal
+
+        # Sin tracking: emitir detecciones directamente
+        output_for_signal = [
+            {
+                'bbox': (int(d['bbox'][0]), int(d['bbox'][1]), int(d['bbox'][2]), int(d['bbox'][3])),
+                'cls': d['cls'],
+                'conf': d['conf'],
+                'id': i,  # ID temporal
+            }
+            for i, d in enumerate(current_detections)
+        ]
+        logger.debug("%s: Sin tracking - emitiendo %d detecciones directas", self.objectName(), len(output_for_signal))
+        return output_for_signal
 
     def run(self):
         self.running = True
-        if not hasattr(self, 'model'):
+        if not self._load_model():
             logger.error("%s: Modelo no cargado. Deteniendo hilo", self.objectName())
             return
+        if self.mailbox.closed:
+            # stop() llegó durante la carga
+            return
 
         logger.info("%s: Iniciando bucle de detección", self.objectName())
         
-        while self.running:
-            if self.frame is not None:
+        while self.running and not self.mailbox.closed:
+            item = self.mailbox.take(500)
+            if item is not None:
                 logger.debug("%s: Processing new frame", self.objectName())
-                current_frame_to_process = self.frame
-                current_frame_id = self.frame_id if self.frame_id is not None else 0
-                frame_h, frame_w = current_frame_to_process.shape[:2]
-                self.frame = None
-                self.frame_id = None
-                
-                logger.info(f"%s: Frame dimensions: {frame_w}x{frame_h}", self.objectName())
-                
-                try:
-                    logger.debug("%s: Calling model.predict classes=%s conf=%s imgsz=%s", 
-                               self.objectName(), self.model_classes, self.confidence, self.imgsz)
-                    
-                    # Realizar predicción con YOLO
-                    yolo_results = self.model.predict(
-                        source=current_frame_to_process, 
-                        classes=self.model_classes, 
-                        conf=self.confidence, 
-                        imgsz=self.imgsz, 
-                        verbose=False, 
-                        device=self.device,
-                        save=False,
-                        show=False
-                    )[0]
-                    
-                    logger.info("%s: model.predict successful. Raw boxes count %s", 
-                               self.objectName(), len(yolo_results.boxes) if yolo_results.boxes is not None else 0)
-                    
-                except Exception as e:
-                    logger.error("%s: error durante model.predict: %s", self.objectName(), e)
-                    self.msleep(100)
-                    continue
+                current_frame_to_process, current_frame_id = item
+                if current_frame_id is None:
+                    current_frame_id = 0
+                self.process_frame(current_frame_to_process, current_frame_id, self.result_ready.emit)
 
-                current_detections = []
-                
-                # Procesar resultados de YOLO
-                if yolo_results.boxes is not None and len(yolo_results.boxes) > 0:
-                    for i, r in enumerate(yolo_results.boxes):
-                        try:
-                            # Obtener coordenadas originales
-                            xyxy = r.xyxy[0].tolist()
-                            x1_orig, y1_orig, x2_orig, y2_orig = xyxy
-                            
-                            # Aplicar límites del frame
-                            x1 = int(max(0, min(x1_orig, frame_w - 1)))
-                            y1 = int(max(0, min(y1_orig, frame_h - 1)))
-                            x2 = int(max(0, min(x2_orig, frame_w - 1)))
-                            y2 = int(max(0, min(y2_orig, frame_h - 1)))
-                            
-                            # Verificar que el box sea válido
-                            if x2 <= x1 or y2 <= y1:
-                                logger.warning(f"%s: Box inválido ignorado: original=({x1_orig:.1f},{y1_orig:.1f},{x2_orig:.1f},{y2_orig:.1f}) -> clamped=({x1},{y1},{x2},{y2})", self.objectName())
-                                continue
-                                
-                            cls = int(r.cls[0])
-                            conf = float(r.conf[0])
-                            
-                            # Debug: Imprimir coordenadas originales vs procesadas
-                            logger.info(f"%s: Detection {i}: original=({x1_orig:.1f},{y1_orig:.1f},{x2_orig:.1f},{y2_orig:.1f}) -> final=({x1},{y1},{x2},{y2}) cls={cls} conf={conf:.3f}", 
-                                       self.objectName())
-                            
-                            # Aplicar remapeo de clases si existe
-                            remap_dict = CLASS_REMAP.get(self.model_key)
-                            if remap_dict:
-                                original_cls = cls
-                                cls = remap_dict.get(cls, cls)
-                                if original_cls != cls:
-                                    logger.info(f"%s: Class remapped: {original_cls} -> {cls}", self.objectName())
-                            
-                            current_detections.append({
-                                'bbox': [x1, y1, x2, y2], 
-                                'cls': cls, 
-                                'conf': conf
-                            })
-                            
-                        except Exception as e:
-                            logger.error("%s: Error procesando detección individual %d: %s", self.objectName(), i, e)
-                            continue
-
-                logger.info("%s: Procesadas %d detecciones válidas de %d totales", 
-                           self.objectName(), len(current_detections), 
-                           len(yolo_results.boxes) if yolo_results.boxes is not None else 0)
-
-                # Aplicar tracking si está habilitado
-                if self.track and current_detections:
-                    try:
-                        tracks = self.tracker.update(current_detections, frame=current_frame_to_process)
-                        logger.info("%s: Tracker devolvió %d tracks de %d detecciones", 
-                                   self.objectName(), len(tracks), len(current_detections))
-                        
-                        output_for_signal = []
-                        for j, trk in enumerate(tracks):
-                            bbox = trk['bbox']
-                            x1, y1, x2, y2 = map(int, bbox)
-                            
-                            # Verificar límites otra vez por seguridad
-                            x1 = max(0, min(x1, frame_w - 1))
-                            y1 = max(0, min(y1, frame_h - 1))
-                            x2 = max(0, min(x2, frame_w - 1))
-                            y2 = max(0, min(y2, frame_h - 1))
-                            
-                            if x2 <= x1 or y2 <= y1:
-                                logger.warning(f"%s: Track {j} bbox inválido después de tracking: ({x1},{y1},{x2},{y2})", self.objectName())
-                                continue
-                            
-                            track_data = {
-                                'bbox': (x1, y1, x2, y2),
-                                'id': trk['id'],
-                                'cls': trk['cls'],
-                                'conf': trk['conf'],
-                                'centers': trk['centers'],
-                                'moving': trk.get('moving'),
-                            }
-                            
-                            output_for_signal.append(track_data)
-                            
-                            logger.info(f"%s: Track {j}: ID={trk['id']} bbox=({x1},{y1},{x2},{y2}) cls={trk['cls']} conf={trk['conf']:.3f}", 
-                                       self.objectName())
-                            
-                    except Exception as e:
-                        logger.error("%s: Error en tracker: %s", self.objectName(), e)
-                        # Fallback: usar detecciones sin tracking
-                        output_for_signal = [
-                            {
-                                'bbox': (int(d['bbox'][0]), int(d['bbox'][1]), int(d['bbox'][2]), int(d['bbox'][3])),
-                                'cls': d['cls'],
-                                'conf': d['conf'],
-                                'id': i,  # ID temporal
-                            }
-                            for i, d in enumerate(current_detections)
-                        ]
-                        logger.info(f"%s: Fallback - usando {len(output_for_signal)} detecciones sin tracking", self.objectName())
-                else:
-                    # Sin tracking: emitir detecciones directamente
-                    output_for_signal = [
-                        {
-                            'bbox': (int(d['bbox'][0]), int(d['bbox'][1]), int(d['bbox'][2]), int(d['bbox'][3])),
-                            'cls': d['cls'],
-                            'conf': d['conf'],
-                            'id': i,  # ID temporal
-                        }
-                        for i, d in enumerate(current_detections)
-                    ]
-                    logger.info(f"%s: Sin tracking - emitiendo {len(output_for_signal)} detecciones directas", self.objectName())
-
-                logger.info("%s: Emitiendo %d detecciones finales para frame %d", 
-                           self.objectName(), len(output_for_signal), current_frame_id)
-                
-                # Debug final: Imprimir todas las detecciones que se van a emitir
+    def process_frame(self, current_frame_to_process, current_frame_id, emit):
+        """Run inference, post-processing and tracking on one frame.
+
+        ``emit(output, model_key, frame_id)`` is called once per key of the
+        group; ``run`` passes ``result_ready.emit``, the process worker a
+        collector. Returns False when the frame produced no results.
+        """
+        frame_h, frame_w = current_frame_to_process.shape[:2]
+        
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("%s: Frame dimensions: %dx%d", self.objectName(), frame_w, frame_h)
+        started = time.perf_counter()
+        
+        try:
+            logger.debug("%s: Calling model.predict classes=%s conf=%s imgsz=%s", 
+                       self.objectName(), self.model_classes, self.confidence, self.imgsz)
+            
+            current_frame_to_process, sx, sy = self._resolve_frame(current_frame_to_process)
+            # Realizar predicción con YOLO
+            yolo_results = self._predict(current_frame_to_process, current_frame_id)
+            if yolo_results is None:
+                return False
+            if sx != 1.0 or sy != 1.0:
+                yolo_results = scale_detections(yolo_results, sx, sy)
+            
+            logger.debug("%s: model.predict successful. Raw boxes count %s", 
+                       self.objectName(), len(yolo_results[0]))
+            
+        except Exception as e:
+            logger.error("%s: error durante model.predict: %s", self.objectName(), e)
+            self.msleep(100)
+            return False
+        finally:
+            if self.preprocess_cache is not None:
+                self.preprocess_cache.release(current_frame_id)
+
+        raw_detections = self._extract_detections(yolo_results, frame_w, frame_h)
+
+        if self.ladder.enabled:
+            xyxy = raw_detections[0]
+            min_side = None
+            if len(xyxy):
+                min_side = float(np.minimum(xyxy[:, 2] - xyxy[:, 0], xyxy[:, 3] - xyxy[:, 1]).min())
+            self.ladder.record(time.perf_counter() - started, min_side, frame_w, frame_h)
+
+        # Una sola pasada del modelo se reparte entre todas las claves del grupo
+        for model_key in self.group_keys:
+            current_detections = self._detections_for_key(raw_detections, model_key)
+            output_for_signal = self._build_output(
+                current_detections, current_frame_to_process, model_key, frame_w, frame_h
+            )
+
+            if debug:
+                logger.debug("%s: Emitiendo %d detecciones finales de '%s' para frame %d", 
+                           self.objectName(), len(output_for_signal), model_key, current_frame_id)
                 for k, det in enumerate(output_for_signal):
-                    bbox = det['bbox']
-                    logger.info(f"%s: FINAL Detection {k}: ID={det['id']} bbox={bbox} cls={det['cls']} conf={det['conf']:.3f}", 
-                               self.objectName())
-                
-                # Emitir resultados
-                self.result_ready.emit(output_for_signal, self.model_key, current_frame_id)
+                    logger.debug("%s: FINAL Detection %d: ID=%s bbox=%s cls=%s conf=%.3f",
+                                 self.objectName(), k, det['id'], det['bbox'], det['cls'], det['conf'])
+            
+            # Emitir resultados
+            emit(output_for_signal, model_key, current_frame_id)
 
-            self.msleep(10)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if self.frames_processed == 0:
+            self.latency_ms = elapsed_ms
+        else:
+            self.latency_ms = 0.8 * self.latency_ms + 0.2 * elapsed_ms
+        self.frames_processed += 1
+        # Resumen INFO muestreado; el detalle por frame solo con DEBUG
+        if self._summary.due() and logger.isEnabledFor(logging.INFO):
+            logger.info("%s: %d frames procesados, latencia media %.1f ms, %d detecciones en el último",
+                        self.objectName(), self.frames_processed, self.latency_ms, len(raw_detections[0]))
+        return True
 
     def stop(self):
         logger.info("%s: solicitando detener hilo", self.objectName() or id(self))
         self.running = False
+        self.mailbox.close()
         # ELIMINADO: Manejo de ImageSaverThread - ahora se hace en GestorAlertas
+        server = self.inference_server
+        if server is not None:
+            release_inference_server(server, self.client_id)
         self.wait()
+        if self.inference_server is not None and self.inference_server is not server:
+            # El servidor se obtuvo mientras el hilo cargaba el modelo
+            release_inference_server(self.inference_server, self.client_id)
+        self.inference_server = None
+        if self.model_handle is not None:
+            self.model_handle.release()
+            self.model_handle = None
+        if self._proposer_handle is not None:
+            self._proposer_handle.release()
+            self._proposer_handle = None
         logger.info("%s: hilo detenido correctamente", self.objectName())
\ No newline at end of file
@@ -0,0 +1,281 @@
+import math
+import threading
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, Qt, QTimer
+
+from core.decode_backends import FrameSkipper, create_decode_backend
+from core.preroll_buffer import EncodedFrame, encode_frame
+from core.yuv_frame import YuvFrame
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración por defecto del modo doble stream; se sobrescribe con la clave
+# "dual_stream" de cada cámara en config.json.
+DEFAULT_DUAL_STREAM_CONFIG = {
+    "enabled": False,
+    "perfil_sub": "sub",    # Perfil RTSP decodificado siempre: analítica, tracking y vista
+    "perfil_main": "main",  # Perfil RTSP de alta resolución para la evidencia
+    "backend": "opencv",    # Decodificación del stream principal ("opencv" o "pyav")
+    # "keyframes": abierto siempre decodificando solo I-frames; las fotos salen del
+    # I-frame más cercano a la detección y no hay clips del principal.
+    # "on_demand": se abre al pedir evidencia y da clips, pero abrir el RTSP suele
+    # tardar más que max_age_s, así que tras un periodo inactivo la foto sale del sub-stream.
+    "mode": "keyframes",
+    "linger_s": 15.0,       # Mantener abierto el principal tras la última petición ("on_demand")
+    "timeout_s": 5.0,       # Espera máxima por el primer frame de un clip; después se usa el sub-stream
+    # Distancia máxima entre el frame del principal y la detección para una foto:
+    # uno posterior puede no contener ya al objetivo en movimiento. Con un GOP de
+    # hasta 2 s siempre hay un I-frame a menos de 1 s.
+    "max_age_s": 1.0,
+    "buffer_frames": 32,    # Frames del principal retenidos mientras está abierto
+}
+
+
+def build_dual_stream_config(overrides=None):
+    config = DEFAULT_DUAL_STREAM_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    if config["backend"] not in ("opencv", "pyav"):
+        raise ValueError(f"El stream principal requiere un backend con hilo propio: {config['backend']}")
+    return config
+
+
+def map_box(bbox, src_size, dst_size):
+    """Map ``(x1, y1, x2, y2)`` from a ``(w, h)`` frame to another resolution of the same view."""
+    sx = dst_size[0] / float(src_size[0])
+    sy = dst_size[1] / float(src_size[1])
+    x1, y1, x2, y2 = bbox
+    return (
+        int(max(0, min(round(x1 * sx), dst_size[0] - 1))),
+        int(max(0, min(round(y1 * sy), dst_size[1] - 1))),
+        int(max(0, min(round(x2 * sx), dst_size[0] - 1))),
+        int(max(0, min(round(y2 * sy), dst_size[1] - 1))),
+    )
+
+
+def frame_size(frame):
+    """``(w, h)`` of a frame array."""
+    return frame.shape[1], frame.shape[0]
+
+
+class _Request:
+    __slots__ = ("callback", "started", "duration", "frames", "skipper", "limit", "encoding")
+
+    def __init__(self, callback, started, duration=None):
+        self.callback = callback
+        self.started = started
+        self.duration = duration
+        self.frames = []
+        self.skipper = None
+        self.limit = 0
+        self.encoding = None  # (ancho máximo, calidad JPEG) de los frames del clip
+
+
+class MainStreamEvidence(QObject):
+    """High-resolution evidence from a camera's main stream.
+
+    In ``keyframes`` mode (the default) the main stream stays open
+    decoding only key frames, so snapshots come from the nearest one; in
+    ``on_demand`` mode it is opened by the first request and closed
+    ``linger_s`` after the last one. :meth:`request_frame` calls back
+    with the RGB frame closest to the request, if one lies within
+    ``max_age_s`` of it (otherwise ``None``, so the caller falls back to
+    the sub-stream). :meth:`request_clip` calls back with the frames of
+    a duration, subsampled and JPEG-compressed as they arrive. Callbacks
+    run from :meth:`poll`, on the thread that owns this object; a timer
+    polls while requests are pending.
+    """
+
+    def __init__(self, url, config=None, label="", backend=None, clock=time.monotonic, parent=None):
+        super().__init__(parent)
+        self.config = build_dual_stream_config(config)
+        self.url = url
+        self.label = label
+        self._clock = clock
+        if backend is None:
+            mode = "keyframes" if self.config["mode"] == "keyframes" else "all"
+            backend = create_decode_backend(
+                {"backend": self.config["backend"], "mode": mode}, label=f"{label}_main", parent=self
+            )
+        self.backend = backend
+        # El frame llega en el hilo de decodificación; solo se encola
+        self.backend.frame_ready.connect(self._on_frame, Qt.ConnectionType.DirectConnection)
+        self._lock = threading.Lock()
+        self._incoming = []
+        self._clips = []  # Clips en curso; los alimenta el hilo de decodificación
+        self._buffer = deque(maxlen=max(1, int(self.config["buffer_frames"])))
+        self._requests = []
+        self._last_request = None
+        self.open = False
+        self.opens = 0
+        self.frames_served = 0
+        self.clips_served = 0
+        self.timeouts = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(100)
+        self._timer.timeout.connect(self.poll)
+
+    def start(self):
+        """Open the main stream now when it is kept open (``keyframes`` mode)."""
+        if self.config["mode"] == "keyframes":
+            self._open()
+
+    def _open(self):
+        if self.open:
+            return
+        logger.info("%s: abriendo stream principal para evidencia", self.label)
+        self.backend.start(self.url)
+        self.open = True
+        self.opens += 1
+        self._timer.start()
+
+    def _close(self):
+        if not self.open:
+            return
+        logger.info("%s: cerrando stream principal", self.label)
+        # Se llama desde poll() en el hilo de la GUI: un grab() bloqueado en RTSP
+        # no debe congelar la interfaz, el hilo de decodificación termina solo
+        self.backend.stop(wait=False)
+        self.open = False
+        self._buffer.clear()
+        with self._lock:
+            self._incoming = []
+        self._timer.stop()
+
+    def _on_frame(self, frame):
+        if not self.open:
+            # Frame rezagado de un hilo ya detenido
+            return
+        if isinstance(frame, YuvFrame):
+            frame = frame.to_rgb()
+        now = self._clock()
+        with self._lock:
+            self._incoming.append((now, frame))
+            clips = [
+                clip for clip in self._clips
+                if clip.started <= now <= clip.started + clip.duration
+                and len(clip.frames) < clip.limit
+                and clip.skipper.want(now)
+            ]
+        # Se comprime aquí, en el hilo de decodificación: el clip nunca retiene frames crudos
+        encoded = {}
+        for clip in clips:
+            if clip.encoding not in encoded:
+                result = encode_frame(frame, *clip.encoding)
+                encoded[clip.encoding] = EncodedFrame(result[0], result[1], now) if result else None
+            if encoded[clip.encoding] is not None:
+                with self._lock:
+                    clip.frames.append(encoded[clip.encoding])
+
+    def request_frame(self, callback):
+        """Call ``callback(frame)`` with a fresh main-stream frame, or ``None`` on timeout."""
+        self._add(_Request(callback, self._clock()))
+
+    def request_clip(self, duration_s, callback, fps=10, max_width=1280, quality=80):
+        """Call ``callback(frames)`` with the main-stream frames of the next ``duration_s``.
+
+        Frames are kept at ``fps`` (at most ``duration_s * fps``), downscaled
+        to ``max_width`` and handed over as
+        :class:`~core.preroll_buffer.EncodedFrame`. ``keyframes`` mode has no
+        full-rate frames, so it answers an empty list at once.
+        """
+        if self.config["mode"] == "keyframes":
+            self._call(callback, [])
+            return
+        request = _Request(callback, self._clock(), float(duration_s))
+        request.skipper = FrameSkipper(fps)
+        request.limit = max(1, int(math.ceil(float(duration_s) * float(fps))))
+        request.encoding = (int(max_width or 0), int(quality))
+        with self._lock:
+            self._clips.append(request)
+        self._add(request)
+
+    def _add(self, request):
+        self._requests.append(request)
+        self._last_request = request.started
+        self._open()
+        self.poll()
+
+    def poll(self):
+        """Serve pending requests from the frames received; close an idle stream."""
+        now = self._clock()
+        with self._lock:
+            incoming, self._incoming = self._incoming, []
+        self._buffer.extend(incoming)
+
+        pending = []
+        for request in self._requests:
+            if request.duration is None:
+                served = self._serve_frame(request, now)
+            else:
+                served = self._serve_clip(request, now)
+            if not served:
+                pending.append(request)
+        self._requests = pending
+
+        idle = self._last_request is None or now - self._last_request >= float(self.config["linger_s"])
+        if self.config["mode"] == "on_demand" and not self._requests and idle:
+            self._close()
+
+    def _serve_frame(self, request, now):
+        max_age = float(self.config["max_age_s"])
+        # Solo frames cercanos a la detección, antes o después: la caja del
+        # sub-stream no sirve para recortar un frame tomado segundos más tarde
+        near = [(abs(ts - request.started), frame) for ts, frame in self._buffer if abs(ts - request.started) <= max_age]
+        if near:
+            self.frames_served += 1
+            self._call(request.callback, min(near, key=lambda item: item[0])[1])
+            return True
+        if now - request.started > max_age:
+            # Los frames se marcan al llegar: ya no puede llegar uno dentro del margen
+            self.timeouts += 1
+            logger.warning("%s: sin frame del stream principal a ±%.1f s de la detección", self.label, max_age)
+            self._call(request.callback, None)
+            return True
+        return False
+
+    def _serve_clip(self, request, now):
+        if now < request.started + request.duration:
+            return False
+        with self._lock:
+            frames = list(request.frames)
+        if not frames and now - request.started < request.duration + float(self.config["timeout_s"]):
+            # El principal aún no entregó nada: se espera hasta el timeout
+            return False
+        with self._lock:
+            self._clips.remove(request)
+        if frames:
+            self.clips_served += 1
+        else:
+            self.timeouts += 1
+        self._call(request.callback, frames)
+        return True
+
+    def _call(self, callback, value):
+        try:
+            callback(value)
+        except Exception as e:
+            logger.error("%s: error entregando evidencia: %s", self.label, e)
+
+    def stop(self):
+        with self._lock:
+            self._clips = []
+        for request in self._requests:
+            self._call(request.callback, None if request.duration is None else list(request.frames))
+        self._requests = []
+        self._close()
+
+    def get_stats(self):
+        return {
+            "open": self.open,
+            "opens": self.opens,
+            "frames_served": self.frames_served,
+            "clips_served": self.clips_served,
+            "timeouts": self.timeouts,
+            "pending": len(self._requests),
+        }
@@ -0,0 +1,254 @@
+import threading
+import time
+import weakref
+
+import cv2
+import numpy as np
+from PyQt6.QtGui import QImage
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class SharedFrame:
+    """One decoded frame shared by every consumer of a camera.
+
+    ``image`` is an RGB888 ``QImage`` and ``array`` a read-only
+    ``(h, w, 3)`` NumPy view over the same memory, so display, detection
+    and buffering see one buffer without copying it. Consumers that need
+    to draw on the pixels must take their own copy. The frame lives as
+    long as any consumer keeps a reference to it.
+
+    A frame published from YUV planes (``yuv``) builds ``image``/``array``
+    on first access only; consumers that need a smaller image ask
+    :meth:`resized` and never pay the full-size conversion. A frame
+    published as an RGB ``array`` (threaded decode backends) wraps it in
+    ``image`` without copying. ``on_alloc(nbytes)``, if given, is told
+    about the buffers those lazy conversions allocate.
+    """
+
+    __slots__ = ("seq", "ts", "yuv", "on_alloc", "_image", "_array", "__weakref__")
+
+    def __init__(self, seq, ts, image=None, yuv=None, array=None, on_alloc=None):
+        if image is None and yuv is None and array is None:
+            raise ValueError("SharedFrame requiere una imagen, planos YUV o un array RGB")
+        if image is not None and image.format() != QImage.Format.Format_RGB888:
+            raise ValueError("SharedFrame requiere una imagen RGB888")
+        self.seq = seq
+        self.ts = ts
+        self.yuv = yuv
+        self.on_alloc = on_alloc
+        if yuv is not None and on_alloc is not None:
+            yuv.on_alloc = on_alloc
+        self._image = image
+        if array is not None:
+            array = np.ascontiguousarray(array, dtype=np.uint8)
+            array.flags.writeable = False
+        self._array = array
+
+    @property
+    def image(self):
+        if self._image is None:
+            array = self.array
+            # La QImage apunta a la memoria del array, que el frame mantiene vivo
+            self._image = QImage(array.data, array.shape[1], array.shape[0], array.strides[0], QImage.Format.Format_RGB888)
+        return self._image
+
+    @property
+    def array(self):
+        if self._array is None:
+            if self.yuv is not None:
+                self._array = self.yuv.to_rgb()
+            else:
+                image = self._image
+                h, w = image.height(), image.width()
+                bits = image.constBits()
+                bits.setsize(image.sizeInBytes())
+                # bytesPerLine puede incluir relleno de alineación al final de cada fila
+                array = np.ndarray((h, w, 3), dtype=np.uint8, buffer=bits, strides=(image.bytesPerLine(), 3, 1))
+                array.flags.writeable = False
+                self._array = array
+        return self._array
+
+    @property
+    def width(self):
+        if self.yuv is not None:
+            return self.yuv.width
+        return self._image.width() if self._image is not None else self._array.shape[1]
+
+    @property
+    def height(self):
+        if self.yuv is not None:
+            return self.yuv.height
+        return self._image.height() if self._image is not None else self._array.shape[0]
+
+    def resized(self, width):
+        """RGB array scaled to ``width`` (never upscaled), converted from YUV when possible."""
+        width = min(int(width), self.width)
+        height = max(1, int(round(self.height * width / self.width)))
+        if self.yuv is not None:
+            return self.yuv.to_rgb((width, height))
+        if width == self.width:
+            return self.array
+        resized = cv2.resize(self.array, (width, height), interpolation=cv2.INTER_AREA)
+        if self.on_alloc is not None:
+            self.on_alloc(resized.nbytes)
+        return resized
+
+    def view(self):
+        """:class:`FrameView` of this frame for consumers that only read regions."""
+        return FrameView(self)
+
+    def detection_input(self):
+        """What detectors receive: the YUV planes (converted in the worker) or the RGB array."""
+        return self.yuv if self.yuv is not None else self.array
+
+
+class FrameView:
+    """Read-only, array-like full-size view of a :class:`SharedFrame`.
+
+    Supports ``shape`` and 2-D slicing, which is all the tracker embedder
+    and the alert captures use. Slicing a YUV frame converts just that
+    region, on the thread that slices, so those consumers never force the
+    full-size RGB conversion; other frames slice their ``array``.
+    """
+
+    __slots__ = ("_frame", "shape")
+
+    dtype = np.dtype(np.uint8)
+    ndim = 3
+
+    def __init__(self, frame):
+        self._frame = frame
+        self.shape = (frame.height, frame.width, 3)
+
+    def __getitem__(self, key):
+        frame = self._frame
+        if frame.yuv is None or frame._array is not None:
+            return frame.array[key]
+        key = key if isinstance(key, tuple) else (key,)
+        rows = key[0]
+        cols = key[1] if len(key) > 1 else slice(None)
+        if not all(isinstance(s, slice) and s.step in (None, 1) for s in (rows, cols)):
+            return frame.array[key]
+        y1, y2, _ = rows.indices(self.shape[0])
+        x1, x2, _ = cols.indices(self.shape[1])
+        region = frame.yuv.crop(x1, y1, x2, y2)
+        return region[(slice(None), slice(None)) + key[2:]]
+
+
+class _Subscriber:
+    __slots__ = ("callback", "wants", "name")
+
+    def __init__(self, callback, wants, name):
+        self.callback = callback
+        self.wants = wants
+        self.name = name
+
+
+class FrameBus:
+    """Per-camera fan-out of decoded frames.
+
+    :meth:`publish` asks each subscriber whether it wants the frame and
+    runs the (expensive) conversion only if someone does, once, handing
+    the same :class:`SharedFrame` to all of them. Conversions and bytes
+    allocated are counted so the per-second cost can be compared with the
+    old per-consumer copies; this includes the lazy colour conversions
+    consumers trigger later (``array``, :meth:`SharedFrame.resized`,
+    :class:`FrameView` slices, detector inputs), on any thread.
+    """
+
+    def __init__(self, name="", clock=time.monotonic):
+        self.name = name
+        self._clock = clock
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self.seq = 0
+        self.published = 0
+        self.converted = 0
+        self.allocations = 0
+        self.bytes_allocated = 0
+        self.live = 0
+        self._window = (clock(), 0, 0)
+
+    def subscribe(self, callback, wants=None, name=""):
+        """Register ``callback(frame)``; ``wants(seq)`` filters frames before conversion."""
+        sub = _Subscriber(callback, wants, name or getattr(callback, "__name__", "subscriber"))
+        self._subscribers.append(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        if sub in self._subscribers:
+            self._subscribers.remove(sub)
+
+    def publish(self, convert, ts=None):
+        """Publish the next frame; ``convert()`` returns a ``QImage``, a
+        :class:`~core.yuv_frame.YuvFrame`, an RGB ``np.ndarray`` or ``None``.
+
+        Returns the :class:`SharedFrame` delivered, or ``None`` when no
+        subscriber wanted it or the conversion failed.
+        """
+        self.seq += 1
+        self.published += 1
+        seq = self.seq
+        interested = [s for s in self._subscribers if s.wants is None or s.wants(seq)]
+        if not interested:
+            return None
+
+        ts = self._clock() if ts is None else ts
+        image = convert()
+        if image is None:
+            return None
+        if isinstance(image, QImage):
+            if image.isNull():
+                return None
+            self._count_allocation(image.sizeInBytes())
+            if image.format() != QImage.Format.Format_RGB888:
+                image = image.convertToFormat(QImage.Format.Format_RGB888)
+                self._count_allocation(image.sizeInBytes())
+            frame = SharedFrame(seq, ts, image=image, on_alloc=self._count_allocation)
+        elif isinstance(image, np.ndarray):
+            self._count_allocation(image.nbytes)
+            frame = SharedFrame(seq, ts, array=image, on_alloc=self._count_allocation)
+        else:
+            # Planos YUV: las conversiones perezosas de los consumidores también se cuentan
+            self._count_allocation(image.nbytes)
+            frame = SharedFrame(seq, ts, yuv=image, on_alloc=self._count_allocation)
+        self.converted += 1
+        with self._lock:
+            self.live += 1
+        weakref.finalize(frame, self._frame_released)
+
+        for sub in interested:
+            try:
+                sub.callback(frame)
+            except Exception as e:
+                logger.error("%s: error en suscriptor %s del bus de frames: %s", self.name, sub.name, e)
+        return frame
+
+    def _count_allocation(self, nbytes):
+        # Las conversiones perezosas llegan también desde los hilos de los consumidores
+        with self._lock:
+            self.allocations += 1
+            self.bytes_allocated += int(nbytes)
+
+    def _frame_released(self):
+        with self._lock:
+            self.live -= 1
+
+    def get_stats(self):
+        """Counters plus per-second rates since the previous call."""
+        now = self._clock()
+        started, allocations, nbytes = self._window
+        elapsed = max(now - started, 1e-6)
+        stats = {
+            "published": self.published,
+            "converted": self.converted,
+            "live_frames": self.live,
+            "allocations_per_s": round((self.allocations - allocations) / elapsed, 2),
+            "mb_allocated_per_s": round((self.bytes_allocated - nbytes) / elapsed / 1e6, 2),
+            "subscribers": [s.name for s in self._subscribers],
+        }
+        self._window = (now, self.allocations, self.bytes_allocated)
+        return stats
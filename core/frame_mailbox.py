@@ -0,0 +1,83 @@
+from PyQt6.QtCore import QMutex, QWaitCondition
+
+
+class FrameMailbox:
+    """Single-slot "latest frame wins" mailbox between producer and worker.
+
+    ``put`` replaces any frame that has not been consumed yet and counts it
+    as overwritten; ``take`` blocks on a wait condition until a frame is
+    available, the timeout expires or the mailbox is closed.
+    """
+
+    def __init__(self):
+        self._mutex = QMutex()
+        self._wait = QWaitCondition()
+        self._frame = None
+        self._frame_id = None
+        self._has_frame = False
+        self._closed = False
+
+        self.posted = 0
+        self.consumed = 0
+        self.overwritten = 0
+
+    def put(self, frame, frame_id=None):
+        """Store ``frame``; return ``True`` if an unconsumed frame was dropped."""
+        self._mutex.lock()
+        try:
+            if self._closed:
+                return False
+            overwritten = self._has_frame
+            if overwritten:
+                self.overwritten += 1
+            self._frame = frame
+            self._frame_id = frame_id
+            self._has_frame = True
+            self.posted += 1
+            self._wait.wakeOne()
+            return overwritten
+        finally:
+            self._mutex.unlock()
+
+    def take(self, timeout_ms=500):
+        """Return ``(frame, frame_id)`` or ``None`` on timeout/close."""
+        self._mutex.lock()
+        try:
+            if not self._has_frame and not self._closed:
+                self._wait.wait(self._mutex, int(timeout_ms))
+            if not self._has_frame or self._closed:
+                return None
+            item = (self._frame, self._frame_id)
+            self._frame = None
+            self._frame_id = None
+            self._has_frame = False
+            self.consumed += 1
+            return item
+        finally:
+            self._mutex.unlock()
+
+    def close(self):
+        """Wake any waiting consumer and reject further frames."""
+        self._mutex.lock()
+        self._closed = True
+        self._frame = None
+        self._has_frame = False
+        self._wait.wakeAll()
+        self._mutex.unlock()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def get_stats(self):
+        self._mutex.lock()
+        try:
+            posted = self.posted
+            return {
+                "posted": posted,
+                "consumed": self.consumed,
+                "overwritten": self.overwritten,
+                "drop_ratio": self.overwritten / posted if posted else 0.0,
+            }
+        finally:
+            self._mutex.unlock()
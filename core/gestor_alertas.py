@@ -4,6 +4,8 @@ import cv2
 from datetime import datetime, timedelta
 from collections import defaultdict
 
+from core.dual_stream import frame_size, map_box
+
 # Importación robusta de ImageSaverThread con manejo de errores
 try:
     from gui.image_saver import ImageSaverThread
@@ -32,11 +34,14 @@ class GestorAlertas:
         self.box_streak = 0
         self.deteccion_bote_streak = 0
         self.capturas_realizadas = 0
+        self.capturas_total = 0
         self.max_capturas = 3
         self.ultimo_reset = datetime.now()
         self.temporal = set()
         self.hilos_guardado = []
         self.ultimas_posiciones = {}
+        self.capturas_dir = "capturas"  # Carpeta raíz de las capturas guardadas
+        self.evidencia = None  # MainStreamEvidence: capturas desde el stream principal (modo doble stream)
         
         # VARIABLES PARA CONTROL OPTIMIZADO DE CAPTURAS
         self.track_capture_history = {}  # track_id -> {"captured": bool, "best_conf": float, "last_capture_time": datetime}
@@ -262,21 +267,12 @@ class GestorAlertas:
 
                 # CREACIÓN PROTEGIDA DE IMAGESAVERTHREAD
                 try:
-                    hilo = ImageSaverThread(
-                        frame=frame,
-                        bbox=(x1, y1, x2, y2),
-                        cls=cls,
-                        coordenadas=(cx, cy),
-                        modelo=modelo,
-                        confianza=confidence
-                    )
-                    hilo.finished.connect(lambda h=hilo: self._eliminar_hilo(h))
-                    self.hilos_guardado.append(hilo)
-                    hilo.start()
+                    self._capturar(frame, (x1, y1, x2, y2), cls, (cx, cy), modelo, confidence)
 
                     # Actualizar historial y contadores
                     self._update_track_capture_history(track_id, confidence)
                     self.capturas_realizadas += 1
+                    self.capturas_total += 1
                     
                     # Solo mostrar log importante: captura realizada
                     log_callback(f"📸 Captura realizada - Track {track_id} - {tipo[:-1].capitalize()} (conf: {confidence:.2f})")
@@ -288,6 +284,37 @@ class GestorAlertas:
                     print(error_msg)
                     log_callback(error_msg)
 
+    def _capturar(self, frame, bbox, cls, coordenadas, modelo, confianza):
+        """Guarda la captura; en modo doble stream la toma del stream principal mapeando la caja"""
+        if self.evidencia is None:
+            self._lanzar_guardado(frame, bbox, cls, coordenadas, modelo, confianza)
+            return
+
+        def con_evidencia(frame_main):
+            if frame_main is None:
+                # El stream principal no respondió a tiempo: captura del sub-stream
+                self._lanzar_guardado(frame, bbox, cls, coordenadas, modelo, confianza)
+                return
+            bbox_main = map_box(bbox, frame_size(frame), frame_size(frame_main))
+            centro = ((bbox_main[0] + bbox_main[2]) // 2, (bbox_main[1] + bbox_main[3]) // 2)
+            self._lanzar_guardado(frame_main, bbox_main, cls, centro, modelo, confianza)
+
+        self.evidencia.request_frame(con_evidencia)
+
+    def _lanzar_guardado(self, frame, bbox, cls, coordenadas, modelo, confianza):
+        hilo = ImageSaverThread(
+            frame=frame,
+            bbox=bbox,
+            cls=cls,
+            coordenadas=coordenadas,
+            modelo=modelo,
+            confianza=confianza,
+            base_dir=self.capturas_dir
+        )
+        hilo.finished.connect(lambda h=hilo: self._eliminar_hilo(h))
+        self.hilos_guardado.append(hilo)
+        hilo.start()
+
     def _guardar(self, boxes, frame, log_callback, tipo, cam_data):
         """Método original mantenido para compatibilidad (ahora usa la versión optimizada)"""
         # Convertir formato si es necesario
@@ -0,0 +1,201 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from logging_utils import get_logger
+from core.preprocessing import letterbox, to_input_tensor, scale_boxes_back, normalize_shape
+from core.yolo_postprocess import boxes_to_arrays, decode_yolov8_output
+
+logger = get_logger(__name__)
+
+BACKENDS = ("ultralytics", "onnx", "onnx_int8", "openvino")
+
+# Modelos convertidos (ONNX/OpenVINO) se guardan junto a core/models
+MODEL_CACHE_DIR = Path(__file__).resolve().parent / "model_cache"
+
+
+class UltralyticsBackend:
+    """Ultralytics ``YOLO`` PyTorch path (default)."""
+
+    name = "ultralytics"
+
+    def __init__(self, model, device="cpu"):
+        self.model = model
+        self.device = device
+
+    def predict(self, frames, classes=None, conf=0.5, imgsz=640):
+        """Run ``frames`` and return one ``(xyxy, cls, conf)`` tuple per frame."""
+        results = self.model.predict(
+            source=list(frames),
+            classes=classes,
+            conf=conf,
+            imgsz=imgsz,
+            verbose=False,
+            device=self.device,
+            save=False,
+            show=False,
+        )
+        return [boxes_to_arrays(r.boxes) for r in results]
+
+
+class _ExportedBackend:
+    """Shared letterbox pre-processing and YOLOv8 decoding for exported models."""
+
+    name = None
+    # Normalización de la entrada: RGB float32 en [0, 1] (clave de PreprocessCache)
+    input_norm = "rgb_float01"
+
+    def __init__(self, model_path, imgsz=640):
+        self.model_path = str(model_path)
+        self.imgsz = normalize_shape(imgsz)
+        self.iou = 0.7
+
+    def _infer(self, batch):
+        raise NotImplementedError
+
+    def _supports_batch(self):
+        return False
+
+    def prepare(self, frame):
+        """Letterbox ``frame`` to the model shape; returns ``(tensor, ratio, pad)``."""
+        img, ratio, pad = letterbox(frame, self.imgsz)
+        return to_input_tensor(img), ratio, pad
+
+    def predict(self, frames, classes=None, conf=0.5, imgsz=None, prepared=None):
+        """``prepared`` optionally gives :meth:`prepare` outputs for ``frames``, e.g. from a shared cache."""
+        # Los modelos exportados tienen forma de entrada fija
+        if prepared is None:
+            prepared = [self.prepare(frame) for frame in frames]
+        tensors = [tensor for tensor, _, _ in prepared]
+
+        if self._supports_batch() and len(tensors) > 1:
+            outputs = list(self._infer(np.concatenate(tensors, axis=0)))
+        else:
+            outputs = [self._infer(t)[0] for t in tensors]
+
+        results = []
+        for frame, (_, ratio, pad), output in zip(frames, prepared, outputs):
+            xyxy, cls, scores = decode_yolov8_output(output, conf, classes, self.iou)
+            results.append((scale_boxes_back(xyxy, ratio, pad, frame.shape), cls, scores))
+        return results
+
+
+class OnnxBackend(_ExportedBackend):
+    """ONNX Runtime on the CPU execution provider."""
+
+    name = "onnx"
+
+    def __init__(self, model_path, imgsz=640, threads=None):
+        super().__init__(model_path, imgsz)
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = int(threads)
+        self.session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self._batch_dim = self.session.get_inputs()[0].shape[0]
+
+    def _supports_batch(self):
+        return not isinstance(self._batch_dim, int)
+
+    def _infer(self, batch):
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVINOBackend(_ExportedBackend):
+    """OpenVINO runtime compiled for CPU."""
+
+    name = "openvino"
+
+    def __init__(self, model_path, imgsz=640, device="CPU"):
+        super().__init__(model_path, imgsz)
+        import openvino as ov
+
+        core = ov.Core()
+        model = core.read_model(self.model_path)
+        self._batch_dynamic = model.inputs[0].get_partial_shape()[0].is_dynamic
+        self.compiled = core.compile_model(model, device, {"PERFORMANCE_HINT": "THROUGHPUT"})
+        self.output = self.compiled.outputs[0]
+
+    def _supports_batch(self):
+        return self._batch_dynamic
+
+    def _infer(self, batch):
+        return self.compiled(batch)[self.output]
+
+
+def exported_model_path(weights_path, backend, imgsz, suffix=""):
+    """Location of the converted model for ``weights_path`` in ``MODEL_CACHE_DIR``."""
+    h, w = normalize_shape(imgsz)
+    stem = f"{Path(weights_path).stem}_{h}x{w}{suffix}"
+    if backend == "onnx":
+        return MODEL_CACHE_DIR / f"{stem}.onnx"
+    if backend == "openvino":
+        return MODEL_CACHE_DIR / f"{stem}_openvino_model" / f"{Path(weights_path).stem}.xml"
+    raise ValueError(f"Backend sin conversión: {backend}")
+
+
+def quantized_model_path(weights_path, imgsz=640):
+    """Location of the INT8 ONNX model for ``weights_path`` in ``MODEL_CACHE_DIR``."""
+    return exported_model_path(weights_path, "onnx", imgsz, suffix="_int8")
+
+
+def _is_stale(converted, weights_path):
+    if not converted.exists():
+        return True
+    weights = Path(weights_path)
+    return weights.exists() and weights.stat().st_mtime > converted.stat().st_mtime
+
+
+def export_model(weights_path, backend, imgsz=640):
+    """Convert ``weights_path`` once and return the cached model path.
+
+    The conversion is redone only when the ``.pt`` file is newer than the
+    cached copy.
+    """
+    target = exported_model_path(weights_path, backend, imgsz)
+    if not _is_stale(target, weights_path):
+        return target
+
+    from ultralytics import YOLO
+
+    logger.info("Convirtiendo %s a %s (imgsz=%s)...", weights_path, backend, imgsz)
+    exported = Path(YOLO(str(weights_path)).export(format=backend, imgsz=normalize_shape(imgsz), dynamic=False))
+    MODEL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    if backend == "openvino":
+        dest_dir = target.parent
+        if dest_dir.exists():
+            shutil.rmtree(dest_dir)
+        shutil.move(str(exported), str(dest_dir))
+    else:
+        shutil.move(str(exported), str(target))
+    logger.info("Modelo convertido guardado en %s", target)
+    return target
+
+
+def create_backend(backend, weights_path, device="cpu", imgsz=640, model=None):
+    """Build the inference backend named ``backend``.
+
+    ``model`` is an already loaded Ultralytics ``YOLO`` for the default
+    backend. Exported backends convert (or reuse) the cached model first.
+    """
+    if backend in (None, "", "ultralytics"):
+        if model is None:
+            from ultralytics import YOLO
+            model = YOLO(str(weights_path))
+        return UltralyticsBackend(model, device)
+    if backend == "onnx":
+        return OnnxBackend(export_model(weights_path, "onnx", imgsz), imgsz)
+    if backend == "onnx_int8":
+        # El modelo INT8 requiere calibración previa (benchmarks.bench_int8)
+        quantized = quantized_model_path(weights_path, imgsz)
+        if not quantized.exists():
+            raise FileNotFoundError(f"Modelo INT8 no generado: {quantized}")
+        backend = OnnxBackend(quantized, imgsz)
+        backend.name = "onnx_int8"
+        return backend
+    if backend == "openvino":
+        return OpenVINOBackend(export_model(weights_path, "openvino", imgsz), imgsz)
+    raise ValueError(f"Backend de inferencia desconocido: {backend}")
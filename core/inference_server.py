@@ -0,0 +1,291 @@
+import threading
+import time
+
+from PyQt6.QtCore import QThread, QMutex, QWaitCondition
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración por defecto del servidor de inferencia compartido.
+# Se puede sobrescribir por cámara con la clave "inference_server" de config.json,
+# pero el servidor es uno por modelo: manda la configuración de la primera cámara
+# que lo crea y una distinta en las siguientes solo genera un aviso.
+DEFAULT_SERVER_CONFIG = {
+    "enabled": False,
+    "max_batch": 8,             # Frames máximos por llamada a predict
+    "max_wait_ms": 20,          # Ventana de latencia para completar un batch
+    "fairness": "round_robin",  # "round_robin" (cámara menos servida primero) o "fifo"
+    "max_per_camera": 1,        # Frames máximos de una misma cámara en un batch
+}
+
+# Servidores activos por (ruta de modelo, backend, dispositivo)
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def build_server_config(overrides=None):
+    """Combine ``DEFAULT_SERVER_CONFIG`` with per-camera overrides."""
+    config = DEFAULT_SERVER_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+class _InferenceRequest:
+    """Frame pending inference for one camera/model pair."""
+
+    __slots__ = ("client_id", "camera_id", "frame", "signature", "submitted", "event", "result", "error")
+
+    def __init__(self, client_id, camera_id, frame, signature):
+        self.client_id = client_id
+        self.camera_id = camera_id
+        self.frame = frame
+        self.signature = signature
+        self.submitted = time.monotonic()
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+    def resolve(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.event.set()
+
+
+class InferenceServer(QThread):
+    """Run one batched ``predict`` per model for every camera sharing it.
+
+    Each ``DetectorWorker`` submits its latest frame and blocks until the
+    result is ready. The server waits up to ``max_wait_ms`` for more frames
+    (or until every registered client has one pending), groups the requests
+    with the same predict parameters and runs them as a single batch.
+    """
+
+    def __init__(self, backend, device, config=None, parent=None):
+        super().__init__(parent)
+        self.backend = backend
+        self.device = device
+        self.config = build_server_config(config)
+        self.setObjectName(f"InferenceServer_{id(self)}")
+
+        self._mutex = QMutex()
+        self._wait = QWaitCondition()
+        self._pending = {}          # client_id -> _InferenceRequest
+        self._clients = set()
+        self._last_served = {}      # camera_id -> monotonic time del último batch
+        self.running = False
+
+        self.stats = {"batches": 0, "frames": 0, "superseded": 0, "errors": 0}
+
+    # ------------------------------------------------------------------
+    # Registro de clientes
+    # ------------------------------------------------------------------
+    def register_client(self, client_id):
+        self._mutex.lock()
+        self._clients.add(client_id)
+        self._mutex.unlock()
+
+    def unregister_client(self, client_id):
+        self._mutex.lock()
+        self._clients.discard(client_id)
+        req = self._pending.pop(client_id, None)
+        self._wait.wakeAll()
+        self._mutex.unlock()
+        if req is not None:
+            req.resolve(None)
+        return len(self._clients)
+
+    # ------------------------------------------------------------------
+    # API para los workers
+    # ------------------------------------------------------------------
+    def predict(self, client_id, frame, camera_id=None, classes=None, conf=0.5, imgsz=640, timeout=5.0):
+        """Submit ``frame`` and wait for its result.
+
+        Returns the backend's ``(xyxy, cls, conf)`` for the frame, or ``None`` when
+        the request was superseded by a newer frame, timed out or the server
+        is stopping.
+        """
+        signature = (tuple(classes) if classes is not None else None, conf, imgsz)
+        req = _InferenceRequest(client_id, camera_id if camera_id is not None else client_id, frame, signature)
+
+        self._mutex.lock()
+        if client_id not in self._clients:
+            self._mutex.unlock()
+            return None
+        previous = self._pending.get(client_id)
+        self._pending[client_id] = req
+        self._wait.wakeAll()
+        self._mutex.unlock()
+
+        if previous is not None:
+            self.stats["superseded"] += 1
+            previous.resolve(None)
+
+        if not req.event.wait(timeout):
+            self._mutex.lock()
+            if self._pending.get(client_id) is req:
+                del self._pending[client_id]
+            self._mutex.unlock()
+            logger.warning("%s: timeout esperando resultado para %s", self.objectName(), client_id)
+            return None
+        if req.error is not None:
+            raise req.error
+        return req.result
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["avg_batch"] = stats["frames"] / stats["batches"] if stats["batches"] else 0.0
+        stats["clients"] = len(self._clients)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Planificación de batches
+    # ------------------------------------------------------------------
+    def _order_pending_locked(self):
+        requests = list(self._pending.values())
+        if self.config["fairness"] == "fifo":
+            requests.sort(key=lambda r: r.submitted)
+        else:
+            requests.sort(key=lambda r: (self._last_served.get(r.camera_id, 0.0), r.submitted))
+        return requests
+
+    def _select_batch_locked(self):
+        ordered = self._order_pending_locked()
+        if not ordered:
+            return []
+        signature = ordered[0].signature
+        max_batch = max(1, int(self.config["max_batch"]))
+        max_per_camera = max(1, int(self.config["max_per_camera"]))
+
+        batch = []
+        per_camera = {}
+        for req in ordered:
+            if len(batch) >= max_batch:
+                break
+            if req.signature != signature:
+                continue
+            if per_camera.get(req.camera_id, 0) >= max_per_camera:
+                continue
+            per_camera[req.camera_id] = per_camera.get(req.camera_id, 0) + 1
+            batch.append(req)
+
+        now = time.monotonic()
+        for req in batch:
+            del self._pending[req.client_id]
+            self._last_served[req.camera_id] = now
+        return batch
+
+    def _batch_ready_locked(self):
+        if len(self._pending) >= max(1, int(self.config["max_batch"])):
+            return True
+        return bool(self._clients) and len(self._pending) >= len(self._clients)
+
+    def start(self, *args):
+        # Se marca antes de arrancar el hilo: un stop() inmediato no debe
+        # quedar pisado por run() y dejar a wait() bloqueado para siempre
+        self.running = True
+        super().start(*args)
+
+    def run(self):
+        max_wait = max(0.0, float(self.config["max_wait_ms"]) / 1000.0)
+        logger.info("%s: servidor de inferencia iniciado (%s)", self.objectName(), self.config)
+
+        while True:
+            self._mutex.lock()
+            while self.running and not self._pending:
+                self._wait.wait(self._mutex, 500)
+            if not self.running:
+                self._mutex.unlock()
+                break
+
+            oldest = min(r.submitted for r in self._pending.values())
+            while self.running and not self._batch_ready_locked():
+                remaining = oldest + max_wait - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wait.wait(self._mutex, max(1, int(remaining * 1000)))
+            batch = self._select_batch_locked() if self.running else []
+            self._mutex.unlock()
+
+            if batch:
+                self._run_batch(batch)
+
+        self._mutex.lock()
+        leftovers = list(self._pending.values())
+        self._pending.clear()
+        self._mutex.unlock()
+        for req in leftovers:
+            req.resolve(None)
+        logger.info("%s: servidor de inferencia detenido", self.objectName())
+
+    def _run_batch(self, batch):
+        classes, conf, imgsz = batch[0].signature
+        try:
+            results = self.backend.predict(
+                [req.frame for req in batch],
+                classes=list(classes) if classes is not None else None,
+                conf=conf,
+                imgsz=imgsz,
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error("%s: error en predict por batch (%d frames): %s", self.objectName(), len(batch), e)
+            for req in batch:
+                req.resolve(error=e)
+            return
+
+        self.stats["batches"] += 1
+        self.stats["frames"] += len(batch)
+        logger.debug("%s: batch de %d frames procesado", self.objectName(), len(batch))
+        for req, res in zip(batch, results):
+            req.resolve(res)
+
+    def stop(self):
+        self._mutex.lock()
+        self.running = False
+        self._wait.wakeAll()
+        self._mutex.unlock()
+        self.wait()
+
+
+def acquire_inference_server(model_path, backend, device, client_id, config=None):
+    """Return the shared server for ``(model_path, backend, device)`` registering ``client_id``.
+
+    The server keeps the ``config`` of the client that created it; a
+    later client asking for different settings is logged and ignored.
+    """
+    key = (str(model_path), getattr(backend, "name", None), str(device))
+    with _servers_lock:
+        server = _servers.get(key)
+        if server is None:
+            server = InferenceServer(backend, device, config)
+            _servers[key] = server
+            server.start()
+        else:
+            requested = build_server_config(config)
+            different = {k: v for k, v in requested.items() if k != "enabled" and server.config.get(k) != v}
+            if different:
+                logger.warning(
+                    "%s: %s pide %s pero el servidor compartido usa %s; se mantiene la configuración existente",
+                    server.objectName(),
+                    client_id,
+                    different,
+                    {k: server.config[k] for k in different},
+                )
+        server.register_client(client_id)
+    return server
+
+
+def release_inference_server(server, client_id):
+    """Unregister ``client_id`` and stop the server once it has no clients."""
+    with _servers_lock:
+        remaining = server.unregister_client(client_id)
+        if remaining > 0:
+            return
+        for key, value in list(_servers.items()):
+            if value is server:
+                del _servers[key]
+    server.stop()
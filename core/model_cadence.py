@@ -0,0 +1,40 @@
+import time
+
+
+class ModelCadence:
+    """Per-model detection rate within one camera.
+
+    ``cadence`` maps a model key to its detection fps (cam_data
+    ``"model_cadence"``); keys without an entry run on every detection
+    frame. Keys sharing a weight file run in one pass, so a group follows
+    its fastest key.
+    """
+
+    def __init__(self, cadence=None, clock=time.monotonic):
+        self._clock = clock
+        self._last = {}
+        self.set_cadence(cadence)
+
+    def set_cadence(self, cadence):
+        self.cadence = {key: float(fps) for key, fps in (cadence or {}).items() if fps and float(fps) > 0}
+
+    def interval(self, group_keys):
+        """Seconds between runs for a group, or ``None`` for every detection frame."""
+        rates = [self.cadence.get(key) for key in group_keys]
+        if not rates or any(rate is None for rate in rates):
+            return None
+        return 1.0 / max(rates)
+
+    def select(self, groups, detection_fps):
+        """Return the ids of the ``(id, group_keys)`` groups due on this detection frame."""
+        now = self._clock()
+        # Tolerancia de medio periodo de detección para no perder el frame por jitter
+        slack = 0.5 / max(1.0, float(detection_fps))
+        due = []
+        for ident, keys in groups:
+            interval = self.interval(keys)
+            last = self._last.get(ident)
+            if interval is None or last is None or now - last >= interval - slack:
+                self._last[ident] = now
+                due.append(ident)
+        return due
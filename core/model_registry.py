@@ -0,0 +1,148 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Identidad de un modelo cargado. ``imgsz`` es None para backends con entrada dinámica.
+ModelKey = namedtuple("ModelKey", ["path", "backend", "device", "imgsz"])
+
+POLICIES = ("shared_lock", "per_worker")
+
+
+class _Entry:
+    __slots__ = ("key", "owner", "model", "refs", "lock", "warmed")
+
+    def __init__(self, key, owner, model):
+        self.key = key
+        self.owner = owner
+        self.model = model
+        self.refs = 0
+        self.lock = threading.Lock()
+        self.warmed = False
+
+
+class ModelHandle:
+    """Reference to a registry entry; ``predict`` is serialized when shared."""
+
+    def __init__(self, registry, entry, serialize):
+        self._registry = registry
+        self._entry = entry
+        self._serialize = serialize
+        self.released = False
+
+    @property
+    def key(self):
+        return self._entry.key
+
+    @property
+    def model(self):
+        return self._entry.model
+
+    @property
+    def name(self):
+        return getattr(self._entry.model, "name", self._entry.key.backend)
+
+    def predict(self, *args, **kwargs):
+        if not self._serialize:
+            return self._entry.model.predict(*args, **kwargs)
+        with self._entry.lock:
+            return self._entry.model.predict(*args, **kwargs)
+
+    def warm_up(self, *args, **kwargs):
+        """Run one throw-away ``predict`` unless this model was already warmed.
+
+        Returns True if the forward pass ran.
+        """
+        with self._entry.lock:
+            if self._entry.warmed:
+                return False
+            self._entry.model.predict(*args, **kwargs)
+            self._entry.warmed = True
+            return True
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self._registry.release(self)
+
+
+class ModelRegistry:
+    """Reference-counted cache of loaded models.
+
+    ``shared_lock`` hands one instance per key to every worker and serializes
+    ``predict`` with a per-model lock; ``per_worker`` loads one instance per
+    owner so workers never contend. Models no worker references are kept in
+    an LRU of ``max_idle`` entries and closed when evicted.
+    """
+
+    def __init__(self, max_idle=2):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._active = {}           # (key, owner) -> _Entry
+        self._idle = OrderedDict()  # (key, owner) -> _Entry con refs == 0
+
+    def acquire(self, key, loader, policy="shared_lock", owner=None):
+        """Return a :class:`ModelHandle` for ``key``, loading it with ``loader`` if needed."""
+        if policy not in POLICIES:
+            raise ValueError(f"Política de modelo desconocida: {policy}")
+        slot = (key, owner if policy == "per_worker" else None)
+
+        with self._lock:
+            entry = self._active.get(slot) or self._idle.pop(slot, None)
+            if entry is not None:
+                entry.refs += 1
+                self._active[slot] = entry
+                logger.debug("ModelRegistry: reutilizando %s (refs=%d)", key, entry.refs)
+                return ModelHandle(self, entry, serialize=slot[1] is None)
+
+        # Cargar fuera del lock; dos cargas simultáneas del mismo modelo se resuelven abajo
+        model = loader()
+        with self._lock:
+            entry = self._active.get(slot) or self._idle.pop(slot, None)
+            if entry is None:
+                entry = _Entry(key, slot[1], model)
+                logger.info("ModelRegistry: modelo cargado %s", key)
+            else:
+                _close_model(model)
+            entry.refs += 1
+            self._active[slot] = entry
+            return ModelHandle(self, entry, serialize=slot[1] is None)
+
+    def release(self, handle):
+        entry = handle._entry
+        slot = (entry.key, entry.owner)
+        evicted = []
+        with self._lock:
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            self._active.pop(slot, None)
+            self._idle[slot] = entry
+            while len(self._idle) > self.max_idle:
+                _, old = self._idle.popitem(last=False)
+                evicted.append(old)
+        for old in evicted:
+            logger.info("ModelRegistry: liberando modelo sin uso %s", old.key)
+            _close_model(old.model)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": {str(slot[0]): e.refs for slot, e in self._active.items()},
+                "idle": [str(slot[0]) for slot in self._idle],
+            }
+
+
+def _close_model(model):
+    close = getattr(model, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception as e:
+            logger.warning("ModelRegistry: error cerrando modelo: %s", e)
+
+
+# Registro compartido por todos los DetectorWorker
+model_registry = ModelRegistry()
@@ -0,0 +1,95 @@
+import time
+
+import cv2
+
+from core.motion_detector import MotionDetector
+from core.tiling import cells_in_rect
+
+# Configuración por defecto del filtro de movimiento; se sobrescribe con la
+# clave "motion_gate" de cada cámara en config.json.
+DEFAULT_MOTION_GATE_CONFIG = {
+    "enabled": False,
+    "scale_width": 160,     # Ancho del frame reducido para la diferencia
+    "min_area": 10,         # Área mínima (en píxeles del frame reducido)
+    "keepalive_s": 2.0,     # Enviar un frame al detector al menos cada N segundos
+}
+
+
+def build_motion_gate_config(overrides=None):
+    config = DEFAULT_MOTION_GATE_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+class MotionGate:
+    """Decide whether a frame is worth sending to the detectors.
+
+    Frames are downscaled and diffed with :class:`MotionDetector`; a frame
+    passes when motion touches an enabled grid cell, or when
+    ``keepalive_s`` elapsed since the last frame that passed.
+    """
+
+    def __init__(self, config=None, clock=time.monotonic):
+        self.config = build_motion_gate_config(config)
+        self.enabled = bool(self.config["enabled"])
+        self.detector = MotionDetector(min_area=self.config["min_area"])
+        self._clock = clock
+        self._grid = (frozenset(), 1, 1)
+        self._last_pass = None
+        self.passed = 0
+        self.skipped = 0
+        self.keepalive = 0
+
+    def set_grid(self, discarded_cells, filas, columnas):
+        self._grid = (frozenset(tuple(c) for c in (discarded_cells or ())), int(filas), int(columnas))
+
+    def _downscale(self, frame):
+        h, w = frame.shape[:2]
+        target_w = int(self.config["scale_width"])
+        if w <= target_w:
+            return frame
+        target_h = max(1, int(round(h * target_w / w)))
+        return cv2.resize(frame, (target_w, target_h), interpolation=cv2.INTER_AREA)
+
+    def _motion_in_enabled_cells(self, boxes, frame_w, frame_h):
+        discarded, filas, columnas = self._grid
+        for box in boxes:
+            if not discarded:
+                return True
+            rect = (box["x"], box["y"], box["x"] + box["w"], box["y"] + box["h"])
+            if not cells_in_rect(rect, filas, columnas, frame_w, frame_h) <= discarded:
+                return True
+        return False
+
+    def should_process(self, frame):
+        """Return True when ``frame`` should go to the detectors."""
+        if not self.enabled:
+            self.passed += 1
+            return True
+
+        small = self._downscale(frame)
+        boxes = self.detector.detect(small)
+        now = self._clock()
+
+        moving = self._last_pass is None or self._motion_in_enabled_cells(boxes, small.shape[1], small.shape[0])
+        if not moving:
+            if now - self._last_pass < self.config["keepalive_s"]:
+                self.skipped += 1
+                return False
+            self.keepalive += 1
+
+        self._last_pass = now
+        self.passed += 1
+        return True
+
+    def get_stats(self):
+        total = self.passed + self.skipped
+        return {
+            "passed": self.passed,
+            "skipped": self.skipped,
+            "keepalive": self.keepalive,
+            "skip_ratio": self.skipped / total if total else 0.0,
+        }
@@ -0,0 +1,101 @@
+import threading
+from collections import OrderedDict
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class _Prepared:
+    __slots__ = ("ready", "value", "error")
+
+    def __init__(self):
+        self.ready = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class PreprocessCache:
+    """Prepared network inputs shared by the models that see the same frame.
+
+    Entries are keyed by ``(frame_id, input_shape, normalization)``: the
+    first worker builds the letterboxed tensor, the others wait for it and
+    reuse it. :meth:`open` declares how many workers will consume a frame;
+    each calls :meth:`release` when done and the frame's entries are freed
+    after the last one. Frames a worker never got (overwritten in its
+    mailbox) are evicted once more than ``max_frames`` are open.
+
+    Only exported backends (``prepare()`` / ``predict(prepared=...)``) use
+    it, so the visualizer builds one only for cameras with such a
+    ``backend`` and no shared inference server; the default Ultralytics
+    path letterboxes inside ``predict`` and gets no cache.
+    """
+
+    def __init__(self, max_frames=4):
+        self.max_frames = max(1, int(max_frames))
+        self._lock = threading.Lock()
+        self._frames = OrderedDict()  # frame_id -> [consumidores pendientes, {clave: _Prepared}]
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def open(self, frame_id, consumers):
+        with self._lock:
+            self._frames[frame_id] = [int(consumers), {}]
+            while len(self._frames) > self.max_frames:
+                self._frames.popitem(last=False)
+                self.evicted += 1
+
+    def get(self, frame_id, shape, norm, build):
+        """Return the prepared input for ``(frame_id, shape, norm)``, calling ``build()`` once."""
+        key = (tuple(shape), norm)
+        with self._lock:
+            frame = self._frames.get(frame_id)
+            if frame is None:
+                entry, owner = None, True
+            else:
+                entry = frame[1].get(key)
+                owner = entry is None
+                if owner:
+                    entry = frame[1][key] = _Prepared()
+            if owner:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if entry is None:
+            # Frame no registrado: preparar sin compartir
+            return build()
+        if not owner:
+            entry.ready.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.value
+        try:
+            entry.value = build()
+        except Exception as e:
+            entry.error = e
+            raise
+        finally:
+            entry.ready.set()
+        return entry.value
+
+    def release(self, frame_id):
+        with self._lock:
+            frame = self._frames.get(frame_id)
+            if frame is None:
+                return
+            frame[0] -= 1
+            if frame[0] <= 0:
+                del self._frames[frame_id]
+
+    def get_stats(self):
+        with self._lock:
+            live = sum(len(f[1]) for f in self._frames.values())
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "evicted": self.evicted,
+            "live": live,
+        }
@@ -0,0 +1,59 @@
+import cv2
+import numpy as np
+
+# Color de relleno usado por Ultralytics en el letterbox
+LETTERBOX_COLOR = (114, 114, 114)
+
+
+def normalize_shape(imgsz):
+    """Return ``(h, w)`` for an ``imgsz`` given as int or (h, w)."""
+    if isinstance(imgsz, (list, tuple)):
+        return int(imgsz[0]), int(imgsz[1])
+    return int(imgsz), int(imgsz)
+
+
+def letterbox(frame, new_shape):
+    """Resize ``frame`` keeping aspect ratio and pad it to ``new_shape``.
+
+    Reproduces Ultralytics' ``LetterBox(auto=False)`` so exported models
+    see the same input as the PyTorch path.
+
+    Returns:
+        tuple: (imagen, ratio, (pad_w, pad_h))
+    """
+    new_h, new_w = normalize_shape(new_shape)
+    h, w = frame.shape[:2]
+    ratio = min(new_h / h, new_w / w)
+    unpad_w, unpad_h = int(round(w * ratio)), int(round(h * ratio))
+    pad_w = (new_w - unpad_w) / 2
+    pad_h = (new_h - unpad_h) / 2
+
+    if (w, h) != (unpad_w, unpad_h):
+        frame = cv2.resize(frame, (unpad_w, unpad_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_h - 0.1)), int(round(pad_h + 0.1))
+    left, right = int(round(pad_w - 0.1)), int(round(pad_w + 0.1))
+    if top or bottom or left or right:
+        frame = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=LETTERBOX_COLOR)
+    return frame, ratio, (left, top)
+
+
+def to_input_tensor(image):
+    """HWC BGR uint8 -> NCHW RGB float32 in [0, 1]."""
+    tensor = image[..., ::-1].transpose(2, 0, 1)
+    tensor = np.ascontiguousarray(tensor, dtype=np.float32)
+    tensor /= 255.0
+    return tensor[None]
+
+
+def scale_boxes_back(xyxy, ratio, pad, frame_shape):
+    """Undo the letterbox on ``xyxy`` and clip to the original frame."""
+    if len(xyxy) == 0:
+        return xyxy
+    out = xyxy.astype(np.float32, copy=True)
+    out[:, [0, 2]] -= pad[0]
+    out[:, [1, 3]] -= pad[1]
+    out /= ratio
+    h, w = frame_shape[:2]
+    out[:, [0, 2]] = out[:, [0, 2]].clip(0, w)
+    out[:, [1, 3]] = out[:, [1, 3]].clip(0, h)
+    return out
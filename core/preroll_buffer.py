@@ -0,0 +1,240 @@
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from core.decode_backends import FrameSkipper
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración por defecto del pre-roll de los clips de evento; se
+# sobrescribe con la clave "preroll" de cada cámara en config.json.
+DEFAULT_PREROLL_CONFIG = {
+    "seconds": 5.0,       # Segundos antes del evento
+    "post_seconds": 5.0,  # Segundos después del evento (el anillo retiene ambos)
+    "fps": 10,            # Frames por segundo guardados (los clips se escriben a este ritmo)
+    "max_mb": 24,         # Tope de memoria del anillo por cámara
+    "quality": 80,        # Calidad JPEG
+    "max_width": 1280,    # Frames más anchos se reducen antes de comprimir
+}
+
+
+def build_preroll_config(overrides=None):
+    config = DEFAULT_PREROLL_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+def encode_frame(frame, max_width=0, quality=80):
+    """Downscale ``frame`` to ``max_width`` and JPEG-encode it; ``(data, shape)`` or ``None``."""
+    h, w = frame.shape[:2]
+    max_width = int(max_width or 0)
+    if max_width and w > max_width:
+        frame = cv2.resize(frame, (max_width, int(round(h * max_width / w))), interpolation=cv2.INTER_AREA)
+    ok, data = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        return None
+    return data.reshape(-1), frame.shape
+
+
+class EncodedFrame:
+    """A JPEG-compressed frame; ``shape`` is known without decoding it."""
+
+    __slots__ = ("data", "shape", "ts")
+
+    def __init__(self, data, shape, ts):
+        self.data = data
+        self.shape = shape
+        self.ts = ts
+
+    def decode(self):
+        # cv2 codifica y decodifica sin reordenar canales: sale en el orden de entrada
+        return cv2.imdecode(np.frombuffer(self.data, np.uint8), cv2.IMREAD_COLOR)
+
+
+class ByteRing:
+    """Fixed-capacity byte ring of variable-size records.
+
+    Writing a record that does not fit evicts the oldest ones; a record
+    never wraps around the end, so each is one contiguous slice.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._head = 0
+        self._entries = deque()  # (inicio, longitud, meta)
+        self.used = 0
+        self.evicted = 0
+
+    def append(self, data, meta):
+        size = len(data)
+        if size > self.capacity:
+            return False
+        wrap = self._head + size > self.capacity
+        start = 0 if wrap else self._head
+        end = start + size
+        # Los registros más antiguos son los que siguen a la cabeza: los del hueco
+        # final al dar la vuelta y luego los que pisa el nuevo
+        while self._entries:
+            first_start, first_len, _ = self._entries[0]
+            in_gap = wrap and first_start >= self._head
+            if not (in_gap or (start < first_start + first_len and first_start < end)):
+                break
+            self.pop_oldest()
+        self._view[start:end] = data
+        self._entries.append((start, size, meta))
+        self._head = end
+        self.used += size
+        return True
+
+    def pop_oldest(self):
+        _, size, _ = self._entries.popleft()
+        self.used -= size
+        self.evicted += 1
+
+    def oldest_meta(self):
+        return self._entries[0][2] if self._entries else None
+
+    def newest_meta(self):
+        return self._entries[-1][2] if self._entries else None
+
+    def items(self):
+        """``(bytes, meta)`` of every record, oldest first (bytes are copies)."""
+        return [(bytes(self._view[start:start + size]), meta) for start, size, meta in self._entries]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PrerollBuffer:
+    """Compressed, time-bounded frame history of one camera for event clips.
+
+    :meth:`push` hands the (read-only, shared) frame to an encoder thread,
+    which JPEG-compresses it into a :class:`ByteRing` of ``max_mb``. Frames
+    are kept for ``seconds + post_seconds`` at ``fps``, or fewer if the
+    memory cap is reached first. :meth:`snapshot` returns the
+    :class:`EncodedFrame` s of a time range for ``VideoSaverThread``, which
+    decodes them on its own thread.
+    """
+
+    def __init__(self, config=None, name="", clock=time.monotonic, threaded=True):
+        self.config = build_preroll_config(config)
+        self.name = name
+        self._clock = clock
+        self._ring = ByteRing(float(self.config["max_mb"]) * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._skipper = FrameSkipper(self.config["fps"])
+        self.pushed = 0
+        self.stored = 0
+        self.dropped = 0
+        self.raw_bytes = 0
+        self.encoded_bytes = 0
+        self.encode_ms = 0.0
+        self._queue = None
+        if threaded:
+            self._queue = queue.Queue(maxsize=4)
+            self._thread = threading.Thread(target=self._run, name=f"preroll_{name}", daemon=True)
+            self._thread.start()
+
+    @property
+    def retention_s(self):
+        return float(self.config["seconds"]) + float(self.config["post_seconds"])
+
+    def due(self, ts=None):
+        """Whether a frame at ``ts`` would be kept (a frame bus ``wants`` filter)."""
+        return self._skipper.due(self._clock() if ts is None else ts)
+
+    def push(self, frame, ts=None):
+        """Offer an array or ``SharedFrame``; only ``fps`` frames per second are compressed."""
+        ts = self._clock() if ts is None else ts
+        if not self._skipper.want(ts):
+            return False
+        self.pushed += 1
+        if self._queue is None:
+            self._store(frame, ts)
+            return True
+        try:
+            self._queue.put_nowait((frame, ts))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            try:
+                self._store(*item)
+            except Exception as e:
+                logger.error("%s: error comprimiendo pre-roll: %s", self.name, e)
+
+    def _store(self, frame, ts):
+        started = time.perf_counter()
+        max_width = int(self.config["max_width"] or 0)
+        if hasattr(frame, "resized"):
+            # SharedFrame: se convierte aquí, ya al tamaño de guardado
+            frame = frame.resized(max_width or frame.width)
+        encoded = encode_frame(frame, max_width, self.config["quality"])
+        if encoded is None:
+            return
+        data, shape = encoded
+        elapsed = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            self._ring.append(data, (ts, shape))
+            # Retención por tiempo además del tope de memoria
+            while len(self._ring) > 1 and ts - self._ring.oldest_meta()[0] > self.retention_s:
+                self._ring.pop_oldest()
+            self.encode_ms = elapsed if self.stored == 0 else 0.8 * self.encode_ms + 0.2 * elapsed
+            self.stored += 1
+            self.raw_bytes += shape[0] * shape[1] * shape[2]
+            self.encoded_bytes += len(data)
+
+    def newest_ts(self):
+        """Timestamp of the last compressed frame, or ``None``."""
+        with self._lock:
+            meta = self._ring.newest_meta()
+        return meta[0] if meta is not None else None
+
+    def snapshot(self, since=None, until=None):
+        """:class:`EncodedFrame` s with ``since <= ts <= until``, oldest first."""
+        with self._lock:
+            items = self._ring.items()
+        return [
+            EncodedFrame(data, shape, ts)
+            for data, (ts, shape) in items
+            if (since is None or ts >= since) and (until is None or ts <= until)
+        ]
+
+    def close(self):
+        if self._queue is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=2)
+            self._queue = None
+
+    def get_stats(self):
+        with self._lock:
+            count = len(self._ring)
+            used = self._ring.used
+            evicted = self._ring.evicted
+            span = self._ring.newest_meta()[0] - self._ring.oldest_meta()[0] if count else 0.0
+        return {
+            "frames": count,
+            "seconds": round(span, 2),
+            "mb": round(used / 1024 / 1024, 2),
+            "max_mb": self.config["max_mb"],
+            "compression": round(self.raw_bytes / self.encoded_bytes, 1) if self.encoded_bytes else 0.0,
+            "encode_ms": round(self.encode_ms, 2),
+            "dropped": self.dropped,
+            "evicted": evicted,
+        }
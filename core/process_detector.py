@@ -0,0 +1,244 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from logging_utils import get_logger
+from core.shm_ring import SharedFrameRing
+from core.yuv_frame import YuvFrame
+
+logger = get_logger(__name__)
+
+# Espera antes de cada reinicio consecutivo de un proceso caído
+RESTART_BACKOFF_S = (0.5, 1, 2, 5, 10)
+
+
+def _pack_nv12(frame):
+    """Stack the planes of a :class:`YuvFrame` into one ``(h * 3 / 2, w)`` NV12 array."""
+    h, w = frame.height, frame.width
+    return np.concatenate((frame.y, frame.uv.reshape(h // 2, w)))
+
+
+def _unpack_nv12(packed):
+    h = packed.shape[0] * 2 // 3
+    return YuvFrame(packed[:h], packed[h:].reshape(h // 2, -1, 2))
+
+
+def _detector_process_main(worker_kwargs, ring_name, tasks, results, worker_cls=None):
+    """Entry point of the detector process: load the model and serve frames from the ring."""
+    if worker_cls is None:
+        from core.detector_worker import DetectorWorker as worker_cls
+
+    worker = worker_cls(**worker_kwargs)
+    if not worker._load_model():
+        results.put(("error", "modelo no cargado"))
+        return
+    ring = SharedFrameRing(name=ring_name) if ring_name else None
+    results.put(("ready", None))
+    consumed = overwritten = 0
+
+    while True:
+        messages = [tasks.get()]
+        while True:
+            try:
+                messages.append(tasks.get_nowait())
+            except queue.Empty:
+                break
+
+        latest = None
+        frames = 0
+        for message in messages:
+            kind = message[0]
+            if kind == "stop":
+                if ring is not None:
+                    ring.close()
+                return
+            if kind == "grid":
+                worker.set_grid(*message[1:])
+            elif kind == "ring":
+                if ring is not None:
+                    ring.close()
+                ring = SharedFrameRing(name=message[1])
+            elif kind == "frame":
+                # Solo interesa el frame más reciente
+                latest = message
+                frames += 1
+
+        if latest is None or ring is None:
+            continue
+        overwritten += frames - 1
+        item = ring.read(latest[1], latest[2])
+        if item is None:
+            overwritten += 1
+            continue
+        consumed += 1
+        frame, frame_id = item
+        if latest[3] == "nv12":
+            # La conversión a RGB (al tamaño del detector si se puede) se hace aquí
+            frame = _unpack_nv12(frame)
+        outputs = []
+        worker.process_frame(frame, frame_id, lambda output, key, fid: outputs.append((output, key)))
+        stats = worker.get_stats()
+        stats.update({"consumed": consumed, "overwritten": overwritten})
+        results.put(("result", frame_id, outputs, stats))
+
+
+class ProcessDetectorWorker(QObject):
+    """``DetectorWorker`` running in a child process.
+
+    Frames go through a :class:`SharedFrameRing`; only ``(slot, seq)`` is
+    sent over the task queue. A :class:`YuvFrame` travels as its NV12
+    planes and is converted in the child, so the GUI thread only copies
+    1.5 bytes per pixel. Results come back on a result queue and are
+    re-emitted as ``result_ready`` with the same signature as the thread
+    worker. A dead process is restarted with the last grid applied.
+    ``worker_cls`` (importable by the child) replaces ``DetectorWorker``.
+    """
+
+    result_ready = pyqtSignal(list, str, int)
+
+    def __init__(self, model_key="Personas", parent=None, ring_slots=3, worker_cls=None, **worker_kwargs):
+        super().__init__(parent)
+        self.model_key = model_key
+        self.group_keys = list(worker_kwargs.get("group_keys") or [model_key])
+        # El servidor de inferencia compartido vive en el proceso de la GUI
+        worker_kwargs["inference_server"] = None
+        worker_kwargs.pop("preprocess_cache", None)
+        self._worker_kwargs = dict(worker_kwargs, model_key=model_key)
+        self._worker_cls = worker_cls
+        self.setObjectName(f"ProcessDetector_{model_key}_{id(self)}")
+
+        self._ctx = mp.get_context("spawn")
+        self._lock = threading.Lock()
+        self._ring = None
+        self._ring_slots = ring_slots
+        self._tasks = None
+        self._results = None
+        self._process = None
+        self._reader = None
+        self._grid = None
+        self._child_stats = {}
+        self.running = False
+        self.posted = 0
+        self.restarts = 0
+
+    def start(self):
+        self.running = True
+        with self._lock:
+            self._spawn()
+        self._reader = threading.Thread(target=self._read_results, name=f"{self.objectName()}_results", daemon=True)
+        self._reader.start()
+
+    def isRunning(self):
+        return self.running and self._process is not None and self._process.is_alive()
+
+    def _spawn(self):
+        self._tasks = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_detector_process_main,
+            args=(self._worker_kwargs, self._ring.name if self._ring else None, self._tasks, self._results, self._worker_cls),
+            name=self.objectName(),
+            daemon=True,
+        )
+        self._process.start()
+        if self._grid is not None:
+            self._tasks.put(("grid",) + self._grid)
+        logger.info("%s: proceso de detección iniciado (pid %s)", self.objectName(), self._process.pid)
+
+    def set_frame(self, frame, frame_id=None):
+        if not self.running:
+            return
+        layout = "array"
+        if isinstance(frame, YuvFrame):
+            # Cruzan los planos; el hijo convierte solo lo que necesita
+            frame, layout = _pack_nv12(frame), "nv12"
+        elif not isinstance(frame, np.ndarray):
+            return
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        with self._lock:
+            if self._ring is None or frame.nbytes > self._ring.slot_bytes:
+                old = self._ring
+                self._ring = SharedFrameRing(frame.nbytes, self._ring_slots)
+                self._tasks.put(("ring", self._ring.name))
+                if old is not None:
+                    old.close()
+            slot, seq = self._ring.write(frame, frame_id or 0)
+            self._tasks.put(("frame", slot, seq, layout))
+            self.posted += 1
+
+    def set_grid(self, discarded_cells, filas, columnas):
+        self._grid = (list(discarded_cells or ()), int(filas), int(columnas))
+        with self._lock:
+            if self._tasks is not None:
+                self._tasks.put(("grid",) + self._grid)
+
+    def get_stats(self):
+        stats = dict(self._child_stats)
+        stats.update({"posted": self.posted, "restarts": self.restarts, "alive": self.isRunning()})
+        return stats
+
+    def _read_results(self):
+        failures = 0
+        while self.running:
+            try:
+                message = self._results.get(timeout=0.5)
+            except queue.Empty:
+                message = None
+            except (EOFError, OSError):
+                message = None
+
+            if message is not None:
+                kind = message[0]
+                if kind == "result":
+                    _, frame_id, outputs, stats = message
+                    self._child_stats = stats
+                    failures = 0
+                    for output, key in outputs:
+                        self.result_ready.emit(output, key, frame_id)
+                elif kind == "ready":
+                    logger.info("%s: modelo cargado en el proceso hijo", self.objectName())
+                elif kind == "error":
+                    logger.error("%s: error en el proceso hijo: %s", self.objectName(), message[1])
+                continue
+
+            process = self._process
+            if self.running and process is not None and not process.is_alive():
+                delay = RESTART_BACKOFF_S[min(failures, len(RESTART_BACKOFF_S) - 1)]
+                logger.error(
+                    "%s: el proceso de detección terminó (código %s); reiniciando en %.1f s",
+                    self.objectName(), process.exitcode, delay,
+                )
+                failures += 1
+                time.sleep(delay)
+                if not self.running:
+                    break
+                with self._lock:
+                    self.restarts += 1
+                    self._spawn()
+
+    def stop(self):
+        logger.info("%s: solicitando detener proceso", self.objectName())
+        self.running = False
+        with self._lock:
+            process = self._process
+            if process is not None:
+                try:
+                    self._tasks.put(("stop",))
+                except (OSError, ValueError):
+                    pass
+                process.join(3)
+                if process.is_alive():
+                    process.terminate()
+                    process.join(1)
+        if self._reader is not None:
+            self._reader.join(2)
+        with self._lock:
+            if self._ring is not None:
+                self._ring.close()
+                self._ring = None
+            self._process = None
+        logger.info("%s: proceso detenido correctamente", self.objectName())
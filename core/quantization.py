@@ -0,0 +1,191 @@
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from logging_utils import get_logger
+from core.inference_backends import export_model, quantized_model_path
+from core.preprocessing import letterbox, to_input_tensor, normalize_shape
+
+logger = get_logger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def _capture_files(sources, exclude=()):
+    excluded = {Path(p).resolve() for p in exclude}
+    files = []
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix.lower() in VIDEO_EXTENSIONS + IMAGE_EXTENSIONS))
+        elif path.exists():
+            files.append(path)
+    return [f for f in files if f.resolve() not in excluded]
+
+
+def sample_frames(sources, count=200, exclude=()):
+    """Evenly sample up to ``count`` BGR frames from capture videos/images.
+
+    ``sources`` are files or directories (e.g. ``capturas/videos``); the
+    budget is split across files so one long recording does not dominate.
+    Files in ``exclude`` (the held-out clip) are skipped.
+    """
+    files = _capture_files(sources, exclude)
+    if not files:
+        return []
+    per_file = max(1, int(np.ceil(count / len(files))))
+    frames = []
+    for path in files:
+        if path.suffix.lower() in IMAGE_EXTENSIONS:
+            img = cv2.imread(str(path))
+            if img is not None:
+                frames.append(img)
+            continue
+        cap = cv2.VideoCapture(str(path))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or per_file
+        for idx in np.linspace(0, max(0, total - 1), per_file).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(idx))
+            ok, frame = cap.read()
+            if ok:
+                frames.append(frame)
+        cap.release()
+    return frames[:count]
+
+
+class FrameCalibrationReader:
+    """``onnxruntime.quantization.CalibrationDataReader`` over letterboxed frames."""
+
+    def __init__(self, frames, input_name, imgsz=640):
+        self.input_name = input_name
+        self.imgsz = normalize_shape(imgsz)
+        self._frames = iter(frames)
+
+    def get_next(self):
+        frame = next(self._frames, None)
+        if frame is None:
+            return None
+        img, _, _ = letterbox(frame, self.imgsz)
+        return {self.input_name: to_input_tensor(img)}
+
+    def rewind(self):
+        pass
+
+
+def quantize_model(weights_path, calibration_frames, imgsz=640):
+    """Export ``weights_path`` to ONNX and quantize it to INT8 (QDQ, per-channel).
+
+    Returns the path of the quantized model.
+    """
+    if not calibration_frames:
+        raise ValueError("Se necesitan frames de calibración para cuantizar")
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    fp32_path = export_model(weights_path, "onnx", imgsz)
+    target = quantized_model_path(weights_path, imgsz)
+    prepared = target.with_name(target.stem + "_prep.onnx")
+    quant_pre_process(str(fp32_path), str(prepared))
+
+    input_name = ort.InferenceSession(str(prepared), providers=["CPUExecutionProvider"]).get_inputs()[0].name
+    reader = FrameCalibrationReader(calibration_frames, input_name, imgsz)
+    logger.info("Cuantizando %s con %d frames de calibración...", weights_path, len(calibration_frames))
+    quantize_static(
+        str(prepared),
+        str(target),
+        reader,
+        quant_format=QuantFormat.QDQ,
+        per_channel=True,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+    )
+    prepared.unlink(missing_ok=True)
+    logger.info("Modelo INT8 guardado en %s", target)
+    return target
+
+
+def _pairwise_iou(a, b):
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+
+def match_detections(reference, candidate, iou_threshold=0.5):
+    """Greedily match same-class boxes; returns ``(matched, conf_deltas)``."""
+    ref_xyxy, ref_cls, ref_conf = reference
+    cand_xyxy, cand_cls, cand_conf = candidate
+    if len(ref_xyxy) == 0 or len(cand_xyxy) == 0:
+        return 0, []
+    ious = _pairwise_iou(ref_xyxy.astype(np.float32), cand_xyxy.astype(np.float32))
+    ious[ref_cls[:, None] != cand_cls[None, :]] = 0.0
+    matched, deltas = 0, []
+    for i in np.argsort(-ref_conf):
+        j = int(np.argmax(ious[i]))
+        if ious[i, j] >= iou_threshold:
+            matched += 1
+            deltas.append(float(cand_conf[j] - ref_conf[i]))
+            ious[:, j] = 0.0
+    return matched, deltas
+
+
+def _timed_run(backend, frames, classes, conf, imgsz):
+    results, latencies = [], []
+    start = time.perf_counter()
+    for frame in frames:
+        t0 = time.perf_counter()
+        results.append(backend.predict([frame], classes=classes, conf=conf, imgsz=imgsz)[0])
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+    lat = np.array(latencies) * 1000
+    return results, {
+        "fps": len(frames) / total if total else 0.0,
+        "mean_ms": float(lat.mean()) if len(lat) else 0.0,
+        "p95_ms": float(np.percentile(lat, 95)) if len(lat) else 0.0,
+        "detections": int(sum(len(r[0]) for r in results)),
+    }
+
+
+def compare_backends(reference, candidate, frames, classes=None, conf=0.25, imgsz=640, iou_threshold=0.5, warmup=3):
+    """Latency/throughput of both backends and agreement of ``candidate`` with ``reference``.
+
+    Agreement treats the reference detections as ground truth: recall is
+    the fraction of reference boxes reproduced, precision the fraction of
+    candidate boxes that match one.
+    """
+    for backend in (reference, candidate):
+        for frame in frames[:warmup]:
+            backend.predict([frame], classes=classes, conf=conf, imgsz=imgsz)
+
+    ref_results, ref_perf = _timed_run(reference, frames, classes, conf, imgsz)
+    cand_results, cand_perf = _timed_run(candidate, frames, classes, conf, imgsz)
+
+    matched, deltas = 0, []
+    for ref, cand in zip(ref_results, cand_results):
+        m, d = match_detections(ref, cand, iou_threshold)
+        matched += m
+        deltas.extend(d)
+    n_ref, n_cand = ref_perf["detections"], cand_perf["detections"]
+    recall = matched / n_ref if n_ref else 1.0
+    precision = matched / n_cand if n_cand else 1.0
+    return {
+        "frames": len(frames),
+        "reference": ref_perf,
+        "candidate": cand_perf,
+        "speedup": cand_perf["fps"] / ref_perf["fps"] if ref_perf["fps"] else 0.0,
+        "agreement": {
+            "matched": matched,
+            "recall": recall,
+            "precision": precision,
+            "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+            "mean_conf_delta": float(np.mean(deltas)) if deltas else 0.0,
+        },
+    }
@@ -0,0 +1,136 @@
+import math
+import time
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración por defecto de la escalera de resolución; se sobrescribe con
+# la clave "resolution_ladder" de cada cámara en config.json.
+DEFAULT_LADDER_CONFIG = {
+    "enabled": False,
+    "rungs": [416, 640, 960],   # Lado largo de cada peldaño
+    "start": 1,                 # Peldaño inicial (índice en rungs)
+    "up_load": 0.5,             # Subir solo si el hilo está ocupado menos que esto
+    "down_load": 0.85,          # Bajar si el hilo está ocupado más que esto
+    "small_target_px": 24,      # Objetivo "pequeño": lado menor en píxeles de entrada de la red
+    "window_s": 5.0,            # Periodo de medición
+    "cooldown_s": 10.0,         # Tiempo mínimo entre cambios
+}
+
+
+def build_ladder_config(overrides=None):
+    config = DEFAULT_LADDER_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+def rect_shape(frame_w, frame_h, long_side, stride=32):
+    """Aspect-preserving ``(h, w)`` network input with ``long_side`` pixels on the long edge.
+
+    The short edge is rounded up to a multiple of ``stride`` so no image
+    content is cropped; for 16:9 at 640 this gives ``(384, 640)``.
+    """
+    long_side = int(math.ceil(long_side / stride) * stride)
+    if frame_w >= frame_h:
+        short = long_side * frame_h / frame_w
+        return int(math.ceil(short / stride) * stride), long_side
+    short = long_side * frame_w / frame_h
+    return long_side, int(math.ceil(short / stride) * stride)
+
+
+def padding_ratio(frame_w, frame_h, shape):
+    """Fraction of the network input that is letterbox padding."""
+    h, w = shape
+    scale = min(h / frame_h, w / frame_w)
+    return 1.0 - (frame_w * scale) * (frame_h * scale) / float(h * w)
+
+
+class ResolutionLadder:
+    """Step a camera's inference resolution up or down.
+
+    Steps down when the detector thread is busy more than ``down_load`` of
+    the time, up when small targets are tracked and there is headroom, and
+    back towards ``start`` when no small targets remain.
+    """
+
+    def __init__(self, config=None, clock=time.monotonic, name=""):
+        self.config = build_ladder_config(config)
+        self.enabled = bool(self.config["enabled"])
+        self.rungs = sorted(int(r) for r in self.config["rungs"])
+        self.start = min(max(0, int(self.config["start"])), len(self.rungs) - 1)
+        self.index = self.start
+        self.name = name
+        self._clock = clock
+        self._window_start = clock()
+        self._last_change = None
+        self._busy_s = 0.0
+        self._small_seen = False
+        self._shapes = {}
+        self.load = 0.0
+
+    @property
+    def long_side(self):
+        return self.rungs[self.index]
+
+    def shape_for(self, frame_w, frame_h):
+        key = (self.index, frame_w, frame_h)
+        shape = self._shapes.get(key)
+        if shape is None:
+            shape = self._shapes[key] = rect_shape(frame_w, frame_h, self.long_side)
+        return shape
+
+    def record(self, busy_s, min_target_side, frame_w, frame_h):
+        """Account one processed frame and step the ladder when the window closes.
+
+        ``min_target_side`` is the smallest detection's short side in frame
+        pixels (``None`` when nothing was detected). Returns True if the
+        rung changed.
+        """
+        self._busy_s += busy_s
+        if min_target_side is not None:
+            scale = self.long_side / float(max(frame_w, frame_h))
+            if min_target_side * scale < self.config["small_target_px"]:
+                self._small_seen = True
+
+        now = self._clock()
+        elapsed = now - self._window_start
+        if elapsed < self.config["window_s"]:
+            return False
+        self.load = self._busy_s / elapsed
+        small = self._small_seen
+        self._window_start = now
+        self._busy_s = 0.0
+        self._small_seen = False
+
+        if self._last_change is not None and now - self._last_change < self.config["cooldown_s"]:
+            return False
+
+        previous = self.index
+        if self.load > self.config["down_load"] and self.index > 0:
+            self.index -= 1
+            reason = "carga"
+        elif small and self.load < self.config["up_load"] and self.index < len(self.rungs) - 1:
+            self.index += 1
+            reason = "objetivos pequeños"
+        elif not small and self.index > self.start:
+            self.index -= 1
+            reason = "sin objetivos pequeños"
+        else:
+            return False
+
+        self._last_change = now
+        logger.info(
+            "Escalera de resolución %s: %d -> %d (%s, ocupación %.0f%%)",
+            self.name, self.rungs[previous], self.long_side, reason, self.load * 100,
+        )
+        return True
+
+    def get_status(self, frame_w=None, frame_h=None):
+        status = {"rung": self.index, "long_side": self.long_side, "load": round(self.load, 2)}
+        if frame_w and frame_h:
+            status["shape"] = self.shape_for(frame_w, frame_h)
+        return status
@@ -0,0 +1,142 @@
+import time
+from collections import OrderedDict
+
+from core.detector_worker import merge_model_detections
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+# Configuración por defecto del fusionador de resultados; se sobrescribe con
+# la clave "result_merger" de cada cámara en config.json.
+DEFAULT_MERGER_CONFIG = {
+    "window": 4,            # Frames en vuelo esperando resultados
+    "deadline_ms": 500,     # Espera máxima por los modelos lentos antes de fusionar lo recibido
+    "merge_iou": 0.5,       # Umbral para considerar el mismo objeto entre modelos
+    "carry_forward_s": 3.0, # Reutilizar el último resultado de un modelo que no corrió en el frame
+}
+
+
+def build_merger_config(overrides=None):
+    config = DEFAULT_MERGER_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+class _Pending:
+    __slots__ = ("frame", "expected", "results", "opened")
+
+    def __init__(self, frame, expected, opened):
+        self.frame = frame
+        self.expected = expected
+        self.results = {}
+        self.opened = opened
+
+
+class ResultMerger:
+    """Collect per-model results for a window of in-flight frame ids.
+
+    Frames are released strictly in id order, as ``(frame_id, frame,
+    detections)``: as soon as every expected model reported, or with
+    whatever arrived once ``deadline_ms`` elapsed (a partial merge). A
+    frame pushed out of the window is merged the same way instead of being
+    discarded. A result for a frame already released is counted as
+    ``late`` and kept as its model's last result, so the next released
+    frame carries it forward; only a late result older than one already
+    released for the same model is dropped. Frames whose deadline passed
+    with no result at all are skipped (``expired``).
+
+    Models with no result on a released frame (not scheduled on it, or
+    late) contribute their last released detections if younger than
+    ``carry_forward_s``, so the tracker keeps their objects alive.
+    """
+
+    def __init__(self, model_keys, config=None, clock=time.monotonic, name=""):
+        self.config = build_merger_config(config)
+        self.model_keys = list(model_keys)
+        self.name = name
+        self._clock = clock
+        self._pending = OrderedDict()
+        self._last = {}  # model_key -> (detecciones, instante, frame_id)
+        self.merged = 0
+        self.partial = 0
+        self.expired = 0
+        self.late = 0
+        self.dropped = 0
+        self.carried = 0
+
+    def open_frame(self, frame_id, frame=None, expected=None):
+        """Register a frame sent to the detectors; returns the frames released meanwhile."""
+        expected = frozenset(self.model_keys if expected is None else expected)
+        self._pending[frame_id] = _Pending(frame, expected, self._clock())
+        released = []
+        while len(self._pending) > max(1, int(self.config["window"])):
+            released.extend(self._release_head(forced=True))
+        released.extend(self.poll())
+        return released
+
+    def add_result(self, frame_id, model_key, detections):
+        """Store one model's detections; returns the frames ready in order."""
+        pending = self._pending.get(frame_id)
+        if pending is None:
+            last = self._last.get(model_key)
+            if last is not None and frame_id < last[2]:
+                # Ya se entregó un resultado más nuevo de este modelo
+                self.dropped += 1
+                return []
+            # El frame ya salió: el resultado se arrastra al siguiente en vez de descartarse
+            self.late += 1
+            self._last[model_key] = (detections, self._clock(), frame_id)
+            logger.debug("%s: resultado tardío de %s para el frame %s", self.name, model_key, frame_id)
+            return []
+        pending.results[model_key] = detections
+        return self.poll()
+
+    def poll(self):
+        """Release complete frames and those past their deadline, in order."""
+        deadline = float(self.config["deadline_ms"]) / 1000.0
+        now = self._clock()
+        released = []
+        while self._pending:
+            head = next(iter(self._pending.values()))
+            if not head.expected <= head.results.keys() and now - head.opened < deadline:
+                break
+            released.extend(self._release_head())
+        return released
+
+    def _release_head(self, forced=False):
+        frame_id, pending = self._pending.popitem(last=False)
+        if not pending.results:
+            self.expired += 1
+            logger.debug("%s: frame %s sin resultados%s", self.name, frame_id, " (ventana llena)" if forced else "")
+            return []
+        if not pending.expected <= pending.results.keys():
+            self.partial += 1
+            missing = sorted(pending.expected - pending.results.keys())
+            logger.debug("%s: fusión parcial del frame %s, faltan %s", self.name, frame_id, missing)
+        now = self._clock()
+        parts = list(pending.results.values())
+        for key in self.model_keys:
+            if key in pending.results:
+                self._last[key] = (pending.results[key], now, frame_id)
+            elif key in self._last:
+                previous, at, _ = self._last[key]
+                if now - at <= float(self.config["carry_forward_s"]):
+                    parts.append(previous)
+                    self.carried += 1
+        self.merged += 1
+        detections = merge_model_detections(parts, self.config["merge_iou"])
+        return [(frame_id, pending.frame, detections)]
+
+    def get_stats(self):
+        return {
+            "merged": self.merged,
+            "partial": self.partial,
+            "expired": self.expired,
+            "late": self.late,
+            "dropped": self.dropped,
+            "carried": self.carried,
+            "pending": len(self._pending),
+        }
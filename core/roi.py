@@ -0,0 +1,105 @@
+import numpy as np
+
+# Configuración por defecto del recorte por región de interés; se sobrescribe
+# con la clave "roi" de cada cámara en config.json.
+DEFAULT_ROI_CONFIG = {
+    "enabled": True,
+    "max_rects": 4,         # Máximo de recortes por frame
+    "margin": 16,           # Píxeles extra alrededor de cada recorte
+    "max_area_ratio": 0.85, # Por encima de esta fracción se usa el frame completo
+    "merge_slack": 1.3,     # Unir recortes si el área unida no crece más de esto
+    "merge_iou": 0.5,       # Supresión de duplicados entre recortes solapados
+}
+
+
+def build_roi_config(overrides=None):
+    config = DEFAULT_ROI_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+def _area(rect):
+    return (rect[2] - rect[0]) * (rect[3] - rect[1])
+
+
+def _union(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _components(enabled):
+    """Bounding ``(row0, col0, row1, col1)`` of each 4-connected group of cells."""
+    pending = set(enabled)
+    rects = []
+    while pending:
+        stack = [pending.pop()]
+        r0 = r1 = stack[0][0]
+        c0 = c1 = stack[0][1]
+        while stack:
+            row, col = stack.pop()
+            r0, r1 = min(r0, row), max(r1, row)
+            c0, c1 = min(c0, col), max(c1, col)
+            for cell in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+                if cell in pending:
+                    pending.remove(cell)
+                    stack.append(cell)
+        rects.append((r0, c0, r1 + 1, c1 + 1))
+    return rects
+
+
+def compute_roi_cells(discarded_cells, filas, columnas, max_rects=4, merge_slack=1.3):
+    """Cell rectangles ``(row0, col0, row1, col1)`` (end exclusive) covering the enabled cells.
+
+    Returns ``None`` when no cell is discarded (use the full frame) and an
+    empty list when every cell is discarded. Nearby groups are merged while
+    the merged rectangle stays within ``merge_slack`` of the summed areas,
+    and the cheapest pairs are merged until at most ``max_rects`` remain.
+    """
+    discarded = {tuple(c) for c in (discarded_cells or ())}
+    if not discarded:
+        return None
+    enabled = {
+        (row, col)
+        for row in range(filas)
+        for col in range(columnas)
+        if (row, col) not in discarded
+    }
+    rects = _components(enabled)
+
+    while len(rects) > 1:
+        best = None
+        for i in range(len(rects)):
+            for j in range(i + 1, len(rects)):
+                merged = _union(rects[i], rects[j])
+                cost = _area(merged) / (_area(rects[i]) + _area(rects[j]))
+                if best is None or cost < best[0]:
+                    best = (cost, i, j, merged)
+        cost, i, j, merged = best
+        if cost > merge_slack and len(rects) <= max_rects:
+            break
+        rects = [r for k, r in enumerate(rects) if k not in (i, j)] + [merged]
+    return sorted(rects)
+
+
+def roi_to_pixels(roi_cells, filas, columnas, frame_w, frame_h, margin=0):
+    """Convert cell rectangles to ``(x1, y1, x2, y2)`` pixel crops, padded by ``margin``."""
+    cell_w = frame_w / columnas
+    cell_h = frame_h / filas
+    rects = []
+    for row0, col0, row1, col1 in roi_cells:
+        x1 = max(0, int(col0 * cell_w) - margin)
+        y1 = max(0, int(row0 * cell_h) - margin)
+        x2 = min(frame_w, int(np.ceil(col1 * cell_w)) + margin)
+        y2 = min(frame_h, int(np.ceil(row1 * cell_h)) + margin)
+        if x2 > x1 and y2 > y1:
+            rects.append((x1, y1, x2, y2))
+    return rects
+
+
+def roi_area_ratio(rects, frame_w, frame_h):
+    """Fraction of the frame covered by ``rects`` (overlaps counted twice)."""
+    if not frame_w or not frame_h:
+        return 0.0
+    return sum(_area(r) for r in rects) / float(frame_w * frame_h)
@@ -1,14 +1,17 @@
 from urllib.parse import quote
 
-def generar_rtsp(cam_data):
+def generar_rtsp(cam_data, perfil=None):
     canal = cam_data.get("canal", "2")
     usuario = cam_data.get("usuario", "admin")
     contrasena = quote(cam_data.get("contrasena", ""))
     ip = cam_data["ip"]
     puerto = 554
 
+    if perfil is None:
+        perfil = cam_data.get("resolucion", cam_data.get("perfil", "main"))
+    perfil = perfil.lower()
+
     if cam_data.get('tipo') == 'nvr':
-        perfil = cam_data.get("resolucion", cam_data.get("perfil", "main")).lower()
         perfil_id = {
             "main": "s0",
             "sub": "s1",
@@ -17,7 +20,6 @@ def generar_rtsp(cam_data):
         }.get(perfil, "s1")
         return f"rtsp://{usuario}:{contrasena}@{ip}:{puerto}/unicast/c{canal}/{perfil_id}/live"
     else:
-        perfil = cam_data.get("resolucion", cam_data.get("perfil", "main")).lower()
         video_n = {
             "main": "video1",
             "sub": "video2",
@@ -25,3 +27,10 @@ def generar_rtsp(cam_data):
             "more low": "video4"
         }.get(perfil, "video1")
         return f"rtsp://{usuario}:{contrasena}@{ip}:{puerto}/media/{video_n}"
+
+
+def generar_rtsp_dual(cam_data, perfil_sub="sub", perfil_main="main"):
+    """Return ``(sub_url, main_url)``; explicit ``rtsp_sub``/``rtsp_main`` keys win."""
+    sub = cam_data.get("rtsp_sub") or generar_rtsp(cam_data, perfil_sub)
+    main = cam_data.get("rtsp_main") or generar_rtsp(cam_data, perfil_main)
+    return sub, main
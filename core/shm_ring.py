@@ -0,0 +1,95 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Campos por ranura en la cabecera: secuencia, frame_id, alto, ancho, canales
+_FIELDS = 5
+_META = 2  # ranuras, bytes por ranura
+
+
+class SharedFrameRing:
+    """Fixed-size ring of frame slots in shared memory.
+
+    The producer writes into the next slot and publishes ``(slot, seq)``
+    over any cheap channel; the consumer copies the slot out and checks the
+    sequence number did not change meanwhile (seqlock), so a slot
+    overwritten during the read is detected instead of returned torn.
+    Only one process may write.
+    """
+
+    def __init__(self, slot_bytes=None, slots=3, name=None):
+        if name is None:
+            if not slot_bytes:
+                raise ValueError("slot_bytes es obligatorio al crear el anillo")
+            self.slots = int(slots)
+            self.slot_bytes = int(slot_bytes)
+            size = self._data_offset(self.slots) + self.slots * self.slot_bytes
+            self._shm = shared_memory.SharedMemory(create=True, size=size)
+            self._owner = True
+            meta = np.ndarray((_META,), dtype=np.int64, buffer=self._shm.buf)
+            meta[:] = (self.slots, self.slot_bytes)
+            del meta
+        else:
+            # Los procesos hijos comparten el resource_tracker del creador, que es quien borra el bloque
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+            meta = np.ndarray((_META,), dtype=np.int64, buffer=self._shm.buf)
+            self.slots, self.slot_bytes = int(meta[0]), int(meta[1])
+            del meta
+        self._header = np.ndarray(
+            (self.slots, _FIELDS), dtype=np.int64, buffer=self._shm.buf, offset=_META * 8
+        )
+        if self._owner:
+            self._header[:] = 0
+        self._next = 0
+
+    @staticmethod
+    def _data_offset(slots):
+        header = (_META + slots * _FIELDS) * 8
+        return (header + 63) // 64 * 64
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def _view(self, slot, shape):
+        offset = self._data_offset(self.slots) + slot * self.slot_bytes
+        return np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf, offset=offset)
+
+    def write(self, frame, frame_id=0):
+        """Copy ``frame`` (uint8) into the next slot; returns ``(slot, seq)``."""
+        if frame.dtype != np.uint8:
+            raise ValueError("Solo se admiten frames uint8")
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame de {frame.nbytes} bytes no cabe en ranuras de {self.slot_bytes}")
+        slot = self._next
+        self._next = (slot + 1) % self.slots
+        header = self._header[slot]
+        seq = int(header[0]) + 1
+        header[0] = seq  # impar: escritura en curso
+        np.copyto(self._view(slot, frame.shape), frame)
+        h, w = frame.shape[:2]
+        header[1:] = (frame_id, h, w, frame.shape[2] if frame.ndim == 3 else 0)
+        header[0] = seq + 1
+        return slot, seq + 1
+
+    def read(self, slot, seq):
+        """Return ``(frame_copy, frame_id)`` or ``None`` if the slot was overwritten."""
+        header = self._header[slot]
+        if int(header[0]) != seq:
+            return None
+        frame_id, h, w, c = (int(v) for v in header[1:])
+        shape = (h, w, c) if c else (h, w)
+        frame = self._view(slot, shape).copy()
+        if int(header[0]) != seq:
+            return None
+        return frame, frame_id
+
+    def close(self):
+        self._header = None
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
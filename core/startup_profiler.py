@@ -0,0 +1,78 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+
+class StartupProfiler:
+    """Wall-clock breakdown of application startup.
+
+    Synchronous phases are timed with :meth:`phase`; background work
+    (model loading/warm-up) is bracketed with :meth:`task_started` and
+    :meth:`task_finished`. Once :meth:`seal` was called and no background
+    task is pending, the full breakdown is logged once.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._t0 = clock()
+        self._lock = threading.Lock()
+        self.phases = []  # (nombre, inicio relativo s, duración s)
+        self._pending = 0
+        self._sealed = False
+        self._done = False
+
+    def elapsed(self):
+        return self._clock() - self._t0
+
+    @contextmanager
+    def phase(self, name):
+        start = self._clock()
+        try:
+            yield
+        finally:
+            self.record(name, self._clock() - start, start)
+
+    def record(self, name, duration, start=None):
+        start = self._clock() - duration if start is None else start
+        with self._lock:
+            self.phases.append((name, start - self._t0, duration))
+
+    def task_started(self):
+        with self._lock:
+            self._pending += 1
+
+    def task_finished(self, name, duration):
+        self.record(name, duration)
+        with self._lock:
+            self._pending -= 1
+        self._maybe_finish()
+
+    def seal(self):
+        """No more startup tasks will be queued; report when the pending ones finish."""
+        with self._lock:
+            self._sealed = True
+        self._maybe_finish()
+
+    def _maybe_finish(self):
+        with self._lock:
+            if self._done or not self._sealed or self._pending > 0:
+                return
+            self._done = True
+        self.report("modelos listos")
+
+    def report(self, title):
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        lines = [f"Arranque ({title}) a los {self.elapsed():.2f} s:"]
+        for name, start, duration in phases:
+            lines.append(f"  +{start:7.2f} s  {duration * 1000:9.1f} ms  {name}")
+        logger.info("\n".join(lines))
+        return phases
+
+
+# Perfil compartido por toda la aplicación; el reloj empieza al importar este módulo
+startup_profiler = StartupProfiler()
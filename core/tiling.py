@@ -0,0 +1,108 @@
+import numpy as np
+
+from core.yolo_postprocess import batched_nms
+
+# Configuración por defecto del modo por teselas; se sobrescribe con la clave
+# "tiling" de cada cámara en config.json.
+DEFAULT_TILING_CONFIG = {
+    "enabled": False,
+    "tile_size": 640,       # Lado de la tesela en píxeles del frame original
+    "overlap": 0.2,         # Fracción de solape entre teselas vecinas
+    "classes": None,        # Clases que usan teselas (None = todas las del modelo)
+    "max_batch": 8,         # Teselas por llamada a predict
+    "merge_iou": 0.5,       # Umbral de supresión entre teselas
+    "full_frame": True,     # Ejecutar también el frame completo (objetos grandes)
+}
+
+
+def build_tiling_config(overrides=None):
+    config = DEFAULT_TILING_CONFIG.copy()
+    if overrides:
+        for key, value in overrides.items():
+            if key in config:
+                config[key] = value
+    return config
+
+
+def _axis_starts(length, tile, step):
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, step))
+    starts.append(length - tile)
+    return starts
+
+
+def generate_tiles(frame_w, frame_h, tile_size, overlap=0.2):
+    """Overlapping ``(x1, y1, x2, y2)`` tiles covering the whole frame.
+
+    The last row/column is aligned to the frame edge so every tile has the
+    full size (unless the frame itself is smaller).
+    """
+    tile_size = int(tile_size)
+    step = max(1, int(tile_size * (1.0 - float(overlap))))
+    tiles = []
+    for y in _axis_starts(frame_h, tile_size, step):
+        for x in _axis_starts(frame_w, tile_size, step):
+            tiles.append((x, y, min(frame_w, x + tile_size), min(frame_h, y + tile_size)))
+    return tiles
+
+
+def cells_in_rect(rect, filas, columnas, frame_w, frame_h):
+    """Grid cells ``(row, col)`` overlapped by ``rect`` in frame pixels."""
+    x1, y1, x2, y2 = rect
+    cell_w = frame_w / columnas
+    cell_h = frame_h / filas
+    col_start = max(0, int(x1 // cell_w))
+    col_end = min(columnas - 1, int((x2 - 1) // cell_w))
+    row_start = max(0, int(y1 // cell_h))
+    row_end = min(filas - 1, int((y2 - 1) // cell_h))
+    return {
+        (row, col)
+        for row in range(row_start, row_end + 1)
+        for col in range(col_start, col_end + 1)
+    }
+
+
+def tile_is_discarded(tile, discarded_cells, filas, columnas, frame_w, frame_h):
+    """True when every grid cell under ``tile`` is in ``discarded_cells``."""
+    if not discarded_cells:
+        return False
+    return cells_in_rect(tile, filas, columnas, frame_w, frame_h) <= discarded_cells
+
+
+def offset_detections(detections, dx, dy):
+    """Shift ``(xyxy, cls, conf)`` from tile to frame coordinates."""
+    xyxy, cls, conf = detections
+    if len(xyxy) == 0:
+        return detections
+    shifted = xyxy.astype(np.float32, copy=True)
+    shifted[:, [0, 2]] += dx
+    shifted[:, [1, 3]] += dy
+    return shifted, cls, conf
+
+
+def scale_detections(detections, sx, sy):
+    """Scale ``(xyxy, cls, conf)`` from a resized image back to frame coordinates."""
+    xyxy, cls, conf = detections
+    if len(xyxy) == 0:
+        return detections
+    scaled = np.array(xyxy, dtype=np.float32)
+    scaled[:, [0, 2]] *= sx
+    scaled[:, [1, 3]] *= sy
+    return scaled, cls, conf
+
+
+def merge_detections(parts, iou_threshold=0.5):
+    """Concatenate detection arrays and run class-aware NMS across them.
+
+    Uses intersection over the smaller box so a boat cut by a tile border
+    is suppressed by its complete copy from the neighbouring tile.
+    """
+    parts = [p for p in parts if len(p[0])]
+    if not parts:
+        return np.zeros((0, 4), dtype=np.float32), np.zeros((0,), dtype=np.int64), np.zeros((0,), dtype=np.float32)
+    xyxy = np.concatenate([p[0] for p in parts]).astype(np.float32)
+    cls = np.concatenate([p[1] for p in parts]).astype(np.int64)
+    conf = np.concatenate([p[2] for p in parts]).astype(np.float32)
+    keep = batched_nms(xyxy, conf, cls, iou_threshold, metric="ios")
+    return xyxy[keep], cls[keep], conf[keep]
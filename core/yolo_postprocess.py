@@ -0,0 +1,180 @@
+import numpy as np
+
+from logging_utils import get_logger
+
+logger = get_logger(__name__)
+
+_EMPTY_XYXY = np.zeros((0, 4), dtype=np.float32)
+_EMPTY_CLS = np.zeros((0,), dtype=np.int64)
+_EMPTY_CONF = np.zeros((0,), dtype=np.float32)
+
+
+def _to_numpy(values):
+    if hasattr(values, "cpu"):
+        values = values.cpu()
+    if hasattr(values, "numpy"):
+        return values.numpy()
+    return np.asarray(values)
+
+
+def boxes_to_arrays(boxes):
+    """Extract ``(xyxy, cls, conf)`` arrays from Ultralytics ``Boxes``.
+
+    Uses ``boxes.data`` (``[x1, y1, x2, y2, (id), conf, cls]`` per row) so the
+    whole result is moved to host memory in a single transfer.
+    """
+    if boxes is None or len(boxes) == 0:
+        return _EMPTY_XYXY, _EMPTY_CLS, _EMPTY_CONF
+    data = _to_numpy(boxes.data)
+    if data.ndim != 2 or data.shape[0] == 0:
+        return _EMPTY_XYXY, _EMPTY_CLS, _EMPTY_CONF
+    return data[:, :4], data[:, -1].astype(np.int64), data[:, -2]
+
+
+def clamp_boxes(xyxy, cls, conf, frame_w, frame_h):
+    """Clamp boxes to the frame and drop the degenerate ones.
+
+    Matches the scalar path: coordinates are clipped to ``[0, w-1]`` /
+    ``[0, h-1]`` and truncated to ``int``; boxes with ``x2 <= x1`` or
+    ``y2 <= y1`` after clamping are discarded.
+    """
+    if len(xyxy) == 0:
+        return np.zeros((0, 4), dtype=np.int64), _EMPTY_CLS, _EMPTY_CONF
+    with np.errstate(invalid="ignore"):
+        clamped = _clip_to_frame(xyxy, frame_w, frame_h)
+    valid = (clamped[:, 2] > clamped[:, 0]) & (clamped[:, 3] > clamped[:, 1])
+    valid &= np.isfinite(xyxy).all(axis=1)
+    if not valid.all():
+        logger.debug("Descartados %d boxes inválidos tras el recorte", int((~valid).sum()))
+    return clamped[valid], cls[valid], conf[valid]
+
+
+def _clip_to_frame(xyxy, frame_w, frame_h):
+    upper = np.array([frame_w - 1, frame_h - 1, frame_w - 1, frame_h - 1], dtype=xyxy.dtype)
+    clamped = np.maximum(np.minimum(xyxy, upper), 0)
+    return np.nan_to_num(clamped).astype(np.int64)
+
+
+def select_classes(xyxy, cls, conf, classes):
+    """Keep only rows whose class is in ``classes``."""
+    mask = np.isin(cls, np.asarray(list(classes), dtype=np.int64))
+    return xyxy[mask], cls[mask], conf[mask]
+
+
+def remap_classes(cls, remap):
+    """Apply a ``{original: unified}`` class map to an array of classes."""
+    if not remap or len(cls) == 0:
+        return cls
+    out = cls.copy()
+    for src, dst in remap.items():
+        out[cls == src] = dst
+    return out
+
+
+def to_detections(xyxy, cls, conf):
+    """Build the ``[{'bbox', 'cls', 'conf'}]`` list used by the trackers."""
+    return [
+        {'bbox': bbox, 'cls': c, 'conf': p}
+        for bbox, c, p in zip(xyxy.tolist(), cls.tolist(), conf.astype(np.float64).tolist())
+    ]
+
+
+def postprocess_boxes(boxes, frame_w, frame_h, classes=None, remap=None):
+    """Vectorized equivalent of :func:`postprocess_boxes_scalar`."""
+    xyxy, cls, conf = boxes_to_arrays(boxes)
+    xyxy, cls, conf = clamp_boxes(xyxy, cls, conf, frame_w, frame_h)
+    if classes is not None:
+        xyxy, cls, conf = select_classes(xyxy, cls, conf, classes)
+    return to_detections(xyxy, remap_classes(cls, remap), conf)
+
+
+def postprocess_boxes_scalar(boxes, frame_w, frame_h, classes=None, remap=None):
+    """Reference per-box implementation, used to validate and benchmark the vectorized path."""
+    detections = []
+    if boxes is None or len(boxes) == 0:
+        return detections
+    allowed = set(classes) if classes is not None else None
+    for r in boxes:
+        x1_orig, y1_orig, x2_orig, y2_orig = r.xyxy[0].tolist()
+        try:
+            x1 = int(max(0, min(x1_orig, frame_w - 1)))
+            y1 = int(max(0, min(y1_orig, frame_h - 1)))
+            x2 = int(max(0, min(x2_orig, frame_w - 1)))
+            y2 = int(max(0, min(y2_orig, frame_h - 1)))
+        except (ValueError, OverflowError):
+            continue
+        if x2 <= x1 or y2 <= y1:
+            continue
+        cls = int(r.cls[0])
+        conf = float(r.conf[0])
+        if allowed is not None and cls not in allowed:
+            continue
+        if remap:
+            cls = remap.get(cls, cls)
+        detections.append({'bbox': [x1, y1, x2, y2], 'cls': cls, 'conf': conf})
+    return detections
+
+
+def nms(xyxy, scores, iou_threshold=0.7, metric="iou"):
+    """Greedy non-maximum suppression; returns the kept indices (by score).
+
+    ``metric="ios"`` uses intersection over the smaller box instead of IoU.
+    """
+    if len(xyxy) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    boxes = xyxy.astype(np.float32, copy=False)
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = np.maximum(0, x2 - x1) * np.maximum(0, y2 - y1)
+    order = np.argsort(-scores, kind="stable")
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        w = np.maximum(0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        h = np.maximum(0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = w * h
+        if metric == "ios":
+            denom = np.minimum(areas[i], areas[rest])
+        else:
+            denom = areas[i] + areas[rest] - inter
+        iou_vals = np.divide(inter, denom, out=np.zeros_like(inter), where=denom > 0)
+        order = rest[iou_vals <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def batched_nms(xyxy, scores, classes, iou_threshold=0.7, metric="iou"):
+    """Class-aware NMS: boxes of different classes never suppress each other."""
+    if len(xyxy) == 0:
+        return np.zeros((0,), dtype=np.int64)
+    # Desplazar cada clase a su propia región para una sola pasada de NMS
+    offset = classes.astype(np.float32)[:, None] * (float(xyxy.max()) + 1.0)
+    return nms(xyxy.astype(np.float32) + offset, scores, iou_threshold, metric)
+
+
+def decode_yolov8_output(output, conf_threshold, classes=None, iou_threshold=0.7, max_det=300):
+    """Decode a raw YOLOv8 head ``(4 + nc, N)`` into ``(xyxy, cls, conf)``.
+
+    Coordinates stay in the network input space (before letterbox undo).
+    """
+    preds = np.asarray(output)
+    if preds.ndim == 3:
+        preds = preds[0]
+    preds = preds.T  # (N, 4 + nc)
+    scores_all = preds[:, 4:]
+    cls = scores_all.argmax(axis=1)
+    conf = scores_all[np.arange(len(cls)), cls]
+
+    mask = conf > conf_threshold
+    if classes is not None:
+        mask &= np.isin(cls, np.asarray(list(classes)))
+    preds, cls, conf = preds[mask], cls[mask], conf[mask]
+    if len(preds) == 0:
+        return np.zeros((0, 4), dtype=np.float32), _EMPTY_CLS, _EMPTY_CONF
+
+    cx, cy, w, h = preds[:, 0], preds[:, 1], preds[:, 2], preds[:, 3]
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    keep = batched_nms(xyxy, conf, cls, iou_threshold)[:max_det]
+    return xyxy[keep].astype(np.float32), cls[keep].astype(np.int64), conf[keep].astype(np.float32)
@@ -0,0 +1,156 @@
+import threading
+
+import cv2
+import numpy as np
+
+# Formatos de QVideoFrameFormat.PixelFormat que se leen sin pasar por toImage()
+YUV_PIXEL_FORMATS = ("Format_NV12", "Format_NV21", "Format_YUV420P", "Format_YV12")
+
+_CONVERSIONS = {
+    "rgb": cv2.COLOR_YUV2RGB_NV12,
+    "bgr": cv2.COLOR_YUV2BGR_NV12,
+}
+
+
+def fit_size(width, height, max_side):
+    """Even ``(w, h)`` with the long side at most ``max_side``, keeping the aspect."""
+    scale = min(1.0, float(max_side) / max(width, height))
+    w = max(2, int(round(width * scale / 2.0)) * 2)
+    h = max(2, int(round(height * scale / 2.0)) * 2)
+    return min(w, width - width % 2), min(h, height - height % 2)
+
+
+class YuvFrame:
+    """Luma plane plus interleaved chroma (NV12 layout) of one decoded frame.
+
+    Holding the planes costs one plain copy of 1.5 bytes per pixel; colour
+    conversion is deferred to :meth:`convert`, which scales the planes to
+    the size the consumer needs first and converts only those pixels.
+    Results are cached per ``(size, order)`` so consumers asking for the
+    same input share it. Safe to convert from several threads.
+    ``on_alloc(nbytes)``, if set, is told about every buffer a conversion
+    allocates (the frame bus uses it for its counters).
+    """
+
+    __slots__ = ("y", "uv", "on_alloc", "_cache", "_lock", "__weakref__")
+
+    def __init__(self, y, uv):
+        h, w = y.shape[:2]
+        if h % 2 or w % 2:
+            # 4:2:0 exige dimensiones pares; se recorta la última fila/columna
+            h, w = h - h % 2, w - w % 2
+            y = y[:h, :w]
+        self.y = y
+        self.uv = uv[: h // 2, : w // 2]
+        self.on_alloc = None
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_planes(cls, pixel_format, planes, width, height):
+        """Build from raw ``(buffer, bytes_per_line)`` planes of a 4:2:0 format.
+
+        The planes are copied without their row padding, so the source
+        buffer may be unmapped afterwards.
+        """
+        cw, ch = (width + 1) // 2, (height + 1) // 2
+
+        def plane(index, cols, rows):
+            buf, stride = planes[index]
+            data = np.frombuffer(buf, dtype=np.uint8, count=stride * (rows - 1) + cols)
+            return np.lib.stride_tricks.as_strided(data, (rows, cols), (stride, 1))
+
+        y = np.array(plane(0, width, height))
+        if pixel_format in ("Format_NV12", "Format_NV21"):
+            uv = np.array(plane(1, cw * 2, ch)).reshape(ch, cw, 2)
+            if pixel_format == "Format_NV21":
+                uv = np.ascontiguousarray(uv[:, :, ::-1])
+        elif pixel_format in ("Format_YUV420P", "Format_YV12"):
+            u, v = plane(1, cw, ch), plane(2, cw, ch)
+            if pixel_format == "Format_YV12":
+                u, v = v, u
+            uv = np.dstack((u, v))
+        else:
+            raise ValueError(f"Formato de píxel no soportado: {pixel_format}")
+        return cls(y, uv)
+
+    @classmethod
+    def from_video_frame(cls, frame):
+        """Map a ``QVideoFrame`` in a 4:2:0 format; ``None`` for any other format."""
+        pixel_format = frame.pixelFormat().name
+        if pixel_format not in YUV_PIXEL_FORMATS:
+            return None
+        if not frame.map(type(frame).MapMode.ReadOnly):
+            return None
+        try:
+            planes = []
+            for index in range(frame.planeCount()):
+                bits = frame.bits(index)
+                bits.setsize(frame.mappedBytes(index))
+                planes.append((bits, frame.bytesPerLine(index)))
+            return cls.from_planes(pixel_format, planes, frame.width(), frame.height())
+        finally:
+            frame.unmap()
+
+    @property
+    def width(self):
+        return self.y.shape[1]
+
+    @property
+    def height(self):
+        return self.y.shape[0]
+
+    @property
+    def shape(self):
+        return (self.height, self.width, 3)
+
+    @property
+    def nbytes(self):
+        return self.y.nbytes + self.uv.nbytes
+
+    def convert(self, size=None, order="rgb"):
+        """Return a ``(h, w, 3)`` uint8 image at ``size`` (``(w, h)``, full size by default)."""
+        w, h = size if size is not None else (self.width, self.height)
+        w, h = max(2, int(w) - int(w) % 2), max(2, int(h) - int(h) % 2)
+        key = (w, h, order)
+        with self._lock:
+            image = self._cache.get(key)
+        if image is not None:
+            return image
+
+        y, uv = self.y, self.uv
+        if (w, h) != (self.width, self.height):
+            y = cv2.resize(y, (w, h), interpolation=cv2.INTER_AREA)
+            uv = cv2.resize(uv, (w // 2, h // 2), interpolation=cv2.INTER_AREA)
+            self._allocated(y.nbytes)
+            self._allocated(uv.nbytes)
+        image = cv2.cvtColorTwoPlane(y, np.ascontiguousarray(uv), _CONVERSIONS[order])
+        image.flags.writeable = False
+        self._allocated(image.nbytes)
+        with self._lock:
+            return self._cache.setdefault(key, image)
+
+    def crop(self, x1, y1, x2, y2, order="rgb"):
+        """Convert only the full-resolution region ``[y1:y2, x1:x2]`` (not cached)."""
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(self.width, int(x2)), min(self.height, int(y2))
+        if x2 <= x1 or y2 <= y1:
+            return np.zeros((max(0, y2 - y1), max(0, x2 - x1), 3), np.uint8)
+        # La croma va por bloques de 2x2: se amplía la región a coordenadas pares
+        ex1, ey1 = x1 - x1 % 2, y1 - y1 % 2
+        ex2, ey2 = x2 + x2 % 2, y2 + y2 % 2
+        y = np.ascontiguousarray(self.y[ey1:ey2, ex1:ex2])
+        uv = np.ascontiguousarray(self.uv[ey1 // 2 : ey2 // 2, ex1 // 2 : ex2 // 2])
+        image = cv2.cvtColorTwoPlane(y, uv, _CONVERSIONS[order])
+        self._allocated(y.nbytes + uv.nbytes + image.nbytes)
+        return image[y1 - ey1 : y2 - ey1, x1 - ex1 : x2 - ex1]
+
+    def _allocated(self, nbytes):
+        if self.on_alloc is not None:
+            self.on_alloc(nbytes)
+
+    def to_rgb(self, size=None):
+        return self.convert(size, "rgb")
+
+    def to_bgr(self, size=None):
+        return self.convert(size, "bgr")
@@ -11,20 +11,21 @@ from PyQt6.QtWidgets import (
     QPushButton,
     QMessageBox,
 )
-from PyQt6.QtGui import QPixmap, QPainter, QPen, QColor, QBrush, QFont, QImage
+from PyQt6.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QBrush, QFont
 from PyQt6.QtCore import Qt, pyqtSignal, QRectF, QSizeF, QSize, QPointF, QTimer
-from PyQt6.QtMultimedia import QVideoFrame, QVideoFrameFormat
 from gui.visualizador_detector import VisualizadorDetector
 from core.gestor_alertas import GestorAlertas
 from core.rtsp_builder import generar_rtsp
 from core.analytics_processor import AnalyticsProcessor
 from gui.video_saver import VideoSaverThread
+from core.preroll_buffer import PrerollBuffer
 from core.cross_line_counter import CrossLineCounter
 from core.ptz_control import PTZCameraONVIF
-from collections import defaultdict, deque
-import numpy as np
+from collections import defaultdict
 from datetime import datetime
 import uuid
+import time
+import numpy as np
 import json
 import os
 
@@ -87,7 +88,7 @@ class GrillaWidget(QWidget):
         self._dragging_line = None
         self._last_mouse_pos = None
 
-        self.frame_buffer = deque(maxlen=50)
+        self.preroll = None
         self.pending_videos = []
         self.active_video_threads = []
 
@@ -109,19 +110,28 @@ class GrillaWidget(QWidget):
         # Contadores simplificados
         self.detection_count = 0
 
-    def set_fps_config(self, visual_fps=25, detection_fps=8, ui_update_fps=15):
+    def set_fps_config(self, visual_fps=25, detection_fps=8, ui_update_fps=15, adaptive_fps=None, model_cadence=None):
         """Actualizar configuración de FPS en tiempo real"""
+        if adaptive_fps is None:
+            adaptive_fps = self.fps_config.get("adaptive_fps", False)
+        if model_cadence is None:
+            model_cadence = self.fps_config.get("model_cadence")
+        elif self.cam_data is not None:
+            self.cam_data["model_cadence"] = model_cadence
         self.fps_config = {
             "visual_fps": visual_fps,
             "detection_fps": detection_fps, 
-            "ui_update_fps": ui_update_fps
+            "ui_update_fps": ui_update_fps,
+            "adaptive_fps": adaptive_fps
         }
+        if model_cadence is not None:
+            self.fps_config["model_cadence"] = model_cadence
         
         self.PAINT_UPDATE_INTERVAL = int(1000 / ui_update_fps)
         self.UI_UPDATE_INTERVAL = max(1, int(30 / visual_fps))
         
         if hasattr(self, 'visualizador') and self.visualizador:
-            self.visualizador.update_fps_config(visual_fps, detection_fps)
+            self.visualizador.update_fps_config(visual_fps, detection_fps, adaptive_fps, model_cadence)
         
         self.registrar_log(f"🎯 FPS actualizado - Visual: {visual_fps}, Detección: {detection_fps}, UI: {ui_update_fps}")
 
@@ -159,21 +169,53 @@ class GrillaWidget(QWidget):
         self.request_paint_update()
 
     def _handle_cross_event(self, info):
-        if self.last_frame is None:
+        if self.last_frame is None or self.preroll is None:
             return
         now = datetime.now()
+        ts = time.monotonic()  # Mismo reloj que los timestamps del frame bus
         fecha = now.strftime("%Y-%m-%d")
         hora = now.strftime("%H-%M-%S")
         ruta = os.path.join("capturas", "videos", fecha)
         os.makedirs(ruta, exist_ok=True)
         nombre = f"{fecha}_{hora}_{uuid.uuid4().hex[:6]}.mp4"
         path_final = os.path.join(ruta, nombre)
-        frames_copy = list(self.frame_buffer)
-        self.pending_videos.append({
-            "frames": frames_copy,
-            "frames_left": 50,
+        config = self.preroll.config
+        # El clip se arma del pre-roll comprimido cuando el anillo cubre el post-roll
+        rec = {
+            "since": ts - float(config["seconds"]),
+            "until": ts + float(config["post_seconds"]),
             "path": path_final,
-        })
+        }
+        evidence = getattr(self.visualizador, "evidence", None)
+        if evidence is not None:
+            # Post-roll del stream principal, comprimido al ritmo y ancho del pre-roll
+            def con_clip(frames, rec=rec):
+                if self.preroll is None:
+                    return
+                # Un clip corto (modo keyframes, cortes del stream) no cubre el post-roll
+                expected = float(config["post_seconds"]) * float(config["fps"])
+                if frames and len(frames) >= expected / 2:
+                    pre = self.preroll.snapshot(rec["since"], ts)
+                    # El clip se escribe al tamaño del pre-roll para no ampliar el sub-stream
+                    shape = pre[-1].shape if pre else frames[0].shape
+                    self._guardar_video({
+                        "frames": pre + list(frames),
+                        "path": rec["path"],
+                        "size": (shape[1], shape[0]),
+                    })
+                else:
+                    # Sin post-roll suficiente del principal: se completa con el sub-stream
+                    self.pending_videos.append(rec)
+
+            evidence.request_clip(
+                float(config["post_seconds"]),
+                con_clip,
+                fps=config["fps"],
+                max_width=config["max_width"],
+                quality=config["quality"],
+            )
+        else:
+            self.pending_videos.append(rec)
         self.registrar_log(f"🎥 Grabación iniciada: {nombre}")
 
     def perform_paint_update(self):
@@ -328,13 +370,24 @@ class GrillaWidget(QWidget):
         self.visualizador = VisualizadorDetector(cam_data)
         if self.visualizador:
             self.detector = getattr(self.visualizador, "detectors", [])
+            self._sync_grid_mask()
 
+        if self.alertas is not None:
+            # Modo doble stream: las capturas salen del stream principal
+            self.alertas.evidencia = self.visualizador.evidence
         self.visualizador.result_ready.connect(self.actualizar_boxes)
         self.visualizador.log_signal.connect(self.registrar_log)
         self.visualizador.iniciar()
         
-        if self.visualizador and self.visualizador.video_sink:
-            self.visualizador.video_sink.videoFrameChanged.connect(self.actualizar_pixmap_y_frame)
+        if self.preroll is not None:
+            self.preroll.close()
+        self.preroll = PrerollBuffer(cam_data.get("preroll"), name=str(current_cam_ip))
+        self.pending_videos = []
+        if self.visualizador and self.visualizador.frame_bus:
+            self.visualizador.frame_bus.subscribe(self.actualizar_pixmap_y_frame, wants=self._wants_ui_frame, name="display")
+            self.visualizador.frame_bus.subscribe(
+                self._alimentar_preroll, wants=lambda _seq: self.preroll is not None and self.preroll.due(), name="preroll"
+            )
             
         self.registrar_log(f"🎥 Vista configurada para {current_cam_ip}")
 
@@ -472,75 +525,22 @@ class GrillaWidget(QWidget):
         
         self.request_paint_update() 
 
-    def actualizar_pixmap_y_frame(self, frame):
-        if not frame.isValid():
-            return
-
+    def _wants_ui_frame(self, _seq):
         self.ui_frame_counter += 1
+        return self.ui_frame_counter % self.UI_UPDATE_INTERVAL == 0
 
-        if self.ui_frame_counter % self.UI_UPDATE_INTERVAL != 0:
-            return
-
-        image = None
-        numpy_frame = None
-        img_converted = None
+    def actualizar_pixmap_y_frame(self, shared):
+        """Display subscriber of the camera's frame bus (``SharedFrame``).
 
-        if frame.map(QVideoFrame.MapMode.ReadOnly):
-            try:
-                pf = frame.pixelFormat()
-                rgb_formats = set()
-                for name in [
-                    "Format_RGB24",
-                    "Format_RGB32",
-                    "Format_BGR24",
-                    "Format_BGR32",
-                    "Format_RGBX8888",
-                    "Format_RGBA8888",
-                    "Format_BGRX8888",
-                    "Format_BGRA8888",
-                    "Format_ARGB32",
-                ]:
-                    fmt = getattr(QVideoFrameFormat.PixelFormat, name, None)
-                    if fmt is not None:
-                        rgb_formats.add(fmt)
-
-                if pf in rgb_formats:
-                    img_format = QVideoFrameFormat.imageFormatFromPixelFormat(pf)
-                    if img_format != QImage.Format.Format_Invalid:
-                        qimg = QImage(
-                            frame.bits(),
-                            frame.width(),
-                            frame.height(),
-                            frame.bytesPerLine(),
-                            img_format,
-                        ).copy()
-                        image = qimg
-                        img_converted = qimg.convertToFormat(QImage.Format.Format_RGB888)
-                        ptr = img_converted.constBits()
-                        ptr.setsize(img_converted.width() * img_converted.height() * 3)
-                        numpy_frame = (
-                            np.frombuffer(ptr, dtype=np.uint8)
-                            .reshape((img_converted.height(), img_converted.width(), 3))
-                            .copy()
-                        )
-            finally:
-                frame.unmap()
-
-        if image is None:
-            image = frame.toImage()
-            if image.isNull():
-                return
-            img_converted = image.convertToFormat(QImage.Format.Format_RGB888)
-            ptr = img_converted.constBits()
-            ptr.setsize(img_converted.width() * img_converted.height() * 3)
-            numpy_frame = (
-                np.frombuffer(ptr, dtype=np.uint8)
-                .reshape((img_converted.height(), img_converted.width(), 3))
-                .copy()
-            )
+        Only a frame at the widget's width is converted here, on the GUI
+        thread; alert captures slice the full-resolution frame through a
+        :class:`~core.frame_bus.FrameView` on their own thread.
+        """
+        # Contiguo para QImage (un frame sin reducir puede traer relleno por fila)
+        display = np.ascontiguousarray(shared.resized(max(2, self.width())))
 
-        current_frame_width = img_converted.width()
-        current_frame_height = img_converted.height()
+        current_frame_width = shared.width
+        current_frame_height = shared.height
         if (
             self.original_frame_size is None
             or self.original_frame_size.width() != current_frame_width
@@ -548,23 +548,28 @@ class GrillaWidget(QWidget):
         ):
             self.original_frame_size = QSize(current_frame_width, current_frame_height)
 
-        self.last_frame = numpy_frame
-        self.frame_buffer.append(numpy_frame)
-        
+        self.last_frame = shared.view()
+
+        # fromImage copia los píxeles: el array solo tiene que vivir hasta aquí
+        image = QImage(display.data, display.shape[1], display.shape[0], display.strides[0], QImage.Format.Format_RGB888)
+        self.pixmap = QPixmap.fromImage(image)
+        self.request_paint_update()
+
+    def _alimentar_preroll(self, shared):
+        """Pre-roll subscriber of the frame bus; releases clips once their post-roll is stored."""
+        if self.preroll is None:
+            return
+        self.preroll.push(shared, shared.ts)
+        stored = self.preroll.newest_ts()
         for rec in list(self.pending_videos):
-            if rec["frames_left"] > 0:
-                rec["frames"].append(numpy_frame)
-                rec["frames_left"] -= 1
-            if rec["frames_left"] <= 0:
-                thread = VideoSaverThread(rec["frames"], rec["path"], fps=10)
-                thread.finished.connect(lambda r=thread: self._remove_video_thread(r))
-                self.active_video_threads.append(thread)
-                thread.start()
+            # Margen de un segundo por si el compresor descartó el último frame
+            if (stored is not None and stored >= rec["until"]) or shared.ts >= rec["until"] + 1.0:
                 self.pending_videos.remove(rec)
-                self.registrar_log(f"🎥 Video guardado: {os.path.basename(rec['path'])}")
+                frames = self.preroll.snapshot(rec["since"], rec["until"])
+                self._guardar_video({"frames": frames, "path": rec["path"]})
 
-        self.pixmap = QPixmap.fromImage(img_converted)
-        self.request_paint_update()
+    def get_preroll_stats(self):
+        return self.preroll.get_stats() if self.preroll is not None else {}
 
     def registrar_log(self, mensaje):
         fecha_hora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -574,6 +579,14 @@ class GrillaWidget(QWidget):
         with open("eventos_detectados.txt", "a", encoding="utf-8") as f:
             f.write(mensaje_completo + "\n")
 
+    def _guardar_video(self, rec):
+        fps = self.preroll.config["fps"] if self.preroll is not None else 10
+        thread = VideoSaverThread(rec["frames"], rec["path"], fps=fps, size=rec.get("size"))
+        thread.finished.connect(lambda r=thread: self._remove_video_thread(r))
+        self.active_video_threads.append(thread)
+        thread.start()
+        self.registrar_log(f"🎥 Video guardado: {os.path.basename(rec['path'])}")
+
     def _remove_video_thread(self, thread):
         if thread in self.active_video_threads:
             self.active_video_threads.remove(thread)
@@ -585,6 +598,15 @@ class GrillaWidget(QWidget):
         if hasattr(self, 'analytics_processor') and self.analytics_processor:
             self.analytics_processor.stop_processing()
 
+        if self.preroll is not None:
+            stats = self.preroll.get_stats()
+            self.registrar_log(
+                f"🎞️ Pre-roll: {stats['frames']} frames ({stats['seconds']} s), "
+                f"{stats['mb']}/{stats['max_mb']} MB, compresión x{stats['compression']}"
+            )
+            self.preroll.close()
+            self.preroll = None
+
         if hasattr(self, 'visualizador') and self.visualizador:
             self.visualizador = None
         if self.detector:
@@ -680,6 +702,7 @@ class GrillaWidget(QWidget):
 
         self.discarded_cells.update(self.selected_cells)
         self._save_discarded_cells_to_config() 
+        self._sync_grid_mask()
         self.selected_cells.clear()
         self.request_paint_update()
 
@@ -698,6 +721,7 @@ class GrillaWidget(QWidget):
         
         self.registrar_log(f"Celdas habilitadas: {len(cells_to_enable)}")
         self._save_discarded_cells_to_config()
+        self._sync_grid_mask()
         self.selected_cells.clear()
         self.request_paint_update()
 
@@ -1016,6 +1040,11 @@ class GrillaWidget(QWidget):
         else:
             super().mouseReleaseEvent(event)
 
+    def _sync_grid_mask(self):
+        """Send the current discarded cells to the detectors."""
+        if hasattr(self, 'visualizador') and self.visualizador:
+            self.visualizador.set_grid_mask(self.discarded_cells, self.filas, self.columnas)
+
     def _save_discarded_cells_to_config(self):
         if not self.cam_data or not self.cam_data.get("ip"):
             self.registrar_log("Error: No se pudo obtener la IP de la cámara")
@@ -9,8 +9,9 @@ class ImageSaverThread(QThread):
     MIN_CROP_WIDTH = 300
     MIN_CROP_HEIGHT = 300
 
-    def __init__(self, frame, bbox, cls, coordenadas, modelo, confianza, parent=None):
+    def __init__(self, frame, bbox, cls, coordenadas, modelo, confianza, parent=None, base_dir="capturas"):
         super().__init__(parent)
+        self.base_dir = base_dir
         self.frame = frame
         self.bbox = bbox 
         self.cls = cls
@@ -117,7 +118,8 @@ class ImageSaverThread(QThread):
                  print(f"ImageSaverThread: BBox original de fallback también inválido ({final_x1},{final_y1},{final_x2},{final_y2}), returning.")
                  return
 
-        crop = self.frame[final_y1:final_y2, final_x1:final_x2]
+        # Copia propia: el frame es compartido (y de solo lectura) y aquí se dibuja el recuadro
+        crop = self.frame[final_y1:final_y2, final_x1:final_x2].copy()
         if crop.size == 0:
             print("ImageSaverThread: Crop size is 0, returning.")
             return
@@ -152,7 +154,7 @@ class ImageSaverThread(QThread):
         now = datetime.now()
         fecha = now.strftime("%Y-%m-%d")
         hora = now.strftime("%H-%M-%S")
-        ruta = os.path.join("capturas", carpeta_base, fecha)
+        ruta = os.path.join(self.base_dir, carpeta_base, fecha)
         os.makedirs(ruta, exist_ok=True)
         nombre = f"{fecha}_{hora}_{uuid.uuid4().hex[:6]}"
         path_final = os.path.join(ruta, f"{nombre}.jpg")
@@ -3,20 +3,28 @@ import cv2
 import os
 
 class VideoSaverThread(QThread):
-    def __init__(self, frames, output_path, fps=10, parent=None):
+    def __init__(self, frames, output_path, fps=10, size=None, parent=None):
         super().__init__(parent)
         self.frames = frames
         self.output_path = output_path
         self.fps = fps
+        self.size = size  # (ancho, alto) del clip; por defecto el del primer frame
 
     def run(self):
         if not self.frames:
             return
-        h, w = self.frames[0].shape[:2]
+        # Una sola resolución para todo el clip: los frames de otro tamaño se reducen a ella
+        if self.size is not None:
+            w, h = self.size
+        else:
+            h, w = self.frames[0].shape[:2]
         fourcc = cv2.VideoWriter_fourcc(*"mp4v")
         writer = cv2.VideoWriter(self.output_path, fourcc, self.fps, (w, h))
         for frame in self.frames:
+            if hasattr(frame, "decode"):
+                # Frame del pre-roll: se descomprime aquí, fuera del hilo de la GUI
+                frame = frame.decode()
             if frame.shape[0] != h or frame.shape[1] != w:
-                frame = cv2.resize(frame, (w, h))
+                frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA)
             writer.write(frame)
         writer.release()
\ No newline at end of file
@@ -1,12 +1,25 @@
-from PyQt6.QtMultimedia import QMediaPlayer, QVideoSink, QVideoFrameFormat, QVideoFrame
-from PyQt6.QtCore import QObject, pyqtSignal, QUrl
+from PyQt6.QtMultimedia import QVideoFrameFormat, QVideoFrame
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer
 from PyQt6.QtGui import QImage
-import numpy as np
+import logging
+import threading
 
-from core.detector_worker import DetectorWorker, iou
+from core.detector_worker import DetectorWorker, plan_model_groups
+from core.process_detector import ProcessDetectorWorker
 from core.advanced_tracker import AdvancedTracker
+from core.motion_gate import MotionGate
+from core.adaptive_fps import AdaptiveFPSController
+from core.result_merger import ResultMerger
+from core.preprocess_cache import PreprocessCache
+from core.inference_server import build_server_config
+from core.model_cadence import ModelCadence
+from core.frame_bus import FrameBus, SharedFrame
+from core.yuv_frame import YuvFrame
+from core.decode_backends import create_decode_backend
+from core.dual_stream import MainStreamEvidence, build_dual_stream_config
+from core.rtsp_builder import generar_rtsp_dual
 
-from logging_utils import get_logger
+from logging_utils import get_logger, LogSampler
 
 logger = get_logger(__name__)
 
@@ -20,28 +33,54 @@ class VisualizadorDetector(QObject):
         cam_ip_for_name = self.cam_data.get('ip', str(id(self))) 
         self.setObjectName(f"Visualizador_{cam_ip_for_name}")
 
-        self.video_player = QMediaPlayer()
-        self.video_sink = QVideoSink()
-        self.video_player.setVideoSink(self.video_sink)
-
-        self.video_sink.videoFrameChanged.connect(self.on_frame)
-        self.video_player.errorOccurred.connect(
-            lambda e: logger.error(
-                "MediaPlayer error (%s): %s", self.objectName(), self.video_player.errorString()
-            )
+        # Backend de adquisición ("qt", "opencv" o "pyav"); los hilos de decodificación
+        # entregan los frames por señal en el hilo de la GUI
+        self.decoder = create_decode_backend(cam_data.get("decode"), label=self.objectName(), parent=self)
+        self.decoder.frame_ready.connect(self.on_frame)
+        self.decoder.stream_error.connect(
+            lambda msg: logger.error("Error de decodificación (%s): %s", self.objectName(), msg)
         )
+        # Doble stream: el sub-stream alimenta analítica y vista; el principal solo la evidencia
+        self.dual_stream = build_dual_stream_config(cam_data.get("dual_stream"))
+        self.stream_url = cam_data.get("rtsp")
+        self.evidence = None
+        if self.dual_stream["enabled"]:
+            self.stream_url, main_url = generar_rtsp_dual(
+                cam_data, self.dual_stream["perfil_sub"], self.dual_stream["perfil_main"]
+            )
+            self.evidence = MainStreamEvidence(main_url, self.dual_stream, label=self.objectName(), parent=self)
+        # Cada frame decodificado se convierte una sola vez para todos los consumidores
+        self.frame_bus = FrameBus(name=self.objectName())
+        self._bus_summary = LogSampler(cam_data.get("frame_bus_log_every", 1500))
+        # Frames NV12/YUV420: se copian los planos y cada consumidor convierte al tamaño que necesita
+        self.yuv_direct = cam_data.get("yuv_direct", True)
+        self.frame_bus.subscribe(self._on_shared_frame, wants=self._wants_detection_frame, name="detector")
 
         # Configuración de FPS mejorada
         fps_config = cam_data.get("fps_config", {})
         self.visual_fps = fps_config.get("visual_fps", 25)
         self.detection_fps = fps_config.get("detection_fps", cam_data.get("detection_fps", 8))
         
+        # El modo "skip" solo decodifica los frames que la vista o la detección usan
+        self.decoder.set_target_fps(max(self.visual_fps, self.detection_fps))
+
         # Calcular intervalo de detección basado en FPS
-        base_fps = 30  # Asumimos que el stream llega a ~30 FPS
-        self.detector_frame_interval = max(1, int(base_fps / self.detection_fps))
+        self.detector_frame_interval = max(1, int(self._input_fps() / self.detection_fps))
         
         self.frame_counter = 0
 
+        # Controlador de FPS adaptativo: mide entrada, latencia y descartes
+        self.adaptive_fps = None
+        if fps_config.get("adaptive_fps", False):
+            self.adaptive_fps = AdaptiveFPSController(
+                max_fps=self.detection_fps,
+                config=fps_config.get("adaptive"),
+                name=self.objectName(),
+            )
+
+        # Filtro de movimiento previo al detector (opcional)
+        self.motion_gate = MotionGate(cam_data.get("motion_gate"))
+
         imgsz_default = cam_data.get("imgsz", 416)
         device = cam_data.get("device", "cpu")
         logger.debug("%s: Inicializando DetectorWorker en %s", self.objectName(), device)
@@ -52,7 +91,8 @@ class VisualizadorDetector(QObject):
             device=device,
             lost_ttl=cam_data.get("lost_ttl", 5),
         )
-        self._pending_detections = {}
+        # El embedder de DeepSort se construye en segundo plano
+        threading.Thread(target=self.tracker.warm_up, name=f"{self.objectName()}_tracker", daemon=True).start()
         self._last_frame = None
         self._current_frame_id = 0
 
@@ -61,148 +101,258 @@ class VisualizadorDetector(QObject):
             modelo_single = cam_data.get("modelo", "Personas")
             modelos = [modelo_single] if modelo_single else []
 
+        # Claves que comparten archivo de pesos se ejecutan en una sola pasada
+        self._model_keys = list(dict.fromkeys(modelos))
+        self.model_groups = plan_model_groups(self._model_keys)
+
+        # Ventana de frames en vuelo: un modelo lento no descarta los resultados de los demás
+        self.merger = ResultMerger(self._model_keys, cam_data.get("result_merger"), name=self.objectName())
+        self._merge_timer = QTimer(self)
+        self._merge_timer.setInterval(50)
+        self._merge_timer.timeout.connect(lambda: self._feed_tracker(self.merger.poll()))
+        self._merge_timer.start()
+
+        # Cadencia por modelo (fps); los modelos sin entrada corren en cada frame de detección
+        self.cadence = ModelCadence(fps_config.get("model_cadence", cam_data.get("model_cadence")))
+
+        # "process" aísla cada grupo de modelos en su propio proceso
+        worker_cls = ProcessDetectorWorker if cam_data.get("execution", "thread") == "process" else DetectorWorker
+        # Letterbox compartido entre modelos del mismo frame. Solo los backends
+        # exportados (ONNX/OpenVINO) reciben la entrada preparada: Ultralytics y el
+        # servidor de inferencia preprocesan por su cuenta, y no cruza procesos
+        backend_name = cam_data.get("backend", "ultralytics")
+        self.preprocess_cache = None
+        if (
+            worker_cls is DetectorWorker
+            and len(self.model_groups) > 1
+            and backend_name not in (None, "", "ultralytics")
+            and not build_server_config(cam_data.get("inference_server"))["enabled"]
+        ):
+            self.preprocess_cache = PreprocessCache()
         self.detectors = []
-        for m in modelos:
-            detector = DetectorWorker(
+        for group in self.model_groups:
+            m = group[0]
+            if len(group) > 1:
+                logger.info("%s: modelos %s comparten pesos; una sola inferencia por frame", self.objectName(), group)
+            detector = worker_cls(
                 model_key=m,
+                group_keys=group,
                 confidence=cam_data.get("confianza", 0.5),
                 frame_interval=1,
                 imgsz=imgsz_default,
                 device=device,
                 track=False,
+                camera_id=cam_data.get("ip"),
+                inference_server=cam_data.get("inference_server"),
+                backend=cam_data.get("backend", "ultralytics"),
+                model_policy=cam_data.get("model_policy", "shared_lock"),
+                tiling=cam_data.get("tiling"),
+                roi=cam_data.get("roi"),
+                rect=cam_data.get("rect_inference", False),
+                resolution_ladder=cam_data.get("resolution_ladder"),
+                cascade=cam_data.get("cascade"),
+                preprocess_cache=self.preprocess_cache,
             )
-            detector.result_ready.connect(
-                lambda res, _mk, fid, mk=m: self._procesar_resultados_detector_worker(res, mk, fid)
-            )
+            detector.result_ready.connect(self._procesar_resultados_detector_worker)
             detector.start()
             self.detectors.append(detector)
         logger.debug("%s: %d DetectorWorker(s) started", self.objectName(), len(self.detectors))
 
-    def update_fps_config(self, visual_fps=25, detection_fps=8):
+    def update_fps_config(self, visual_fps=25, detection_fps=8, adaptive_fps=None, model_cadence=None):
         """Actualizar configuración de FPS en tiempo real"""
         self.visual_fps = visual_fps
         self.detection_fps = detection_fps
+        if model_cadence is not None:
+            self.cadence.set_cadence(model_cadence)
         
-        base_fps = 30
-        self.detector_frame_interval = max(1, int(base_fps / detection_fps))
+        self.decoder.set_target_fps(max(visual_fps, detection_fps))
+        self.detector_frame_interval = max(1, int(self._input_fps() / detection_fps))
+
+        if adaptive_fps is not None and adaptive_fps != (self.adaptive_fps is not None):
+            self.adaptive_fps = (
+                AdaptiveFPSController(max_fps=detection_fps, name=self.objectName()) if adaptive_fps else None
+            )
+        if self.adaptive_fps is not None:
+            self.adaptive_fps.set_max_fps(detection_fps)
+            if self.adaptive_fps.interval is not None:
+                self.detector_frame_interval = self.adaptive_fps.interval
         
         logger.info("%s: FPS actualizado - Visual: %d, Detección: %d (intervalo: %d)", 
                    self.objectName(), visual_fps, detection_fps, self.detector_frame_interval)
 
+    def _input_fps(self):
+        # Asumimos que el stream llega a ~30 FPS, salvo que el modo "skip" lo limite
+        period = self.decoder.skipper.period
+        return min(30.0, 1.0 / period) if period else 30.0
+
+    def get_decode_stats(self):
+        """Grabbed/decoded/skipped frame counters of the decode backend."""
+        return self.decoder.get_stats()
+
+    def set_grid_mask(self, discarded_cells, filas, columnas):
+        """Forward the analytics grid (discarded cells) to every detector."""
+        self.motion_gate.set_grid(discarded_cells, filas, columnas)
+        for det in self.detectors:
+            if det:
+                det.set_grid(discarded_cells, filas, columnas)
+
+    def get_detector_stats(self):
+        """Per-worker mailbox counters, keyed by the worker's object name."""
+        return {det.objectName(): det.get_stats() for det in self.detectors if det}
+
+    def get_adaptive_status(self):
+        """Current adaptive FPS measurements and recent decisions, or None."""
+        if self.adaptive_fps is None or self.adaptive_fps.interval is None:
+            return None
+        return self.adaptive_fps.get_status()
+
+    def _update_adaptive_fps(self):
+        stats = [det.get_stats() for det in self.detectors if det]
+        latency = sum(s.get("latency_ms", 0.0) for s in stats)
+        posted = sum(s.get("posted", 0) for s in stats)
+        overwritten = sum(s.get("overwritten", 0) for s in stats)
+        interval = self.adaptive_fps.update(latency, posted, overwritten)
+        if interval and interval != self.detector_frame_interval:
+            self.detector_frame_interval = interval
+            if self.adaptive_fps.decisions:
+                self.log_signal.emit(f"⚙️ FPS adaptativo: {self.adaptive_fps.decisions[-1]}")
+
+    def get_motion_stats(self):
+        """Frames passed/skipped by the motion gate for this camera."""
+        return self.motion_gate.get_stats()
+
     def _procesar_resultados_detector_worker(self, output_for_signal, model_key, frame_id):
         logger.debug(
             "%s: _procesar_resultados_detector_worker received results for model %s",
             self.objectName(),
             model_key,
         )
-        if frame_id != self._current_frame_id:
-            logger.debug(
-                "%s: Ignoring results for old frame %s (current %s)",
-                self.objectName(),
-                frame_id,
-                self._current_frame_id,
-            )
-            return
+        self._feed_tracker(self.merger.add_result(frame_id, model_key, output_for_signal))
 
-        self._pending_detections[model_key] = output_for_signal
-        if len(self._pending_detections) == len(self.detectors):
-            merged = []
-            for dets in self._pending_detections.values():
-                for det in dets:
-                    duplicate = False
-                    for mdet in merged:
-                        # Merge if boxes overlap significantly regardless of class
-                        if iou(det['bbox'], mdet['bbox']) > 0.5:
-                            if det.get('conf', 0) > mdet.get('conf', 0):
-                                mdet.update(det)
-                            duplicate = True
-                            break
-                    if not duplicate:
-                        merged.append(det.copy())
-
-            tracks = self.tracker.update(merged, frame=self._last_frame)
+    def _feed_tracker(self, released):
+        for _frame_id, frame, merged in released:
+            if isinstance(frame, SharedFrame):
+                # El embedder solo recorta las cajas: se convierten esas regiones, no el frame completo
+                frame = frame.view()
+            tracks = self.tracker.update(merged, frame=frame)
             self.result_ready.emit(tracks)
-            self._pending_detections = {}
+
+    def get_merger_stats(self):
+        """Merged/partial/expired/late/dropped counters of the result merger."""
+        return self.merger.get_stats()
 
     def iniciar(self):
-        rtsp_url = self.cam_data.get("rtsp")
+        rtsp_url = self.stream_url
         if rtsp_url:
             logger.info("%s: Reproduciendo RTSP %s", self.objectName(), rtsp_url)
             self.log_signal.emit(f"🎥 [{self.objectName()}] Streaming iniciado: {rtsp_url}")
-            self.video_player.setSource(QUrl(rtsp_url))
-            self.video_player.play()
+            self.decoder.start(rtsp_url)
+            if self.evidence is not None:
+                self.evidence.start()
         else:
             logger.warning("%s: No se encontró URL RTSP para iniciar", self.objectName())
             self.log_signal.emit(f"⚠️ [{self.objectName()}] No se encontró URL RTSP.")
 
     def detener(self):
         logger.info("%s: Deteniendo VisualizadorDetector", self.objectName())
+        if self.motion_gate.enabled:
+            logger.info("%s: filtro de movimiento %s", self.objectName(), self.motion_gate.get_stats())
+        if hasattr(self, 'merger'):
+            self._merge_timer.stop()
+            logger.info("%s: fusión de resultados %s", self.objectName(), self.merger.get_stats())
+        if getattr(self, 'preprocess_cache', None) is not None:
+            logger.info("%s: caché de preprocesado %s", self.objectName(), self.preprocess_cache.get_stats())
+        if hasattr(self, 'frame_bus'):
+            logger.info("%s: bus de frames %s", self.objectName(), self.frame_bus.get_stats())
         if hasattr(self, 'detectors'):
             for det in self.detectors:
                 if det:
                     logger.info("%s: Deteniendo %s", self.objectName(), det.objectName())
                     det.stop()
-        if hasattr(self, 'video_player') and self.video_player:
-            player_state = self.video_player.playbackState()
-            if player_state != QMediaPlayer.PlaybackState.StoppedState:
-                logger.info("%s: Deteniendo QMediaPlayer estado %s", self.objectName(), player_state)
-                self.video_player.stop()
-            logger.info("%s: Desvinculando salida de video del QMediaPlayer", self.objectName())
-            self.video_player.setVideoSink(None)
-            logger.info("%s: Agendando QMediaPlayer para deleteLater", self.objectName())
-            self.video_player.deleteLater()
-            self.video_player = None
-        if hasattr(self, 'video_sink') and self.video_sink:
-            self.video_sink = None
+        if getattr(self, 'evidence', None) is not None:
+            logger.info("%s: evidencia del stream principal %s", self.objectName(), self.evidence.get_stats())
+            self.evidence.stop()
+        if hasattr(self, 'decoder') and self.decoder:
+            logger.info("%s: Deteniendo decodificación %s", self.objectName(), self.decoder.get_stats())
+            self.decoder.stop()
         logger.info("%s: VisualizadorDetector detenido", self.objectName())
 
-    def on_frame(self, frame): # frame es QVideoFrame
+    def on_frame(self, frame): # QVideoFrame, YuvFrame o array RGB según el backend
         logger.debug(
             "%s: on_frame called %d (interval %d)",
             self.objectName(),
             self.frame_counter,
             self.detector_frame_interval,
         )
-        if not frame.isValid():
-            return
-
-        handle_type = frame.handleType()
-        logger.debug("%s: frame handle type %s", self.objectName(), handle_type)
+        if isinstance(frame, QVideoFrame):
+            if not frame.isValid():
+                return
+            logger.debug("%s: frame handle type %s", self.objectName(), frame.handleType())
 
         self.frame_counter += 1
-        
+
+        if self.adaptive_fps is not None:
+            self.adaptive_fps.on_input_frame()
+            if self.adaptive_fps.due():
+                self._update_adaptive_fps()
+
+        # Conversión única por frame, compartida con la vista y los buffers
+        try:
+            self.frame_bus.publish(lambda: self._convert_frame(frame))
+        except Exception as e:
+            logger.error("%s: error procesando frame en on_frame: %s", self.objectName(), e)
+        if self._bus_summary.due() and logger.isEnabledFor(logging.INFO):
+            # Tasas por segundo desde el resumen anterior (~1 min a 25 fps)
+            logger.info("%s: bus de frames %s", self.objectName(), self.frame_bus.get_stats())
+
+    def _wants_detection_frame(self, _seq):
         # Procesar frames para detección según la configuración de FPS
-        if self.frame_counter % self.detector_frame_interval == 0:
-            try:
-                qimg = self._qimage_from_frame(frame)
-                if qimg is None:
-                    return
-                if qimg.format() != QImage.Format.Format_RGB888:
-                    img_converted = qimg.convertToFormat(QImage.Format.Format_RGB888)
-                else:
-                    img_converted = qimg
-
-                buffer = img_converted.constBits()
-                bytes_per_pixel = img_converted.depth() // 8
-                buffer.setsize(img_converted.height() * img_converted.width() * bytes_per_pixel)
-
-                arr = (
-                    np.frombuffer(buffer, dtype=np.uint8)
-                    .reshape((img_converted.height(), img_converted.width(), bytes_per_pixel))
-                    .copy()
-                )
-
-                self._last_frame = arr
-                self._pending_detections = {}
-                self._current_frame_id += 1
-
-                if hasattr(self, 'detectors'):
-                    for det in self.detectors:
-                        if det and det.isRunning():
-                            det.set_frame(arr, self._current_frame_id)
-
-            except Exception as e:
-                logger.error("%s: error procesando frame en on_frame: %s", self.objectName(), e)
+        return self.frame_counter % self.detector_frame_interval == 0
+
+    def _convert_frame(self, frame):
+        if not isinstance(frame, QVideoFrame):
+            # Los backends con hilo propio entregan planos YUV o RGB ya decodificados
+            return frame
+        if self.yuv_direct:
+            yuv = YuvFrame.from_video_frame(frame)
+            if yuv is not None:
+                return yuv
+        return self._qimage_from_frame(frame)
+
+    def _on_shared_frame(self, shared):
+        gate_input = None
+        if self.motion_gate.enabled:
+            gate_input = shared.resized(self.motion_gate.config["scale_width"])
+        if not self.motion_gate.should_process(gate_input):
+            return
+
+        running = [det for det in getattr(self, 'detectors', []) if det and det.isRunning()]
+        due = self.cadence.select(
+            [(det, det.group_keys) for det in running],
+            self.detection_fps,
+        )
+        if not due:
+            return
+
+        # Planos YUV o array RGB; los detectores convierten a su tamaño de entrada en su hilo
+        arr = shared.detection_input()
+        self._last_frame = shared
+        self._current_frame_id += 1
+        expected = [key for det in due for key in det.group_keys]
+        self._feed_tracker(self.merger.open_frame(self._current_frame_id, shared, expected=expected))
+
+        if self.preprocess_cache is not None:
+            self.preprocess_cache.open(self._current_frame_id, len(due))
+        for det in due:
+            det.set_frame(arr, self._current_frame_id)
+
+    def get_frame_bus_stats(self):
+        """Conversions and allocations per second of this camera's frame bus.
+
+        Rates cover the time since the previous call, which includes the
+        periodic summary logged every ``frame_bus_log_every`` frames.
+        """
+        return self.frame_bus.get_stats()
 
     def _qimage_from_frame(self, frame: QVideoFrame) -> QImage | None:
         if frame.map(QVideoFrame.MapMode.ReadOnly):
@@ -1,11 +1,122 @@
+import atexit
+import copy
 import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
 
-DEFAULT_LEVEL = logging.INFO
+DEFAULT_LEVEL = getattr(logging, os.environ.get("ORCA_LOG_LEVEL", "INFO").upper(), logging.INFO)
 LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
 
-logging.basicConfig(level=DEFAULT_LEVEL, format=LOG_FORMAT)
+# Mensajes por segundo permitidos por logger (WARNING o superior nunca se limitan)
+DEFAULT_RATE_LIMIT = 50
+RATE_LIMITS = {}
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per logger name for records below WARNING.
+
+    When records were dropped, the next record that passes carries a
+    note with the number suppressed.
+    """
+
+    def __init__(self, default_rate=DEFAULT_RATE_LIMIT, rates=None, clock=time.monotonic):
+        super().__init__()
+        self.default_rate = default_rate
+        self.rates = rates if rates is not None else RATE_LIMITS
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}  # nombre -> [tokens, último instante, suprimidos]
+
+    def _rate_for(self, name):
+        # Se usa el límite del prefijo más específico configurado
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return self.default_rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if not rate:
+            return True
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(record.name)
+            if bucket is None:
+                bucket = self._buckets[record.name] = [float(rate), now, 0]
+            bucket[0] = min(float(rate), bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.msg} [{suppressed} mensajes suprimidos por límite de tasa]"
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread."""
+
+    def prepare(self, record):
+        return copy.copy(record)
+
+
+_queue = queue.SimpleQueue()
+_listener = None
+
+
+def _configure():
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None:
+        return
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    queue_handler = _DeferredQueueHandler(_queue)
+    queue_handler.addFilter(RateLimitFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(DEFAULT_LEVEL)
+    _listener = logging.handlers.QueueListener(_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+_configure()
 
 
 def get_logger(name: str) -> logging.Logger:
     """Return a configured logger with the given name."""
-    return logging.getLogger(name)
\ No newline at end of file
+    return logging.getLogger(name)
+
+
+def set_level(level):
+    """Change the global log level at runtime (e.g. ``"DEBUG"``)."""
+    if isinstance(level, str):
+        level = getattr(logging, level.upper())
+    logging.getLogger().setLevel(level)
+
+
+class LogSampler:
+    """Let one in ``every`` calls through; for per-frame summaries.
+
+    ``sampler.due()`` is a counter increment, so the message is only
+    formatted on the sampled frames.
+    """
+
+    def __init__(self, every=100):
+        self.every = max(1, int(every))
+        self._count = 0
+
+    def due(self):
+        self._count += 1
+        if self._count >= self.every:
+            self._count = 0
+            return True
+        return False
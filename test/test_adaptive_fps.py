@@ -0,0 +1,54 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.adaptive_fps import AdaptiveFPSController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class AdaptiveFPSControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.ctrl = AdaptiveFPSController(max_fps=8, clock=self.clock)
+        self.posted = 0
+
+    def window(self, input_fps, latency_ms, overwritten=0):
+        for _ in range(int(input_fps * 2)):
+            self.ctrl.on_input_frame()
+        self.clock.now += 2.0
+        self.assertTrue(self.ctrl.due())
+        self.posted += 10
+        return self.ctrl.update(latency_ms, self.posted, overwritten)
+
+    def test_uses_measured_input_rate(self):
+        # Stream real de 15 fps con detección deseada de 8 fps -> 1 de cada 2
+        self.assertEqual(self.window(15, 10), 2)
+
+    def test_lowers_rate_under_load_and_recovers(self):
+        self.assertEqual(self.window(25, 10), 3)
+        # 250 ms por frame a ~8 fps supera el 70 % de un núcleo
+        interval = self.window(25, 250)
+        self.assertGreaterEqual(interval, 9)
+        self.assertLessEqual(25 / interval * 0.25, 0.7)
+        self.assertTrue(self.ctrl.decisions)
+        # Con latencia baja vuelve a subir de a un paso hasta el máximo configurado
+        for _ in range(20):
+            interval = self.window(25, 10)
+        self.assertEqual(interval, 3)
+
+    def test_drops_lower_rate(self):
+        self.window(25, 10)
+        self.assertEqual(self.window(25, 10, overwritten=5), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
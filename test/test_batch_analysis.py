@@ -0,0 +1,51 @@
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.batch_analysis import list_videos, iter_frame_chunks, _alert_boxes
+
+
+class BatchAnalysisTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.video = os.path.join(self.tmp, "clip.avi")
+        writer = cv2.VideoWriter(self.video, cv2.VideoWriter_fourcc(*"MJPG"), 25, (64, 48))
+        for i in range(10):
+            writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+        writer.release()
+        os.makedirs(os.path.join(self.tmp, "sub"))
+        open(os.path.join(self.tmp, "sub", "notas.txt"), "w").close()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_list_videos_expands_directories(self):
+        self.assertEqual([str(p) for p in list_videos([self.tmp])], [self.video])
+
+    def test_chunks_cover_all_frames_in_order(self):
+        chunks = list(iter_frame_chunks(self.video, chunk_size=4))
+        self.assertEqual([len(c) for c in chunks], [4, 4, 2])
+        self.assertEqual([i for c in chunks for i, _ in c], list(range(10)))
+
+    def test_stride_and_max_frames(self):
+        indices = [i for c in iter_frame_chunks(self.video, chunk_size=3, stride=3, max_frames=8) for i, _ in c]
+        self.assertEqual(indices, [0, 3, 6])
+
+    def test_early_exit_does_not_hang(self):
+        for chunk in iter_frame_chunks(self.video, chunk_size=1, prefetch=1):
+            break
+
+    def test_alert_boxes_format(self):
+        tracks = [{"bbox": [10, 20, 30, 40], "cls": 8, "id": 5, "conf": 0.9}]
+        self.assertEqual(_alert_boxes(tracks), [(10, 20, 30, 40, 8, 20, 30, 5, 0.9)])
+
+
+if __name__ == "__main__":
+    unittest.main()
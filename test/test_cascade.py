@@ -0,0 +1,71 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.cascade import CascadeStage, candidate_crops, overlap_mask
+
+
+def arrays(boxes, cls, conf):
+    return (np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+            np.asarray(cls, dtype=np.int64), np.asarray(conf, dtype=np.float32))
+
+
+class FakeBackend:
+    def __init__(self, outputs):
+        self.outputs = outputs
+        self.calls = []
+
+    def predict(self, frames, classes=None, conf=0.25, imgsz=640):
+        self.calls.append(([f.shape for f in frames], imgsz))
+        return [self.outputs(f) for f in frames]
+
+
+class CascadeTests(unittest.TestCase):
+    def test_crops_are_square_expanded_and_clamped(self):
+        crops = candidate_crops([[100, 100, 140, 120], [0, 0, 10, 10]], 640, 480, margin=0.5, min_size=64)
+        self.assertEqual(crops[0], (80, 70, 160, 150))
+        self.assertEqual(crops[1], (0, 0, 64, 64))
+        big = candidate_crops([[0, 0, 600, 470]], 640, 480, margin=0.5, min_size=64)
+        self.assertEqual(big[0], (60, 0, 540, 480))
+
+    def test_overlap_mask(self):
+        mask = overlap_mask([[0, 0, 10, 10], [50, 50, 60, 60]], [[2, 2, 8, 8]], 0.3)
+        self.assertEqual(mask.tolist(), [True, False])
+
+    def test_only_verified_candidates_survive_in_frame_coordinates(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        proposer = FakeBackend(lambda f: arrays([[300, 200, 340, 220], [10, 10, 20, 20]], [8, 8], [0.6, 0.3]))
+
+        def verify(crop):
+            # Confirma solo el recorte que contiene un objeto en su centro
+            h, w = crop.shape[:2]
+            if h == 80:
+                return arrays([[20, 30, 60, 50]], [0], [0.9])
+            return arrays([], [], [])
+
+        verifier = FakeBackend(verify)
+        stage = CascadeStage({"min_crop": 64, "crop_margin": 0.5, "crop_imgsz": 256}, proposer, verifier, [8], [0], 0.4)
+        xyxy, cls, conf = stage.run(frame)
+
+        self.assertEqual(xyxy.tolist(), [[300, 200, 340, 220]])
+        self.assertEqual(cls.tolist(), [0])
+        self.assertEqual(verifier.calls[0][1], 256)
+        self.assertEqual(len(verifier.calls[0][0]), 2)
+        stats = stage.get_stats()
+        self.assertEqual((stats["frames"], stats["candidates"], stats["confirmed"]), (1, 2, 1))
+
+    def test_no_candidates_skips_verifier(self):
+        proposer = FakeBackend(lambda f: arrays([], [], []))
+        verifier = FakeBackend(lambda f: arrays([[0, 0, 5, 5]], [0], [0.9]))
+        stage = CascadeStage(None, proposer, verifier, [8], [0], 0.4)
+        xyxy, _, _ = stage.run(np.zeros((100, 100, 3), dtype=np.uint8))
+        self.assertEqual(len(xyxy), 0)
+        self.assertEqual(verifier.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+import sys
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import importlib.util
+
+import cv2
+import numpy as np
+from PyQt6.QtCore import Qt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.decode_backends import (
+    FrameSkipper,
+    OpenCVDecodeBackend,
+    PyAVDecodeBackend,
+    build_decode_config,
+    create_decode_backend,
+)
+
+FPS = 10
+FRAMES = 20
+
+
+def write_video(path, frames=FRAMES, fps=FPS):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    for i in range(frames):
+        frame = np.zeros((48, 64, 3), np.uint8)
+        frame[:, :, 2] = i * 10  # canal rojo en BGR: identifica el frame
+        writer.write(frame)
+    writer.release()
+
+
+class FrameSkipperTests(unittest.TestCase):
+    def test_keeps_one_frame_per_period(self):
+        skipper = FrameSkipper(10)
+        kept = [i for i in range(30) if skipper.want(i / 30.0)]
+        self.assertEqual(kept, list(range(0, 30, 3)))
+
+    def test_restarts_after_a_jump(self):
+        skipper = FrameSkipper(1)
+        self.assertTrue(skipper.want(0.0))
+        self.assertFalse(skipper.want(0.5))
+        self.assertTrue(skipper.want(10.0))
+        self.assertFalse(skipper.want(10.5))
+
+    def test_no_rate_keeps_everything(self):
+        skipper = FrameSkipper(None)
+        self.assertTrue(all(skipper.want(i / 30.0) for i in range(10)))
+
+
+class DecodeBackendTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.video = os.path.join(cls.tmp, "camara.avi")
+        write_video(cls.video)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def run_backend(self, backend_cls, timeout=10, **config):
+        config.setdefault("realtime", False)
+        backend = backend_cls(config, label="test")
+        frames, done = [], []
+        backend.frame_ready.connect(frames.append, Qt.ConnectionType.DirectConnection)
+        backend.finished.connect(lambda: done.append(True), Qt.ConnectionType.DirectConnection)
+        backend.start(self.video)
+        deadline = time.monotonic() + timeout
+        while not done and time.monotonic() < deadline:
+            time.sleep(0.01)
+        backend.stop()
+        self.assertTrue(done, "el backend no terminó el archivo")
+        return backend, frames
+
+    def test_opencv_decodes_every_frame_as_rgb(self):
+        backend, frames = self.run_backend(OpenCVDecodeBackend)
+        self.assertEqual(len(frames), FRAMES)
+        self.assertEqual(frames[0].shape, (48, 64, 3))
+        self.assertAlmostEqual(int(frames[5][0, 0, 0]), 50, delta=6)
+        stats = backend.get_stats()
+        self.assertEqual((stats["grabbed"], stats["decoded"], stats["skipped"]), (FRAMES, FRAMES, 0))
+
+    def test_opencv_skip_mode_only_retrieves_used_frames(self):
+        backend, frames = self.run_backend(OpenCVDecodeBackend, mode="skip", max_fps=5)
+        self.assertEqual(len(frames), FRAMES // 2)
+        self.assertEqual(backend.skipped, FRAMES // 2)
+        self.assertAlmostEqual(int(frames[1][0, 0, 0]), 20, delta=6)
+
+    def test_skip_mode_follows_target_fps(self):
+        backend = OpenCVDecodeBackend({"mode": "skip", "realtime": False})
+        backend.set_target_fps(2.5)
+        self.assertAlmostEqual(backend.skipper.period, 0.4)
+        fixed = OpenCVDecodeBackend({"mode": "skip", "max_fps": 5})
+        fixed.set_target_fps(2.5)
+        self.assertAlmostEqual(fixed.skipper.period, 0.2)
+
+    def test_opencv_keyframe_mode_samples_by_interval(self):
+        _, frames = self.run_backend(OpenCVDecodeBackend, mode="keyframes", keyframe_interval_s=0.5)
+        self.assertEqual(len(frames), 4)
+
+    def test_realtime_paces_local_file(self):
+        started = time.monotonic()
+        self.run_backend(OpenCVDecodeBackend, realtime=True)
+        self.assertGreaterEqual(time.monotonic() - started, (FRAMES - 1) / FPS * 0.9)
+
+    def test_loop_restarts_file_until_stopped(self):
+        backend = OpenCVDecodeBackend({"loop": True, "realtime": False})
+        frames = []
+        backend.frame_ready.connect(frames.append, Qt.ConnectionType.DirectConnection)
+        backend.start(self.video)
+        deadline = time.monotonic() + 10
+        while len(frames) <= FRAMES * 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        backend.stop()
+        self.assertGreater(len(frames), FRAMES * 2)
+        self.assertFalse(backend.isRunning())
+
+    def test_stop_without_wait_returns_at_once_and_thread_ends(self):
+        backend = OpenCVDecodeBackend({"loop": True, "realtime": True})
+        backend.start(self.video)
+        old_thread = backend._thread
+        time.sleep(0.1)
+        started = time.monotonic()
+        backend.stop(wait=False)
+        self.assertLess(time.monotonic() - started, 0.05)
+        # Reiniciar enseguida no revive el hilo anterior
+        backend.start(self.video)
+        old_thread.join(2)
+        self.assertFalse(old_thread.is_alive())
+        self.assertTrue(backend.isRunning())
+        backend.stop()
+
+    def test_missing_file_finishes_without_frames(self):
+        backend = OpenCVDecodeBackend({"realtime": False})
+        done = []
+        backend.finished.connect(lambda: done.append(True), Qt.ConnectionType.DirectConnection)
+        backend.start(os.path.join(self.tmp, "no_existe.avi"))
+        deadline = time.monotonic() + 5
+        while not done and time.monotonic() < deadline:
+            time.sleep(0.01)
+        backend.stop()
+        self.assertEqual(done, [True])
+        self.assertEqual(backend.decoded, 0)
+
+    @unittest.skipUnless(importlib.util.find_spec("av"), "PyAV no instalado")
+    def test_pyav_keyframes_only(self):
+        backend, frames = self.run_backend(PyAVDecodeBackend, mode="keyframes")
+        # MJPG: todos los frames son clave
+        self.assertEqual(len(frames), FRAMES)
+        self.assertEqual(frames[0].shape, (48, 64, 3))
+
+    def test_config_validation(self):
+        with self.assertRaises(ValueError):
+            build_decode_config({"mode": "turbo"})
+        with self.assertRaises(ValueError):
+            create_decode_backend({"backend": "gstreamer"})
+        self.assertIsInstance(create_decode_backend({"backend": "opencv"}), OpenCVDecodeBackend)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import sys
+import types
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# Stub heavy dependencies imported by core.detector_worker
+torch_mod = sys.modules.setdefault('torch', types.ModuleType('torch'))
+if not hasattr(torch_mod, 'cuda'):
+    torch_mod.cuda = types.SimpleNamespace(is_available=lambda: False)
+
+ultralytics_mod = types.ModuleType('ultralytics')
+ultralytics_mod.YOLO = object
+sys.modules.setdefault('ultralytics', ultralytics_mod)
+
+if 'deep_sort_realtime.deepsort_tracker' not in sys.modules:
+    pkg = types.ModuleType('deep_sort_realtime')
+    tracker_mod = types.ModuleType('deep_sort_realtime.deepsort_tracker')
+    tracker_mod.DeepSort = object
+    pkg.deepsort_tracker = tracker_mod
+    sys.modules['deep_sort_realtime'] = pkg
+    sys.modules['deep_sort_realtime.deepsort_tracker'] = tracker_mod
+
+from core import detector_worker
+from core.startup_profiler import StartupProfiler
+
+
+class PlanModelGroupsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        best = os.path.join(self.tmpdir.name, "best.pt")
+        coco = os.path.join(self.tmpdir.name, "yolov8s.pt")
+        for path in (best, coco):
+            open(path, "wb").close()
+        self.paths = {
+            "Embarcaciones": best,
+            "Personas": coco,
+            "Autos": coco,
+            "Barcos": coco,
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_keys_sharing_weights_are_grouped(self):
+        with mock.patch.dict(detector_worker.MODEL_PATHS, self.paths):
+            groups = detector_worker.plan_model_groups(["Personas", "Embarcaciones", "Barcos"])
+        self.assertEqual(groups, [["Personas", "Barcos"], ["Embarcaciones"]])
+
+    def test_worker_loads_the_grouped_path(self):
+        missing = dict(self.paths, Personas=os.path.join(self.tmpdir.name, "no_existe.pt"))
+        for paths in (self.paths, missing):
+            with mock.patch.dict(detector_worker.MODEL_PATHS, paths):
+                worker = detector_worker.DetectorWorker(model_key="Personas", device="cpu", track=False)
+                self.assertEqual(worker._model_path_str, str(detector_worker.resolve_model_path("Personas")))
+
+    def test_duplicate_keys_collapse(self):
+        with mock.patch.dict(detector_worker.MODEL_PATHS, self.paths):
+            groups = detector_worker.plan_model_groups(["Autos", "Autos"])
+        self.assertEqual(groups, [["Autos"]])
+
+
+class DetectionsForKeyTest(unittest.TestCase):
+    def _worker(self, group_keys):
+        worker = detector_worker.DetectorWorker.__new__(detector_worker.DetectorWorker)
+        worker.group_keys = group_keys
+        worker.key_classes = {k: detector_worker.MODEL_CLASSES[k] for k in group_keys}
+        worker.objectName = lambda: "test"
+        return worker
+
+    def test_split_by_key_classes(self):
+        worker = self._worker(["Personas", "Barcos"])
+        raw = (
+            np.array([[0, 0, 10, 10], [5, 5, 20, 20]]),
+            np.array([0, 8]),
+            np.array([0.9, 0.7], dtype=np.float32),
+        )
+        self.assertEqual([d['cls'] for d in worker._detections_for_key(raw, "Personas")], [0])
+        self.assertEqual([d['cls'] for d in worker._detections_for_key(raw, "Barcos")], [8])
+
+    def test_remap_applied_per_key(self):
+        worker = self._worker(["Embarcaciones"])
+        raw = (np.array([[0, 0, 10, 10]]), np.array([0]), np.array([0.9], dtype=np.float32))
+        self.assertEqual(worker._detections_for_key(raw, "Embarcaciones")[0]['cls'], 1)
+
+
+class StartupProfilingTest(unittest.TestCase):
+    def test_seal_before_run_waits_for_model_load(self):
+        profiler = StartupProfiler()
+        worker = detector_worker.DetectorWorker(model_key="Personas", device="cpu", track=False)
+        with mock.patch.object(detector_worker, "startup_profiler", profiler), \
+                mock.patch.object(detector_worker.QThread, "start"), \
+                mock.patch.object(profiler, "report") as report:
+            # start() solo lanza el hilo: run() aún no empezó cuando la GUI sella
+            worker.start()
+            profiler.seal()
+            report.assert_not_called()
+            with mock.patch.object(worker, "_acquire_model", side_effect=RuntimeError("sin modelo")):
+                self.assertFalse(worker._load_model())
+            report.assert_called_once_with("modelos listos")
+        self.assertEqual([p[0] for p in profiler.phases], ["modelo Personas (ultralytics)"])
+
+    def test_load_without_start_is_not_a_startup_task(self):
+        profiler = StartupProfiler()
+        worker = detector_worker.DetectorWorker(model_key="Personas", device="cpu", track=False)
+        with mock.patch.object(detector_worker, "startup_profiler", profiler), \
+                mock.patch.object(worker, "_acquire_model", side_effect=RuntimeError("sin modelo")):
+            worker._load_model()
+        self.assertEqual(profiler.phases, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
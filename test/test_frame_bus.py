@@ -0,0 +1,125 @@
+import sys
+import os
+import gc
+import unittest
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.frame_bus import FrameBus, SharedFrame
+from core.yuv_frame import YuvFrame
+
+
+def make_image(w=30, h=20, fmt=QImage.Format.Format_RGB32):
+    image = QImage(w, h, fmt)
+    image.fill(0xFF102030)
+    return image
+
+
+class FrameBusTests(unittest.TestCase):
+    def setUp(self):
+        self.bus = FrameBus(name="test")
+        self.conversions = 0
+
+    def convert(self):
+        self.conversions += 1
+        return make_image()
+
+    def test_one_conversion_shared_by_all_subscribers(self):
+        seen = []
+        self.bus.subscribe(seen.append, name="display")
+        self.bus.subscribe(seen.append, name="detector")
+        frame = self.bus.publish(self.convert)
+        self.assertEqual(self.conversions, 1)
+        self.assertEqual(len(seen), 2)
+        self.assertIs(seen[0], seen[1])
+        self.assertEqual(frame.array.shape, (20, 30, 3))
+        self.assertEqual(frame.array[0, 0].tolist(), [0x10, 0x20, 0x30])
+
+    def test_array_is_read_only_view(self):
+        self.bus.subscribe(lambda f: None)
+        frame = self.bus.publish(self.convert)
+        with self.assertRaises(ValueError):
+            frame.array[0, 0, 0] = 1
+
+    def test_padded_rows_use_bytes_per_line(self):
+        # 30 px * 3 bytes = 90, alineado a 92 bytes por fila
+        image = make_image(fmt=QImage.Format.Format_RGB888)
+        self.assertGreater(image.bytesPerLine(), 90)
+        frame = SharedFrame(1, 0.0, image)
+        self.assertTrue((frame.array[:, -1] == [0x10, 0x20, 0x30]).all())
+
+    def test_no_conversion_when_nobody_wants_the_frame(self):
+        self.bus.subscribe(lambda f: None, wants=lambda seq: seq % 3 == 0)
+        results = [self.bus.publish(self.convert) for _ in range(6)]
+        self.assertEqual(self.conversions, 2)
+        self.assertEqual([r.seq for r in results if r is not None], [3, 6])
+
+    def test_stats_count_allocations_and_live_frames(self):
+        kept = []
+        self.bus.subscribe(kept.append)
+        for _ in range(3):
+            self.bus.publish(self.convert)
+        stats = self.bus.get_stats()
+        # RGB32 -> RGB888: dos asignaciones por frame convertido
+        self.assertEqual((stats["converted"], stats["live_frames"]), (3, 3))
+        self.assertEqual(self.bus.allocations, 6)
+        kept.clear()
+        gc.collect()
+        self.assertEqual(self.bus.get_stats()["live_frames"], 0)
+
+    def test_yuv_frame_converts_on_first_access_only(self):
+        y = np.full((20, 30), 120, np.uint8)
+        uv = np.full((10, 15, 2), 128, np.uint8)
+        seen = []
+        self.bus.subscribe(seen.append)
+        frame = self.bus.publish(lambda: YuvFrame(y, uv))
+        self.assertIs(frame.detection_input(), frame.yuv)
+        self.assertEqual(frame.resized(10).shape, (6, 10, 3))
+        self.assertEqual(frame.array.shape, (20, 30, 3))
+        self.assertEqual(frame.image.pixelColor(0, 0).red(), frame.array[0, 0, 0])
+        # Planos + (luma y croma reducidas + RGB 10x6) + RGB completo; la caché no vuelve a contar
+        expected = y.nbytes + uv.nbytes + (6 * 10 + 3 * 5 * 2 + 6 * 10 * 3) + 20 * 30 * 3
+        frame.resized(10)
+        self.assertEqual(self.bus.bytes_allocated, expected)
+        self.assertEqual(self.bus.allocations, 5)
+
+    def test_lazy_resize_of_rgb_frame_is_counted(self):
+        self.bus.subscribe(lambda f: None)
+        frame = self.bus.publish(lambda: np.zeros((20, 30, 3), np.uint8))
+        frame.resized(10)
+        self.assertEqual(self.bus.bytes_allocated, 20 * 30 * 3 + 7 * 10 * 3)
+
+    def test_view_slices_yuv_without_full_conversion(self):
+        rng = np.random.default_rng(0)
+        y = rng.integers(0, 256, (20, 30), dtype=np.uint8)
+        uv = rng.integers(0, 256, (10, 15, 2), dtype=np.uint8)
+        self.bus.subscribe(lambda f: None)
+        frame = self.bus.publish(lambda: YuvFrame(y, uv))
+        view = frame.view()
+        self.assertEqual(view.shape, (20, 30, 3))
+        crop = view[3:11, 5:17]
+        self.assertIsNone(frame._array)
+        np.testing.assert_array_equal(crop, frame.array[3:11, 5:17])
+
+    def test_rgb_array_is_wrapped_without_copy(self):
+        self.bus.subscribe(lambda f: None)
+        rgb = np.zeros((20, 30, 3), np.uint8)
+        rgb[0, 0] = [1, 2, 3]
+        frame = self.bus.publish(lambda: rgb)
+        self.assertTrue(np.shares_memory(frame.array, rgb))
+        self.assertEqual((frame.width, frame.height), (30, 20))
+        self.assertEqual(frame.image.pixelColor(0, 0).getRgb()[:3], (1, 2, 3))
+
+    def test_failing_subscriber_does_not_block_others(self):
+        seen = []
+        self.bus.subscribe(lambda f: 1 / 0, name="roto")
+        self.bus.subscribe(seen.append)
+        self.bus.publish(self.convert)
+        self.assertEqual(len(seen), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import sys
+import os
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.frame_mailbox import FrameMailbox
+
+
+class FrameMailboxTest(unittest.TestCase):
+    def test_latest_frame_wins_and_counts_overwrites(self):
+        box = FrameMailbox()
+        self.assertFalse(box.put("a", 1))
+        self.assertTrue(box.put("b", 2))
+        self.assertTrue(box.put("c", 3))
+        self.assertEqual(box.take(10), ("c", 3))
+        stats = box.get_stats()
+        self.assertEqual(stats["posted"], 3)
+        self.assertEqual(stats["consumed"], 1)
+        self.assertEqual(stats["overwritten"], 2)
+
+    def test_take_times_out_when_empty(self):
+        box = FrameMailbox()
+        self.assertIsNone(box.take(10))
+
+    def test_take_wakes_on_put(self):
+        box = FrameMailbox()
+        result = []
+        th = threading.Thread(target=lambda: result.append(box.take(2000)))
+        th.start()
+        time.sleep(0.05)
+        box.put("frame", 7)
+        th.join(2)
+        self.assertEqual(result, [("frame", 7)])
+
+    def test_close_releases_consumer(self):
+        box = FrameMailbox()
+        result = []
+        th = threading.Thread(target=lambda: result.append(box.take(5000)))
+        th.start()
+        time.sleep(0.05)
+        box.close()
+        th.join(2)
+        self.assertEqual(result, [None])
+        self.assertFalse(box.put("late", 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.inference_backends import _ExportedBackend, exported_model_path, MODEL_CACHE_DIR
+from core.preprocessing import letterbox
+
+
+class FakeExportedBackend(_ExportedBackend):
+    """Emits one fixed box (in network input space) for class 2."""
+
+    name = "fake"
+
+    def __init__(self, box_xyxy, imgsz=640, nc=3):
+        super().__init__("fake.onnx", imgsz)
+        self.box_xyxy = box_xyxy
+        self.nc = nc
+
+    def _infer(self, batch):
+        x1, y1, x2, y2 = self.box_xyxy
+        out = np.zeros((1, 4 + self.nc, 2), dtype=np.float32)
+        out[0, :4, 0] = [(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1]
+        out[0, 4 + 2, 0] = 0.9
+        out[0, 4 + 0, 1] = 0.1  # por debajo del umbral
+        return out
+
+
+class ExportedBackendTest(unittest.TestCase):
+    def test_box_mapped_back_to_frame(self):
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+        _, ratio, (pad_w, pad_h) = letterbox(frame, 640)
+        expected = np.array([100, 200, 300, 400], dtype=np.float32)
+        net_box = expected * ratio + np.array([pad_w, pad_h, pad_w, pad_h])
+        backend = FakeExportedBackend(net_box)
+
+        xyxy, cls, conf = backend.predict([frame], conf=0.25)[0]
+        self.assertEqual(cls.tolist(), [2])
+        self.assertAlmostEqual(float(conf[0]), 0.9, places=5)
+        np.testing.assert_allclose(xyxy[0], expected, atol=1.0)
+
+    def test_class_filter(self):
+        frame = np.zeros((480, 640, 3), dtype=np.uint8)
+        backend = FakeExportedBackend([10, 10, 50, 50])
+        xyxy, _, _ = backend.predict([frame], classes=[0], conf=0.25)[0]
+        self.assertEqual(len(xyxy), 0)
+
+    def test_exported_model_path(self):
+        path = exported_model_path("core/models/best.pt", "onnx", 640)
+        self.assertEqual(path, MODEL_CACHE_DIR / "best_640x640.onnx")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import sys
+import os
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core import inference_server
+from core.inference_server import InferenceServer, build_server_config
+
+
+class FakeBackend:
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, source, **kwargs):
+        self.batches.append(len(source))
+        return [f"res_{frame}" for frame in source]
+
+
+class InferenceServerBatchTest(unittest.TestCase):
+    def _run_clients(self, server, clients):
+        results = {}
+
+        def worker(client_id, camera_id):
+            results[client_id] = server.predict(client_id, client_id, camera_id=camera_id, classes=[0])
+
+        threads = [threading.Thread(target=worker, args=c) for c in clients]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join(5)
+        return results
+
+    def test_all_clients_in_one_batch(self):
+        model = FakeBackend()
+        server = InferenceServer(model, "cpu", {"max_batch": 8, "max_wait_ms": 500})
+        clients = [(f"cam{i}:Personas", f"cam{i}") for i in range(4)]
+        for client_id, _ in clients:
+            server.register_client(client_id)
+        server.start()
+        try:
+            results = self._run_clients(server, clients)
+        finally:
+            server.stop()
+        self.assertEqual(model.batches, [4])
+        self.assertEqual(results["cam2:Personas"], "res_cam2:Personas")
+
+    def test_max_per_camera_splits_batches(self):
+        model = FakeBackend()
+        server = InferenceServer(model, "cpu", {"max_batch": 8, "max_wait_ms": 500, "max_per_camera": 1})
+        clients = [("cam0:Personas", "cam0"), ("cam0:Autos", "cam0")]
+        for client_id, _ in clients:
+            server.register_client(client_id)
+        server.start()
+        try:
+            results = self._run_clients(server, clients)
+        finally:
+            server.stop()
+        self.assertEqual(model.batches, [1, 1])
+        self.assertEqual(len(results), 2)
+
+    def test_unregistered_client_returns_none(self):
+        server = InferenceServer(FakeBackend(), "cpu")
+        self.assertIsNone(server.predict("ghost", "frame"))
+
+    def test_later_client_with_other_config_is_warned(self):
+        model = FakeBackend()
+        first = inference_server.acquire_inference_server("m.pt", model, "cpu", "cam0:Personas", {"max_batch": 4})
+        try:
+            with self.assertLogs(inference_server.logger, "WARNING") as logs:
+                second = inference_server.acquire_inference_server("m.pt", model, "cpu", "cam1:Personas", {"max_batch": 16})
+            self.assertIs(second, first)
+            self.assertEqual(first.config["max_batch"], 4)
+            self.assertIn("max_batch", logs.output[0])
+        finally:
+            inference_server.release_inference_server(first, "cam1:Personas")
+            inference_server.release_inference_server(first, "cam0:Personas")
+
+    def test_build_server_config_ignores_unknown_keys(self):
+        config = build_server_config({"max_batch": 4, "foo": 1})
+        self.assertEqual(config["max_batch"], 4)
+        self.assertNotIn("foo", config)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import sys
+import os
+import logging
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from logging_utils import RateLimitFilter, LogSampler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_record(name="core.detector_worker", level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, "mensaje %s", ("x",), None)
+
+
+class RateLimitFilterTests(unittest.TestCase):
+    def test_limits_per_logger_and_reports_suppressed(self):
+        clock = FakeClock()
+        flt = RateLimitFilter(default_rate=2, rates={}, clock=clock)
+        passed = [flt.filter(make_record()) for _ in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        # Otro módulo tiene su propio cupo
+        self.assertTrue(flt.filter(make_record("gui.grilla_widget")))
+        clock.now = 1.0
+        record = make_record()
+        self.assertTrue(flt.filter(record))
+        self.assertIn("3 mensajes suprimidos", record.getMessage())
+
+    def test_warnings_never_limited(self):
+        flt = RateLimitFilter(default_rate=1, rates={}, clock=FakeClock())
+        self.assertTrue(all(flt.filter(make_record(level=logging.WARNING)) for _ in range(10)))
+
+    def test_prefix_rate(self):
+        flt = RateLimitFilter(default_rate=1, rates={"core": 0}, clock=FakeClock())
+        self.assertTrue(all(flt.filter(make_record("core.detector_worker")) for _ in range(10)))
+
+
+class LogSamplerTests(unittest.TestCase):
+    def test_every_n(self):
+        sampler = LogSampler(3)
+        self.assertEqual([sampler.due() for _ in range(6)], [False, False, True, False, False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
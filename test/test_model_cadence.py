@@ -0,0 +1,45 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.model_cadence import ModelCadence
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ModelCadenceTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cadence = ModelCadence({"Barcos": 2, "Embarcaciones": 1}, clock=self.clock)
+        self.groups = [("personas", ["Personas"]), ("barcos", ["Barcos"])]
+
+    def run_frames(self, seconds, detection_fps=8):
+        counts = {"personas": 0, "barcos": 0}
+        for i in range(int(seconds * detection_fps)):
+            self.clock.now = i / detection_fps
+            for ident in self.cadence.select(self.groups, detection_fps):
+                counts[ident] += 1
+        return counts
+
+    def test_each_group_runs_at_its_own_rate(self):
+        self.assertEqual(self.run_frames(4), {"personas": 32, "barcos": 8})
+
+    def test_group_follows_fastest_key(self):
+        self.assertAlmostEqual(self.cadence.interval(["Barcos", "Embarcaciones"]), 0.5)
+        self.assertIsNone(self.cadence.interval(["Barcos", "Personas"]))
+
+    def test_zero_or_missing_means_every_frame(self):
+        self.cadence.set_cadence({"Barcos": 0})
+        self.assertEqual(self.run_frames(1), {"personas": 8, "barcos": 8})
+
+
+if __name__ == "__main__":
+    unittest.main()
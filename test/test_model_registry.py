@@ -0,0 +1,95 @@
+import sys
+import os
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.model_registry import ModelRegistry, ModelKey
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = name
+        self.closed = False
+        self.calls = 0
+
+    def predict(self, *args, **kwargs):
+        self.calls += 1
+        return self.name
+
+    def close(self):
+        self.closed = True
+
+
+def key(path, device="cpu"):
+    return ModelKey(path, "ultralytics", device, None)
+
+
+class ModelRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.loads = []
+
+    def loader(self, name):
+        def _load():
+            model = FakeModel(name)
+            self.loads.append(model)
+            return model
+        return _load
+
+    def test_shared_instance_is_reference_counted(self):
+        registry = ModelRegistry(max_idle=0)
+        h1 = registry.acquire(key("a.pt"), self.loader("a"))
+        h2 = registry.acquire(key("a.pt"), self.loader("a"))
+        self.assertIs(h1.model, h2.model)
+        self.assertEqual(len(self.loads), 1)
+        h1.release()
+        self.assertFalse(h2.model.closed)
+        h2.release()
+        self.assertTrue(self.loads[0].closed)
+
+    def test_device_is_part_of_key(self):
+        registry = ModelRegistry()
+        h1 = registry.acquire(key("a.pt", "cpu"), self.loader("cpu"))
+        h2 = registry.acquire(key("a.pt", "cuda"), self.loader("cuda"))
+        self.assertIsNot(h1.model, h2.model)
+
+    def test_per_worker_policy_loads_one_instance_per_owner(self):
+        registry = ModelRegistry()
+        h1 = registry.acquire(key("a.pt"), self.loader("a"), policy="per_worker", owner="w1")
+        h2 = registry.acquire(key("a.pt"), self.loader("a"), policy="per_worker", owner="w2")
+        self.assertIsNot(h1.model, h2.model)
+
+    def test_idle_models_evicted_lru(self):
+        registry = ModelRegistry(max_idle=1)
+        registry.acquire(key("a.pt"), self.loader("a")).release()
+        registry.acquire(key("b.pt"), self.loader("b")).release()
+        self.assertTrue(self.loads[0].closed)
+        self.assertFalse(self.loads[1].closed)
+        # b sigue en caché y se reutiliza sin recargar
+        registry.acquire(key("b.pt"), self.loader("b"))
+        self.assertEqual(len(self.loads), 2)
+
+    def test_shared_predict_is_serialized(self):
+        registry = ModelRegistry()
+        handle = registry.acquire(key("a.pt"), self.loader("a"))
+        threads = [threading.Thread(target=lambda: [handle.predict() for _ in range(100)]) for _ in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        self.assertEqual(handle.model.calls, 400)
+
+    def test_release_is_idempotent(self):
+        registry = ModelRegistry(max_idle=0)
+        h1 = registry.acquire(key("a.pt"), self.loader("a"))
+        h2 = registry.acquire(key("a.pt"), self.loader("a"))
+        h1.release()
+        h1.release()
+        self.assertFalse(self.loads[0].closed)
+        h2.release()
+        self.assertTrue(self.loads[0].closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.motion_gate import MotionGate
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def frame_with_square(x, y, size=100, w=640, h=480):
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    frame[y:y + size, x:x + size] = 255
+    return frame
+
+
+class MotionGateTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.gate = MotionGate({"enabled": True, "keepalive_s": 2.0}, clock=self.clock)
+
+    def test_disabled_passes_everything(self):
+        gate = MotionGate()
+        self.assertTrue(gate.should_process(frame_with_square(0, 0)))
+        self.assertEqual(gate.get_stats()["skipped"], 0)
+
+    def test_static_scene_skipped_until_keepalive(self):
+        static = frame_with_square(100, 100)
+        self.assertTrue(self.gate.should_process(static))
+        self.clock.now = 1.0
+        self.assertFalse(self.gate.should_process(static))
+        self.clock.now = 2.5
+        self.assertTrue(self.gate.should_process(static))
+        stats = self.gate.get_stats()
+        self.assertEqual((stats["passed"], stats["skipped"], stats["keepalive"]), (2, 1, 1))
+
+    def test_motion_passes(self):
+        self.gate.should_process(frame_with_square(100, 100))
+        self.clock.now = 0.5
+        self.assertTrue(self.gate.should_process(frame_with_square(300, 200)))
+
+    def test_motion_only_in_discarded_cells_skipped(self):
+        # Grilla 2x2: el movimiento ocurre solo en la celda (0, 0), descartada
+        self.gate.set_grid({(0, 0)}, 2, 2)
+        self.gate.should_process(frame_with_square(50, 50))
+        self.clock.now = 0.5
+        self.assertFalse(self.gate.should_process(frame_with_square(150, 100)))
+        self.clock.now = 1.0
+        self.assertTrue(self.gate.should_process(frame_with_square(450, 300)))
+
+
+if __name__ == "__main__":
+    unittest.main()
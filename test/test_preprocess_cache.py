@@ -0,0 +1,102 @@
+import sys
+import os
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.inference_backends import _ExportedBackend
+from core.preprocess_cache import PreprocessCache
+
+
+class FakeExportedBackend(_ExportedBackend):
+    """Emits one box per input whose position depends on the tensor mean."""
+
+    name = "fake"
+
+    def __init__(self):
+        super().__init__("fake.onnx", 640)
+
+    def _infer(self, batch):
+        out = np.zeros((1, 5, 1), dtype=np.float32)
+        shift = float(batch.mean()) * 100
+        out[0, :4, 0] = [320 + shift, 320, 100, 50]
+        out[0, 4, 0] = 0.9
+        return out
+
+
+class PreprocessCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = PreprocessCache(max_frames=2)
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return object()
+
+    def test_consumers_share_one_build_and_entry_is_freed(self):
+        self.cache.open(1, consumers=2)
+        a = self.cache.get(1, (640, 640), "rgb_float01", self.build)
+        b = self.cache.get(1, (640, 640), "rgb_float01", self.build)
+        self.assertIs(a, b)
+        self.assertEqual(self.builds, 1)
+        self.cache.release(1)
+        self.assertEqual(self.cache.get_stats()["live"], 1)
+        self.cache.release(1)
+        self.assertEqual(self.cache.get_stats()["live"], 0)
+
+    def test_different_shape_or_norm_is_not_shared(self):
+        self.cache.open(1, consumers=3)
+        self.cache.get(1, (640, 640), "rgb_float01", self.build)
+        self.cache.get(1, (416, 416), "rgb_float01", self.build)
+        self.cache.get(1, (640, 640), "bgr_uint8", self.build)
+        self.assertEqual(self.builds, 3)
+
+    def test_unknown_frame_builds_without_caching(self):
+        self.cache.get(9, (640, 640), "n", self.build)
+        self.cache.get(9, (640, 640), "n", self.build)
+        self.assertEqual(self.builds, 2)
+
+    def test_old_frames_are_evicted(self):
+        for frame_id in (1, 2, 3):
+            self.cache.open(frame_id, consumers=2)
+        self.assertEqual(self.cache.get_stats()["evicted"], 1)
+        self.cache.get(1, (640, 640), "n", self.build)
+        self.cache.get(1, (640, 640), "n", self.build)
+        self.assertEqual(self.builds, 2)
+
+    def test_concurrent_consumers_wait_for_the_builder(self):
+        self.cache.open(1, consumers=4)
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_build():
+            started.set()
+            release.wait(2)
+            return self.build()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get(1, (8, 8), "n", slow_build)))
+                   for _ in range(4)]
+        threads[0].start()
+        started.wait(2)
+        for t in threads[1:]:
+            t.start()
+        release.set()
+        for t in threads:
+            t.join(2)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(len({id(r) for r in results}), 1)
+
+    def test_exported_backend_accepts_prepared_input(self):
+        frame = np.random.randint(0, 255, (360, 640, 3), dtype=np.uint8)
+        backend = FakeExportedBackend()
+        direct = backend.predict([frame], conf=0.25)[0]
+        cached = backend.predict([frame], conf=0.25, prepared=[backend.prepare(frame)])[0]
+        np.testing.assert_allclose(direct[0], cached[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import sys
+import os
+import random
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.frame_bus import SharedFrame
+from core.preroll_buffer import ByteRing, EncodedFrame, PrerollBuffer
+
+
+def make_frame(h=120, w=160, value=0):
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    frame[:, :, 0] = value
+    frame[: h // 2, :, 1] = 200
+    return frame
+
+
+class ByteRingTest(unittest.TestCase):
+    def test_records_survive_wraparound(self):
+        ring = ByteRing(1000)
+        rng = random.Random(1)
+        for i in range(500):
+            data = bytes([i % 256]) * rng.randint(1, 300)
+            self.assertTrue(ring.append(data, i))
+            self.assertLessEqual(ring.used, ring.capacity)
+            items = ring.items()
+            self.assertEqual(items[-1], (data, i))
+            # Los registros retenidos son los más recientes, en orden y sin pisarse
+            metas = [meta for _, meta in items]
+            self.assertEqual(metas, list(range(i - len(metas) + 1, i + 1)))
+            for payload, meta in items:
+                self.assertEqual(set(payload), {meta % 256})
+
+    def test_oversized_record_rejected(self):
+        ring = ByteRing(10)
+        self.assertFalse(ring.append(b"x" * 11, 0))
+        self.assertEqual(len(ring), 0)
+
+
+class PrerollBufferTest(unittest.TestCase):
+    def make_buffer(self, **config):
+        base = {"seconds": 1.0, "post_seconds": 1.0, "fps": 10, "max_mb": 4}
+        base.update(config)
+        return PrerollBuffer(base, name="test", clock=lambda: 0.0, threaded=False)
+
+    def test_rate_limited_by_fps(self):
+        buffer = self.make_buffer()
+        kept = sum(buffer.push(make_frame(), i / 25.0) for i in range(25))
+        self.assertEqual(kept, 10)
+
+    def test_retention_in_seconds(self):
+        buffer = self.make_buffer()
+        for i in range(100):
+            buffer.push(make_frame(value=i), i / 10.0)
+        stats = buffer.get_stats()
+        self.assertLessEqual(stats["seconds"], 2.0)
+        self.assertEqual(stats["frames"], 21)
+        self.assertAlmostEqual(buffer.newest_ts(), 9.9)
+
+    def test_memory_cap(self):
+        buffer = self.make_buffer(seconds=60, max_mb=0.05, quality=95)
+        rng = np.random.default_rng(0)
+        for i in range(50):
+            buffer.push(rng.integers(0, 255, (120, 160, 3), dtype=np.uint8), i / 10.0)
+        stats = buffer.get_stats()
+        self.assertLessEqual(stats["mb"], 0.05)
+        self.assertLess(stats["frames"], 50)
+        self.assertGreater(stats["evicted"], 0)
+
+    def test_snapshot_range_and_decode(self):
+        buffer = self.make_buffer()
+        for i in range(20):
+            buffer.push(make_frame(value=i * 10), i / 10.0)
+        clip = buffer.snapshot(0.5, 1.0)
+        self.assertEqual([round(f.ts, 1) for f in clip], [0.5, 0.6, 0.7, 0.8, 0.9, 1.0])
+        self.assertIsInstance(clip[0], EncodedFrame)
+        self.assertEqual(clip[0].shape, (120, 160, 3))
+        decoded = clip[0].decode()
+        self.assertEqual(decoded.shape, (120, 160, 3))
+        self.assertLess(abs(int(decoded[100, 80, 0]) - 50), 8)
+        self.assertLess(abs(int(decoded[10, 80, 1]) - 200), 8)
+
+    def test_downscale_and_shared_frame(self):
+        buffer = self.make_buffer(max_width=80)
+        buffer.push(SharedFrame(0, 0.0, array=make_frame()), 0.0)
+        buffer.push(make_frame(), 0.1)
+        self.assertEqual([f.shape for f in buffer.snapshot()], [(60, 80, 3), (60, 80, 3)])
+
+    def test_stats_report_compression(self):
+        buffer = self.make_buffer()
+        for i in range(5):
+            buffer.push(make_frame(), i / 10.0)
+        stats = buffer.get_stats()
+        self.assertEqual(stats["frames"], 5)
+        self.assertGreater(stats["compression"], 1.0)
+        self.assertEqual(stats["max_mb"], 4)
+
+    def test_threaded_encoder(self):
+        buffer = PrerollBuffer({"fps": 10}, name="test")
+        try:
+            for i in range(5):
+                buffer.push(make_frame(), i / 10.0)
+        finally:
+            buffer.close()
+        self.assertEqual(buffer.get_stats()["frames"] + buffer.dropped, 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import sys
+import os
+import threading
+import time
+import unittest
+
+import numpy as np
+from PyQt6.QtCore import Qt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.process_detector import ProcessDetectorWorker, _pack_nv12, _unpack_nv12
+from core.yuv_frame import YuvFrame
+
+
+class EchoWorker:
+    """Stand-in for ``DetectorWorker`` in the child: reports what it received."""
+
+    def __init__(self, model_key="Personas", **kwargs):
+        self.model_key = model_key
+        self.processed = 0
+
+    def _load_model(self):
+        return True
+
+    def set_grid(self, discarded_cells, filas, columnas):
+        pass
+
+    def process_frame(self, frame, frame_id, emit):
+        self.processed += 1
+        kind = "yuv" if isinstance(frame, YuvFrame) else "array"
+        pixel = frame.to_rgb()[0, 0].tolist() if kind == "yuv" else frame[0, 0].tolist()
+        emit([kind, list(frame.shape), pixel, os.getpid()], self.model_key, frame_id)
+
+    def get_stats(self):
+        return {"processed": self.processed}
+
+
+def make_yuv(h=48, w=64):
+    y = np.full((h, w), 128, dtype=np.uint8)
+    uv = np.full((h // 2, w // 2, 2), 128, dtype=np.uint8)
+    return YuvFrame(y, uv)
+
+
+class Nv12PackingTest(unittest.TestCase):
+    def test_round_trip(self):
+        frame = make_yuv()
+        frame.y[:] = np.arange(64, dtype=np.uint8)
+        packed = _pack_nv12(frame)
+        self.assertEqual(packed.shape, (72, 64))
+        out = _unpack_nv12(packed)
+        np.testing.assert_array_equal(out.y, frame.y)
+        np.testing.assert_array_equal(out.uv, frame.uv)
+        np.testing.assert_array_equal(out.to_rgb(), frame.to_rgb())
+
+
+class ProcessDetectorWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.results = []
+        self.got = threading.Event()
+        self.worker = ProcessDetectorWorker("Personas", worker_cls=EchoWorker, device="cpu")
+        # Sin bucle de eventos: el resultado se recibe en el hilo lector
+        self.worker.result_ready.connect(self.on_result, Qt.ConnectionType.DirectConnection)
+        self.worker.start()
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def on_result(self, output, key, frame_id):
+        self.results.append((output, key, frame_id))
+        self.got.set()
+
+    def post_until_result(self, frame, frame_id, timeout=30.0):
+        """Keep posting ``frame`` until a result for ``frame_id`` comes back."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.got.clear()
+            self.worker.set_frame(frame, frame_id)
+            self.got.wait(0.5)
+            for output, key, fid in self.results:
+                if fid == frame_id:
+                    return output, key
+        self.fail(f"sin resultado para el frame {frame_id}")
+
+    def test_results_round_trip(self):
+        frame = np.full((48, 64, 3), 7, dtype=np.uint8)
+        output, key = self.post_until_result(frame, 1)
+        self.assertEqual(key, "Personas")
+        self.assertEqual(output[:3], ["array", [48, 64, 3], [7, 7, 7]])
+
+        # El YuvFrame cruza como planos NV12 y llega entero al hijo
+        output, _ = self.post_until_result(make_yuv(), 2)
+        self.assertEqual(output[0], "yuv")
+        self.assertEqual(output[1], [48, 64, 3])
+        self.assertEqual(output[2], make_yuv().to_rgb()[0, 0].tolist())
+        self.assertGreater(self.worker.get_stats()["processed"], 0)
+
+    def test_crashed_child_is_restarted(self):
+        frame = np.zeros((48, 64, 3), dtype=np.uint8)
+        output, _ = self.post_until_result(frame, 1)
+        first_pid = output[3]
+        self.assertEqual(self.worker.restarts, 0)
+
+        self.worker._process.kill()
+        output, _ = self.post_until_result(frame, 2)
+        self.assertEqual(self.worker.restarts, 1)
+        self.assertNotEqual(output[3], first_pid)
+        self.assertTrue(self.worker.isRunning())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import sys
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.quantization import sample_frames, match_detections, compare_backends
+
+
+def dets(rows):
+    arr = np.array(rows, dtype=np.float32).reshape(-1, 6)
+    return arr[:, :4], arr[:, 5].astype(np.int64), arr[:, 4]
+
+
+class FakeBackend:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def predict(self, frames, classes=None, conf=0.5, imgsz=640):
+        return [dets(self.rows) for _ in frames]
+
+
+class QuantizationTests(unittest.TestCase):
+    def test_sample_frames_skips_holdout(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name in ("a.mp4", "b.mp4"):
+                path = os.path.join(tmp, name)
+                writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (64, 48))
+                for i in range(20):
+                    writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+                writer.release()
+                paths.append(path)
+            frames = sample_frames([tmp], count=6, exclude=[paths[1]])
+            self.assertEqual(len(frames), 6)
+            self.assertEqual(frames[0].shape, (48, 64, 3))
+
+    def test_match_same_class_only(self):
+        ref = dets([[0, 0, 10, 10, 0.9, 8], [20, 20, 30, 30, 0.8, 0]])
+        cand = dets([[1, 1, 10, 10, 0.7, 8], [20, 20, 30, 30, 0.8, 2]])
+        matched, deltas = match_detections(ref, cand)
+        self.assertEqual(matched, 1)
+        self.assertAlmostEqual(deltas[0], -0.2, places=5)
+
+    def test_compare_report(self):
+        ref = FakeBackend([[0, 0, 10, 10, 0.9, 8], [20, 20, 30, 30, 0.8, 8]])
+        cand = FakeBackend([[0, 0, 10, 10, 0.85, 8]])
+        frames = [np.zeros((32, 32, 3), dtype=np.uint8)] * 4
+        report = compare_backends(ref, cand, frames, warmup=1)
+        self.assertEqual(report["agreement"]["recall"], 0.5)
+        self.assertEqual(report["agreement"]["precision"], 1.0)
+        self.assertEqual(report["reference"]["detections"], 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
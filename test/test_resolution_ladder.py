@@ -0,0 +1,59 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.resolution_ladder import ResolutionLadder, rect_shape, padding_ratio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RectShapeTests(unittest.TestCase):
+    def test_16_9_shapes(self):
+        self.assertEqual(rect_shape(1920, 1080, 416), (256, 416))
+        self.assertEqual(rect_shape(1920, 1080, 640), (384, 640))
+        self.assertEqual(rect_shape(1920, 1080, 960), (544, 960))
+        self.assertEqual(rect_shape(1080, 1920, 640), (640, 384))
+
+    def test_padding_reduced(self):
+        self.assertGreater(padding_ratio(1920, 1080, (640, 640)), 0.4)
+        self.assertLess(padding_ratio(1920, 1080, rect_shape(1920, 1080, 640)), 0.07)
+
+
+class ResolutionLadderTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.ladder = ResolutionLadder(
+            {"enabled": True, "window_s": 1.0, "cooldown_s": 0.0}, clock=self.clock
+        )
+
+    def window(self, load, min_side):
+        self.clock.now += 1.0
+        return self.ladder.record(load, min_side, 1920, 1080)
+
+    def test_steps_up_for_small_targets_and_back(self):
+        self.assertEqual(self.ladder.long_side, 640)
+        # Barco de 40 px en 1080p -> ~13 px a 640: subir
+        self.assertTrue(self.window(0.2, 40))
+        self.assertEqual(self.ladder.shape_for(1920, 1080), (544, 960))
+        self.assertFalse(self.window(0.2, 40))
+        # Sin objetivos pequeños vuelve al peldaño inicial
+        self.assertTrue(self.window(0.2, None))
+        self.assertEqual(self.ladder.long_side, 640)
+        self.assertFalse(self.window(0.2, None))
+
+    def test_steps_down_under_load(self):
+        self.assertTrue(self.window(0.95, 40))
+        self.assertEqual(self.ladder.long_side, 416)
+        self.assertFalse(self.window(0.95, 40))
+
+
+if __name__ == "__main__":
+    unittest.main()
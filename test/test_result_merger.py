@@ -0,0 +1,117 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.result_merger import ResultMerger
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def det(x, cls=0, conf=0.9):
+    return {"bbox": [x, 0, x + 10, 10], "cls": cls, "conf": conf}
+
+
+class ResultMergerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.merger = ResultMerger(["rapido", "lento"], {"window": 3, "deadline_ms": 500}, clock=self.clock)
+
+    def test_complete_frame_is_released_with_merged_detections(self):
+        self.merger.open_frame(1, "f1")
+        self.assertEqual(self.merger.add_result(1, "rapido", [det(0)]), [])
+        released = self.merger.add_result(1, "lento", [det(1, conf=0.95), det(100)])
+        self.assertEqual(len(released), 1)
+        frame_id, frame, merged = released[0]
+        self.assertEqual((frame_id, frame), (1, "f1"))
+        self.assertEqual(sorted(d["bbox"][0] for d in merged), [1, 100])
+
+    def test_slow_model_does_not_discard_next_frames(self):
+        self.merger.open_frame(1)
+        self.merger.open_frame(2)
+        self.merger.add_result(1, "rapido", [det(0)])
+        self.merger.add_result(2, "rapido", [det(5)])
+        # El modelo lento termina el frame 1 después de abrirse el 2
+        released = self.merger.add_result(1, "lento", [])
+        self.assertEqual([r[0] for r in released], [1])
+        released = self.merger.add_result(2, "lento", [])
+        self.assertEqual([r[0] for r in released], [2])
+        self.assertEqual(self.merger.get_stats()["partial"], 0)
+
+    def test_deadline_releases_partial_results_in_order(self):
+        self.merger.open_frame(1)
+        self.merger.open_frame(2)
+        self.merger.add_result(2, "rapido", [det(5)])
+        self.merger.add_result(1, "rapido", [det(0)])
+        self.assertEqual(self.merger.poll(), [])
+        self.clock.now = 0.6
+        released = self.merger.poll()
+        self.assertEqual([r[0] for r in released], [1, 2])
+        stats = self.merger.get_stats()
+        self.assertEqual((stats["merged"], stats["partial"], stats["pending"]), (2, 2, 0))
+        # Resultado tardío de un frame ya entregado: se guarda, no se descarta
+        self.assertEqual(self.merger.add_result(1, "lento", [det(0)]), [])
+        stats = self.merger.get_stats()
+        self.assertEqual((stats["late"], stats["dropped"]), (1, 0))
+
+    def test_late_result_is_carried_into_next_frame(self):
+        self.merger.open_frame(1)
+        self.merger.add_result(1, "rapido", [det(0)])
+        self.clock.now = 0.6
+        self.assertEqual([r[0] for r in self.merger.poll()], [1])
+        self.merger.open_frame(2, expected=["rapido"])
+        # El modelo lento siempre supera el plazo: su resultado llega tarde
+        self.assertEqual(self.merger.add_result(1, "lento", [det(100, cls=8)]), [])
+        (_, _, merged), = self.merger.add_result(2, "rapido", [det(2)])
+        self.assertEqual(sorted(d["bbox"][0] for d in merged), [2, 100])
+        stats = self.merger.get_stats()
+        self.assertEqual((stats["late"], stats["carried"], stats["dropped"]), (1, 1, 0))
+
+    def test_stale_late_result_is_dropped(self):
+        self.merger.open_frame(3, expected=["lento"])
+        self.merger.add_result(3, "lento", [det(3)])
+        # El resultado del frame 1 es más viejo que el ya entregado del 3
+        self.merger.add_result(1, "lento", [det(1)])
+        stats = self.merger.get_stats()
+        self.assertEqual((stats["late"], stats["dropped"]), (0, 1))
+
+    def test_full_window_forces_oldest_frame_out(self):
+        for frame_id in range(1, 4):
+            self.merger.open_frame(frame_id)
+        self.merger.add_result(1, "rapido", [det(0)])
+        released = self.merger.open_frame(4)
+        self.assertEqual([r[0] for r in released], [1])
+        self.merger.open_frame(5)  # el frame 2 sale sin resultados
+        self.assertEqual(self.merger.get_stats()["expired"], 1)
+
+    def test_expected_subset_completes_frame(self):
+        self.merger.open_frame(1, expected=["rapido"])
+        released = self.merger.add_result(1, "rapido", [det(0)])
+        self.assertEqual([r[0] for r in released], [1])
+        self.assertEqual(self.merger.get_stats()["partial"], 0)
+
+    def test_models_not_scheduled_carry_their_last_results(self):
+        self.merger.open_frame(1, expected=["rapido", "lento"])
+        self.merger.add_result(1, "rapido", [det(0)])
+        self.merger.add_result(1, "lento", [det(100, cls=8)])
+        self.clock.now = 1.0
+        self.merger.open_frame(2, expected=["rapido"])
+        (_, _, merged), = self.merger.add_result(2, "rapido", [det(2)])
+        self.assertEqual(sorted(d["bbox"][0] for d in merged), [2, 100])
+        self.assertEqual(self.merger.get_stats()["carried"], 1)
+        # Pasado carry_forward_s el resultado viejo ya no se usa
+        self.clock.now = 5.0
+        self.merger.open_frame(3, expected=["rapido"])
+        (_, _, merged), = self.merger.add_result(3, "rapido", [det(4)])
+        self.assertEqual([d["bbox"][0] for d in merged], [4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import sys
+import os
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.roi import compute_roi_cells, roi_to_pixels, roi_area_ratio
+
+
+class RoiTests(unittest.TestCase):
+    def test_no_discarded_uses_full_frame(self):
+        self.assertIsNone(compute_roi_cells(set(), 18, 22))
+
+    def test_all_discarded_is_empty(self):
+        cells = {(r, c) for r in range(4) for c in range(4)}
+        self.assertEqual(compute_roi_cells(cells, 4, 4), [])
+
+    def test_sky_and_land_discarded(self):
+        # Filas 0-5 (cielo) y 14-17 (tierra) descartadas: queda una franja de agua
+        discarded = {(r, c) for r in list(range(6)) + list(range(14, 18)) for c in range(22)}
+        self.assertEqual(compute_roi_cells(discarded, 18, 22), [(6, 0, 14, 22)])
+
+    def test_separate_regions_and_max_rects(self):
+        # Dos esquinas habilitadas en una grilla 10x10
+        enabled = {(0, 0), (0, 1), (9, 8), (9, 9)}
+        discarded = {(r, c) for r in range(10) for c in range(10)} - enabled
+        self.assertEqual(compute_roi_cells(discarded, 10, 10), [(0, 0, 1, 2), (9, 8, 10, 10)])
+        self.assertEqual(compute_roi_cells(discarded, 10, 10, max_rects=1), [(0, 0, 10, 10)])
+
+    def test_pixels_with_margin(self):
+        rects = roi_to_pixels([(6, 0, 14, 22)], 18, 22, 1920, 1080, margin=10)
+        self.assertEqual(rects, [(0, 350, 1920, 850)])
+        self.assertAlmostEqual(roi_area_ratio(rects, 1920, 1080), 500 / 1080)
+
+
+if __name__ == "__main__":
+    unittest.main()
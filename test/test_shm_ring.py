@@ -0,0 +1,55 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.shm_ring import SharedFrameRing
+
+
+class SharedFrameRingTests(unittest.TestCase):
+    def setUp(self):
+        self.ring = SharedFrameRing(slot_bytes=48 * 64 * 3, slots=2)
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_write_then_read_returns_copy_and_id(self):
+        frame = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+        slot, seq = self.ring.write(frame, frame_id=7)
+        out, frame_id = self.ring.read(slot, seq)
+        self.assertEqual(frame_id, 7)
+        np.testing.assert_array_equal(out, frame)
+        self.ring.write(np.zeros_like(frame), 8)
+        self.ring.write(np.zeros_like(frame), 9)
+        # La copia no cambia aunque la ranura se reutilice
+        np.testing.assert_array_equal(out, frame)
+
+    def test_overwritten_slot_is_detected(self):
+        frame = np.ones((48, 64, 3), dtype=np.uint8)
+        slot, seq = self.ring.write(frame, 1)
+        self.ring.write(frame, 2)
+        self.ring.write(frame, 3)  # vuelve a la primera ranura
+        self.assertIsNone(self.ring.read(slot, seq))
+
+    def test_attach_by_name_sees_frames(self):
+        frame = np.full((10, 20), 5, dtype=np.uint8)
+        slot, seq = self.ring.write(frame, 42)
+        other = SharedFrameRing(name=self.ring.name)
+        try:
+            self.assertEqual((other.slots, other.slot_bytes), (2, 48 * 64 * 3))
+            out, frame_id = other.read(slot, seq)
+            self.assertEqual(out.shape, (10, 20))
+            self.assertEqual(frame_id, 42)
+        finally:
+            other.close()
+
+    def test_frame_larger_than_slot_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.ring.write(np.zeros((100, 100, 3), dtype=np.uint8))
+
+
+if __name__ == "__main__":
+    unittest.main()
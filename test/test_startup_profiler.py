@@ -0,0 +1,35 @@
+import sys
+import os
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.startup_profiler import StartupProfiler
+
+
+class StartupProfilerTests(unittest.TestCase):
+    def test_reports_once_after_seal_and_tasks(self):
+        profiler = StartupProfiler()
+        with profiler.phase("MainGUI"):
+            pass
+        profiler.task_started()
+        with mock.patch.object(profiler, "report") as report:
+            profiler.seal()
+            report.assert_not_called()
+            profiler.task_finished("modelo Personas", 0.5)
+            report.assert_called_once_with("modelos listos")
+            profiler.seal()
+            report.assert_called_once()
+        names = [p[0] for p in profiler.phases]
+        self.assertEqual(names, ["MainGUI", "modelo Personas"])
+
+    def test_report_orders_by_start(self):
+        profiler = StartupProfiler()
+        profiler.record("b", 0.1, start=profiler._t0 + 2.0)
+        profiler.record("a", 0.1, start=profiler._t0 + 1.0)
+        self.assertEqual([p[0] for p in profiler.report("test")], ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.tiling import generate_tiles, tile_is_discarded, offset_detections, merge_detections
+
+
+def dets(rows):
+    arr = np.array(rows, dtype=np.float32).reshape(-1, 6)
+    return arr[:, :4], arr[:, 5].astype(np.int64), arr[:, 4]
+
+
+class TilingTests(unittest.TestCase):
+    def test_tiles_cover_frame(self):
+        tiles = generate_tiles(1920, 1080, 640, overlap=0.2)
+        covered = np.zeros((1080, 1920), dtype=bool)
+        for x1, y1, x2, y2 in tiles:
+            self.assertEqual((x2 - x1, y2 - y1), (640, 640))
+            covered[y1:y2, x1:x2] = True
+        self.assertTrue(covered.all())
+
+    def test_small_frame_single_tile(self):
+        self.assertEqual(generate_tiles(320, 240, 640), [(0, 0, 320, 240)])
+
+    def test_discarded_tile(self):
+        # Grilla 2x2 sobre 100x100: la tesela superior izquierda cae en la celda (0, 0)
+        self.assertTrue(tile_is_discarded((0, 0, 50, 50), {(0, 0)}, 2, 2, 100, 100))
+        self.assertFalse(tile_is_discarded((0, 0, 60, 50), {(0, 0)}, 2, 2, 100, 100))
+        self.assertFalse(tile_is_discarded((0, 0, 50, 50), set(), 2, 2, 100, 100))
+
+    def test_merge_suppresses_cut_copy(self):
+        whole = offset_detections(dets([[10, 10, 60, 30, 0.9, 8]]), 500, 0)
+        cut = offset_detections(dets([[0, 10, 30, 30, 0.6, 8]]), 530, 0)
+        other = dets([[100, 100, 120, 120, 0.8, 8]])
+        xyxy, cls, conf = merge_detections([whole, cut, other], 0.5)
+        self.assertEqual(len(xyxy), 2)
+        np.testing.assert_allclose(xyxy[0], [510, 10, 560, 30])
+        self.assertEqual(cls.tolist(), [8, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
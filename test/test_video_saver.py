@@ -0,0 +1,51 @@
+import sys
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.preroll_buffer import PrerollBuffer
+from gui.video_saver import VideoSaverThread
+
+
+def read_sizes(path):
+    cap = cv2.VideoCapture(path)
+    sizes = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        sizes.append(frame.shape[:2])
+    cap.release()
+    return sizes
+
+
+class VideoSaverTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "clip.mp4")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_mixed_sizes_written_at_requested_size(self):
+        buffer = PrerollBuffer({"fps": 10}, name="test", clock=lambda: 0.0, threaded=False)
+        for i in range(3):
+            buffer.push(np.zeros((120, 160, 3), dtype=np.uint8), i / 10.0)
+        # Pre-roll del sub-stream seguido del post-roll del principal, más grande
+        frames = buffer.snapshot() + [np.zeros((240, 320, 3), dtype=np.uint8)] * 3
+        VideoSaverThread(frames, self.path, fps=10, size=(160, 120)).run()
+        self.assertEqual(read_sizes(self.path), [(120, 160)] * 6)
+
+    def test_defaults_to_first_frame_size(self):
+        frames = [np.zeros((120, 160, 3), dtype=np.uint8), np.zeros((240, 320, 3), dtype=np.uint8)]
+        VideoSaverThread(frames, self.path, fps=10).run()
+        self.assertEqual(read_sizes(self.path), [(120, 160)] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
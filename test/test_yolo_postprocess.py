@@ -0,0 +1,84 @@
+import sys
+import os
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.yolo_postprocess import postprocess_boxes, postprocess_boxes_scalar, nms, batched_nms
+
+
+class FakeBox:
+    def __init__(self, row):
+        self.xyxy = row[None, :4]
+        self.conf = row[None, 4]
+        self.cls = row[None, 5]
+
+
+class FakeBoxes:
+    """Minimal stand-in for ``ultralytics.engine.results.Boxes``."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return (FakeBox(row) for row in self.data)
+
+
+def random_boxes(n, frame_w=1280, frame_h=720, seed=0):
+    rng = np.random.default_rng(seed)
+    x1 = rng.uniform(-50, frame_w + 50, n)
+    y1 = rng.uniform(-50, frame_h + 50, n)
+    x2 = x1 + rng.uniform(-5, 200, n)
+    y2 = y1 + rng.uniform(-5, 200, n)
+    conf = rng.uniform(0.1, 1.0, n)
+    cls = rng.choice([0, 2, 8], n)
+    return FakeBoxes(np.stack([x1, y1, x2, y2, conf, cls], axis=1).astype(np.float32))
+
+
+class PostprocessEquivalenceTest(unittest.TestCase):
+    def test_matches_scalar_path(self):
+        for n in (0, 1, 10, 500):
+            boxes = random_boxes(n, seed=n)
+            self.assertEqual(
+                postprocess_boxes(boxes, 1280, 720),
+                postprocess_boxes_scalar(boxes, 1280, 720),
+            )
+
+    def test_matches_scalar_path_with_classes_and_remap(self):
+        boxes = random_boxes(200, seed=3)
+        kwargs = {"classes": [0, 8], "remap": {0: 1, 8: 9}}
+        self.assertEqual(
+            postprocess_boxes(boxes, 1280, 720, **kwargs),
+            postprocess_boxes_scalar(boxes, 1280, 720, **kwargs),
+        )
+
+    def test_output_types(self):
+        det = postprocess_boxes(FakeBoxes(np.array([[10.7, 20.2, 50.9, 60.1, 0.5, 2]], dtype=np.float32)), 640, 480)[0]
+        self.assertEqual(det['bbox'], [10, 20, 50, 60])
+        self.assertIsInstance(det['bbox'][0], int)
+        self.assertIsInstance(det['cls'], int)
+        self.assertIsInstance(det['conf'], float)
+
+    def test_none_boxes(self):
+        self.assertEqual(postprocess_boxes(None, 640, 480), [])
+
+
+class NmsTest(unittest.TestCase):
+    def test_overlapping_boxes_suppressed(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=np.float32)
+        scores = np.array([0.8, 0.9, 0.5], dtype=np.float32)
+        self.assertEqual(nms(boxes, scores, 0.5).tolist(), [1, 2])
+
+    def test_batched_nms_keeps_other_classes(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11]], dtype=np.float32)
+        scores = np.array([0.8, 0.9], dtype=np.float32)
+        self.assertEqual(sorted(batched_nms(boxes, scores, np.array([0, 8]), 0.5).tolist()), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import sys
+import os
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from core.yuv_frame import YuvFrame, fit_size
+from core.tiling import scale_detections
+
+
+def make_i420(width=64, height=48, seed=0):
+    rgb = np.random.default_rng(seed).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    i420 = cv2.cvtColor(rgb, cv2.COLOR_RGB2YUV_I420)
+    y = i420[:height]
+    u = i420[height:height + height // 4].reshape(height // 2, width // 2)
+    v = i420[height + height // 4:].reshape(height // 2, width // 2)
+    return i420, y, u, v
+
+
+def padded(plane, stride):
+    out = np.zeros((plane.shape[0], stride), np.uint8)
+    out[:, :plane.shape[1]] = plane
+    return out.tobytes()
+
+
+class YuvFrameTests(unittest.TestCase):
+    def setUp(self):
+        self.i420, self.y, self.u, self.v = make_i420()
+        self.expected = cv2.cvtColor(self.i420, cv2.COLOR_YUV2RGB_I420)
+
+    def test_nv12_with_row_padding_matches_opencv(self):
+        uv = np.dstack((self.u, self.v)).reshape(24, 64)
+        frame = YuvFrame.from_planes("Format_NV12", [(padded(self.y, 80), 80), (padded(uv, 80), 80)], 64, 48)
+        np.testing.assert_array_equal(frame.to_rgb(), self.expected)
+        np.testing.assert_array_equal(frame.to_bgr(), self.expected[:, :, ::-1])
+
+    def test_planar_formats_match_opencv(self):
+        i420 = YuvFrame.from_planes(
+            "Format_YUV420P", [(self.y.tobytes(), 64), (self.u.tobytes(), 32), (self.v.tobytes(), 32)], 64, 48
+        )
+        yv12 = YuvFrame.from_planes(
+            "Format_YV12", [(self.y.tobytes(), 64), (self.v.tobytes(), 32), (self.u.tobytes(), 32)], 64, 48
+        )
+        np.testing.assert_array_equal(i420.to_rgb(), self.expected)
+        np.testing.assert_array_equal(yv12.to_rgb(), self.expected)
+
+    def test_resized_conversion_is_cached_and_read_only(self):
+        frame = YuvFrame(self.y, np.dstack((self.u, self.v)))
+        small = frame.to_rgb((32, 24))
+        self.assertEqual(small.shape, (24, 32, 3))
+        self.assertIs(frame.to_rgb((32, 24)), small)
+        self.assertFalse(small.flags.writeable)
+        self.assertEqual(frame.nbytes, 64 * 48 * 3 // 2)
+
+    def test_crop_converts_region_like_full_frame(self):
+        frame = YuvFrame(self.y, np.dstack((self.u, self.v)))
+        np.testing.assert_array_equal(frame.crop(5, 7, 33, 21), self.expected[7:21, 5:33])
+        self.assertEqual(frame.crop(60, 40, 90, 90).shape, (8, 4, 3))
+        self.assertEqual(frame.crop(10, 10, 10, 20).shape, (10, 0, 3))
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            YuvFrame.from_planes("Format_P010", [(b"", 0)], 2, 2)
+
+    def test_fit_size_keeps_aspect_and_even_sides(self):
+        self.assertEqual(fit_size(1920, 1080, 416), (416, 234))
+        self.assertEqual(fit_size(640, 360, 1280), (640, 360))
+        w, h = fit_size(1001, 333, 100)
+        self.assertEqual((w % 2, h % 2), (0, 0))
+
+    def test_scale_detections_back_to_frame(self):
+        xyxy = np.array([[10, 20, 30, 40]], dtype=np.float32)
+        scaled, cls, conf = scale_detections((xyxy, np.array([1]), np.array([0.9])), 2.0, 4.0)
+        self.assertEqual(scaled.tolist(), [[20, 80, 60, 160]])
+        self.assertEqual(xyxy.tolist(), [[10, 20, 30, 40]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import json
 import os
 
+from core.startup_profiler import startup_profiler
+
 CONFIG_PATH = "config.json"
 
 def guardar_camaras(main_window):
@@ -29,4 +31,5 @@ def cargar_camaras_guardadas(main_window):
     for cam in camaras:
         main_window.camera_data_list.append(cam)
         main_window.camera_list.addItem(f"{cam['ip']} - {cam['tipo']}")
-        main_window.start_camera_stream(cam)
+        with startup_profiler.phase(f"cámara {cam.get('ip')}"):
+            main_window.start_camera_stream(cam)
@@ -1,13 +1,13 @@
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QSlider, QPushButton,
-    QGroupBox, QCheckBox, QDialogButtonBox, QTextEdit
+    QGroupBox, QCheckBox, QDialogButtonBox, QTextEdit, QSpinBox, QFormLayout
 )
 from PyQt6.QtCore import Qt, pyqtSignal
 
 class FPSConfigDialog(QDialog):
     fps_config_changed = pyqtSignal(dict)
     
-    def __init__(self, parent=None, current_config=None):
+    def __init__(self, parent=None, current_config=None, adaptive_status=None, models=None):
         super().__init__(parent)
         self.setWindowTitle("⚙️ Configuración de FPS")
         self.setMinimumSize(500, 450)
@@ -22,6 +22,8 @@ class FPSConfigDialog(QDialog):
             }
         
         self.config = current_config.copy()
+        # Mediciones y decisiones del FPS adaptativo por cámara (ip -> estado)
+        self.adaptive_status = adaptive_status or {}
         
         layout = QVBoxLayout()
         
@@ -88,6 +90,28 @@ class FPSConfigDialog(QDialog):
         
         options_layout.addWidget(self.adaptive_fps_check)
         options_group.setLayout(options_layout)
+
+        # Cadencia por modelo (solo al configurar una cámara concreta)
+        self.cadence_spins = {}
+        cadence_group = None
+        if models:
+            cadence_group = QGroupBox("🧭 Cadencia por Modelo")
+            cadence_layout = QFormLayout()
+            cadence = self.config.get("model_cadence") or {}
+            for model in models:
+                spin = QSpinBox()
+                spin.setRange(0, 30)
+                spin.setSuffix(" fps")
+                spin.setSpecialValueText("Cada frame de detección")
+                spin.setValue(int(cadence.get(model) or 0))
+                spin.valueChanged.connect(self.update_stats_display)
+                self.cadence_spins[model] = spin
+                cadence_layout.addRow(f"{model}:", spin)
+            cadence_desc = QLabel("Modelos lentos (p. ej. embarcaciones) pueden correr a 1-2 fps; sus últimos resultados se mantienen entre ejecuciones.")
+            cadence_desc.setWordWrap(True)
+            cadence_desc.setStyleSheet("color: gray; font-size: 11px;")
+            cadence_layout.addRow(cadence_desc)
+            cadence_group.setLayout(cadence_layout)
         
         # Botones preestablecidos
         presets_group = QGroupBox("🚀 Configuraciones Preestablecidas")
@@ -120,7 +144,7 @@ class FPSConfigDialog(QDialog):
         stats_layout = QVBoxLayout()
         
         self.stats_text = QTextEdit()
-        self.stats_text.setMaximumHeight(80)
+        self.stats_text.setMaximumHeight(160 if self.adaptive_status else 80)
         self.stats_text.setReadOnly(True)
         self.update_stats_display()
         
@@ -142,6 +166,8 @@ class FPSConfigDialog(QDialog):
         layout.addWidget(detection_group)
         layout.addWidget(ui_group)
         layout.addWidget(options_group)
+        if cadence_group is not None:
+            layout.addWidget(cadence_group)
         layout.addWidget(presets_group)
         layout.addWidget(stats_group)
         layout.addWidget(buttons)
@@ -184,7 +210,19 @@ class FPSConfigDialog(QDialog):
    • UI: actualiza cada {ui_interval}ms
         """
         
-        self.stats_text.setPlainText(stats_text.strip())
+        lines = [stats_text.strip()]
+        for model, spin in getattr(self, "cadence_spins", {}).items():
+            fps = min(spin.value(), detection) if spin.value() else detection
+            lines.append(f"   • {model}: {fps} fps de detección")
+        for cam, status in self.adaptive_status.items():
+            lines.append(
+                f"📈 {cam}: entrada {status['input_fps']} fps, detección {status['detection_fps']} fps "
+                f"(1 de cada {status['interval']}), latencia {status['latency_ms']} ms, "
+                f"carga {status['load']:.0%}, descartes {status['drop_ratio']:.0%}"
+            )
+            for decision in status["decisions"][-3:]:
+                lines.append(f"   • {decision}")
+        self.stats_text.setPlainText("\n".join(lines))
     
     def apply_preset(self, visual, detection, ui):
         self.visual_fps_slider.setValue(visual)
@@ -193,6 +231,10 @@ class FPSConfigDialog(QDialog):
     
     def get_config(self):
         self.config['adaptive_fps'] = self.adaptive_fps_check.isChecked()
+        if self.cadence_spins:
+            self.config['model_cadence'] = {
+                model: spin.value() for model, spin in self.cadence_spins.items() if spin.value()
+            }
         return self.config.copy()
     
     def apply_config(self):
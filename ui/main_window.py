@@ -6,7 +6,7 @@ from PyQt6.QtWidgets import (
     QScrollArea, QMessageBox, QSplitter
 )
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 import importlib
 from ui.camera_modal import CameraDialog
 from gui.resumen_detecciones import ResumenDeteccionesWidget
@@ -14,6 +14,7 @@ from ui.config_modal import ConfiguracionDialog
 from ui.fps_config_dialog import FPSConfigDialog
 from ui.camera_manager import guardar_camaras, cargar_camaras_guardadas
 from core.rtsp_builder import generar_rtsp
+from core.startup_profiler import startup_profiler
 import os
 import cProfile
 import pstats
@@ -112,11 +113,25 @@ class MainGUI(QMainWindow):
         # Inicializar sistema PTZ al arrancar
         self._ptz_initialized = False
 
-        cargar_camaras_guardadas(self)
+        # Las cámaras se cargan cuando la ventana ya es visible; los modelos
+        # terminan de cargarse y precalentarse en los hilos de detección
+        QTimer.singleShot(0, self._cargar_camaras_diferido)
+
+    def _cargar_camaras_diferido(self):
+        with startup_profiler.phase("cargar cámaras guardadas"):
+            cargar_camaras_guardadas(self)
+        startup_profiler.seal()
 
     def abrir_fps_config(self):
         """Abrir diálogo de configuración de FPS"""
-        dialog = FPSConfigDialog(self, self.fps_config)
+        adaptive_status = {}
+        for widget in self.camera_widgets:
+            visualizador = getattr(widget, 'visualizador', None)
+            if visualizador and hasattr(visualizador, 'get_adaptive_status'):
+                status = visualizador.get_adaptive_status()
+                if status:
+                    adaptive_status[widget.cam_data.get('ip', 'Cámara')] = status
+        dialog = FPSConfigDialog(self, self.fps_config, adaptive_status=adaptive_status)
         dialog.fps_config_changed.connect(self.update_fps_config)
         
         if dialog.exec():
@@ -140,7 +155,8 @@ class MainGUI(QMainWindow):
                     widget.set_fps_config(
                         visual_fps=self.fps_config['visual_fps'],
                         detection_fps=self.fps_config['detection_fps'],
-                        ui_update_fps=self.fps_config['ui_update_fps']
+                        ui_update_fps=self.fps_config['ui_update_fps'],
+                        adaptive_fps=self.fps_config.get('adaptive_fps')
                     )
                 
                 # Actualizar VisualizadorDetector
@@ -148,7 +164,8 @@ class MainGUI(QMainWindow):
                     if hasattr(widget.visualizador, 'update_fps_config'):
                         widget.visualizador.update_fps_config(
                             visual_fps=self.fps_config['visual_fps'],
-                            detection_fps=self.fps_config['detection_fps']
+                            detection_fps=self.fps_config['detection_fps'],
+                            adaptive_fps=self.fps_config.get('adaptive_fps')
                         )
                         
             except Exception as e:
@@ -542,14 +559,26 @@ class MainGUI(QMainWindow):
         widget = self.camera_widgets[camera_index]
         current_fps = widget.fps_config if hasattr(widget, 'fps_config') else self.fps_config
         
-        dialog = FPSConfigDialog(self, current_fps)
+        adaptive_status = None
+        visualizador = getattr(widget, 'visualizador', None)
+        if visualizador and hasattr(visualizador, 'get_adaptive_status'):
+            status = visualizador.get_adaptive_status()
+            if status:
+                adaptive_status = {widget.cam_data.get('ip', 'Cámara'): status}
+        cam_data = widget.cam_data or {}
+        models = cam_data.get("modelos") or ([cam_data["modelo"]] if cam_data.get("modelo") else [])
+        current_fps = dict(current_fps)
+        current_fps.setdefault("model_cadence", cam_data.get("model_cadence") or {})
+        dialog = FPSConfigDialog(self, current_fps, adaptive_status=adaptive_status, models=models)
         dialog.setWindowTitle(f"🎯 FPS para {self.camera_data_list[camera_index].get('ip', 'Cámara')}")
         
         def apply_individual_fps(config):
             widget.set_fps_config(
                 visual_fps=config['visual_fps'],
                 detection_fps=config['detection_fps'],
-                ui_update_fps=config['ui_update_fps']
+                ui_update_fps=config['ui_update_fps'],
+                adaptive_fps=config.get('adaptive_fps'),
+                model_cadence=config.get('model_cadence')
             )
             self.append_debug(f"🎯 FPS individual aplicado a {widget.cam_data.get('ip', 'Cámara')}")
         